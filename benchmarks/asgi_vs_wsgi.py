@@ -0,0 +1,125 @@
+"""Compare the sync (WSGI) and async (ASGI) read endpoints under load.
+
+Start both servers against the same database, e.g.::
+
+    gunicorn theatre_api_service.wsgi -w 4 -b :8000
+    uvicorn theatre_api_service.asgi:application --workers 4 --port 8001
+
+then run::
+
+    python -m benchmarks.asgi_vs_wsgi --username user@test.ua \\
+        --password secret --concurrency 200 --requests 5000
+
+The sync paths are requested from the WSGI server and the matching
+``/api/theatre/async/`` paths from the ASGI server. Requests per second
+and p50/p95/p99 latency are printed as JSON.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+PATHS = (
+    "plays/",
+    "performance/",
+    "genres/",
+    "actors/",
+    "theatre_hall/",
+)
+
+
+def get_token(base_url, username, password):
+    request = urllib.request.Request(
+        f"{base_url}/api/token/",
+        data=json.dumps(
+            {"username": username, "password": password}
+        ).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["access"]
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run(url, token, concurrency, total):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def fetch(_):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(
+                urllib.request.Request(url, headers=headers), timeout=60
+            ) as response:
+                response.read()
+        except (urllib.error.URLError, OSError):
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(fetch, range(total)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    result = {"requests": total, "errors": errors, "seconds": duration}
+    if latencies:
+        result.update({
+            "requests_per_second": len(latencies) / duration,
+            "mean_ms": statistics.mean(latencies) * 1000,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--wsgi", default="http://127.0.0.1:8000")
+    parser.add_argument("--asgi", default="http://127.0.0.1:8001")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--paths", nargs="*", default=PATHS)
+    parser.add_argument("--output", help="Also write the report here.")
+    args = parser.parse_args()
+
+    token = get_token(args.wsgi, args.username, args.password)
+    report = {}
+    for path in args.paths:
+        report[path] = {
+            "wsgi": run(
+                f"{args.wsgi}/api/theatre/{path}",
+                token, args.concurrency, args.requests,
+            ),
+            "asgi": run(
+                f"{args.asgi}/api/theatre/async/{path}",
+                token, args.concurrency, args.requests,
+            ),
+        }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
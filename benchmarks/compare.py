@@ -0,0 +1,66 @@
+"""Compare two benchmark reports and flag regressions.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.2
+
+Exits with status 1 when an endpoint got slower at p95 by more than the
+threshold, or runs more queries per request than before.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "queries", "bytes")
+
+
+def compare(before, after, threshold):
+    rows, regressions = [], []
+    for name, new in after["endpoints"].items():
+        old = before["endpoints"].get(name)
+        if old is None:
+            rows.append((name, "new", {}))
+            continue
+        changes = {}
+        for metric in METRICS:
+            if old[metric]:
+                changes[metric] = (new[metric] - old[metric]) / old[metric]
+            else:
+                changes[metric] = 0.0 if not new[metric] else float("inf")
+        if changes["p95_ms"] > threshold or new["queries"] > old["queries"]:
+            regressions.append(name)
+        rows.append((name, "regressed" if name in regressions else "", {
+            metric: (old[metric], new[metric], changes[metric])
+            for metric in METRICS
+        }))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative p95 slowdown, 0.2 being 20%%.",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.before) as file:
+        before = json.load(file)
+    with open(args.after) as file:
+        after = json.load(file)
+
+    rows, regressions = compare(before, after, args.threshold)
+    for name, flag, metrics in rows:
+        print(f"{name:28} {flag}")
+        for metric, (old, new, change) in metrics.items():
+            print(f"    {metric:8} {old:12.2f} -> {new:12.2f} {change:+8.1%}")
+
+    if regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
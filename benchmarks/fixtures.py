@@ -0,0 +1,291 @@
+"""Seed a database with a large, reproducible theatre catalog.
+
+Rows are written with ``bulk_create`` in batches and the derived data
+(seat bitmaps, sold counters, the calendar, search vectors) is filled
+in directly. Model signals do not fire for the seeded rows.
+"""
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from theatre.cache import bump_version
+from theatre.models import (
+    Genre,
+    Actor,
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    Ticket,
+    CalendarDay,
+)
+from theatre.search import update_search_vector
+from theatre.seat_map import SeatMap
+
+BATCH_SIZE = 5000
+PASSWORD = "benchmark-password"
+WORDS = (
+    "love night dream king queen summer winter garden house storm "
+    "secret letter city river road song light shadow heart war"
+).split()
+
+
+def _batched(objects, batch_size=BATCH_SIZE):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk_create(model, objects):
+    created = []
+    for batch in _batched(objects):
+        created.extend(model.objects.bulk_create(batch))
+    return created
+
+
+def _title(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).title()
+
+
+def seed(
+    plays=2000,
+    performances=20000,
+    tickets=1000000,
+    users=500,
+    halls=20,
+    genres=30,
+    actors=1000,
+    seed=0,
+    stdout=None,
+):
+    """Create the catalog, users, performances and sold tickets.
+
+    ``tickets`` is spread over the performances at random and capped by
+    their hall capacity. Returns the created staff and customer users.
+    """
+    rng = random.Random(seed)
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message + "\n")
+
+    with transaction.atomic():
+        user_model = get_user_model()
+        staff = user_model.objects.create_user(
+            username="bench-admin@test.ua",
+            password=PASSWORD,
+            is_staff=True,
+        )
+        customer = user_model.objects.create_user(
+            username="bench-user@test.ua", password=PASSWORD
+        )
+        # Password hashing is the slow part of creating users, so the
+        # other customers share one hash.
+        user_ids = [customer.id] + [
+            user.id
+            for user in _bulk_create(
+                user_model,
+                (
+                    user_model(
+                        username=f"bench-user-{index}@test.ua",
+                        password=customer.password,
+                    )
+                    for index in range(users - 1)
+                ),
+            )
+        ]
+        log(f"{users} users")
+
+        genre_ids = [
+            genre.id
+            for genre in _bulk_create(
+                Genre, (Genre(name=_title(rng, 1)) for _ in range(genres))
+            )
+        ]
+        actor_ids = [
+            actor.id
+            for actor in _bulk_create(
+                Actor,
+                (
+                    Actor(
+                        first_name=_title(rng, 1), last_name=_title(rng, 1)
+                    )
+                    for _ in range(actors)
+                ),
+            )
+        ]
+        hall_list = _bulk_create(
+            TheatreHall,
+            (
+                TheatreHall(
+                    name=f"Hall {index + 1}",
+                    rows=rng.randint(10, 50),
+                    seats_in_row=rng.randint(15, 100),
+                )
+                for index in range(halls)
+            ),
+        )
+        log(f"{genres} genres, {actors} actors, {halls} halls")
+
+        play_ids = [
+            play.id
+            for play in _bulk_create(
+                Play,
+                (
+                    Play(
+                        title=_title(rng, rng.randint(1, 4)),
+                        description=_title(rng, 20),
+                    )
+                    for _ in range(plays)
+                ),
+            )
+        ]
+        _bulk_create(
+            Play.genres.through,
+            (
+                Play.genres.through(play_id=play_id, genre_id=genre_id)
+                for play_id in play_ids
+                for genre_id in rng.sample(genre_ids, min(2, genres))
+            ),
+        )
+        _bulk_create(
+            Play.actors.through,
+            (
+                Play.actors.through(play_id=play_id, actor_id=actor_id)
+                for play_id in play_ids
+                for actor_id in rng.sample(actor_ids, min(5, actors))
+            ),
+        )
+        update_search_vector(play_ids)
+        Play.refresh_cards(play_ids)
+        log(f"{plays} plays")
+
+        # Decide the sold seats up front, so every performance is
+        # written once with its final seat map and counter.
+        start = timezone.now().replace(
+            minute=0, second=0, microsecond=0
+        ) - timedelta(days=30)
+        weights = [rng.random() for _ in range(performances)]
+        scale = tickets / sum(weights) if weights else 0
+        planned = []
+        for weight in weights:
+            hall = rng.choice(hall_list)
+            capacity = hall.rows * hall.seats_in_row
+            sold = rng.sample(
+                range(capacity), min(capacity, round(weight * scale))
+            )
+            seats = [
+                divmod(index, hall.seats_in_row) for index in sorted(sold)
+            ]
+            seats = [(row + 1, seat + 1) for row, seat in seats]
+            planned.append((hall, seats))
+
+        performance_ids = [
+            performance.id
+            for performance in _bulk_create(
+                Performance,
+                (
+                    Performance(
+                        show_time=start + timedelta(
+                            days=rng.randint(0, 180), hours=rng.randint(0, 12)
+                        ),
+                        play_id=rng.choice(play_ids),
+                        theatre_hall=hall,
+                        seat_bitmap=SeatMap.from_seats(
+                            hall.rows, hall.seats_in_row, seats
+                        ).to_bytes(),
+                        tickets_sold=len(seats),
+                    )
+                    for hall, seats in planned
+                ),
+            )
+        ]
+        log(f"{performances} performances")
+
+        def ticket_rows():
+            reservation_batch = []
+            for performance_id, (_, seats) in zip(performance_ids, planned):
+                # Seats of a performance are sold in groups of up to 4.
+                for first in range(0, len(seats), 4):
+                    reservation_batch.append(
+                        (performance_id, seats[first:first + 4])
+                    )
+                    if len(reservation_batch) == BATCH_SIZE:
+                        yield reservation_batch
+                        reservation_batch = []
+            if reservation_batch:
+                yield reservation_batch
+
+        ticket_count = 0
+        for batch in ticket_rows():
+            reservations = Reservation.objects.bulk_create(
+                Reservation(user_id=rng.choice(user_ids)) for _ in batch
+            )
+            ticket_count += len(_bulk_create(
+                Ticket,
+                (
+                    Ticket(
+                        performance_id=performance_id,
+                        reservation=reservation,
+                        row=row,
+                        seat=seat,
+                    )
+                    for reservation, (performance_id, seats) in zip(
+                        reservations, batch
+                    )
+                    for row, seat in seats
+                ),
+            ))
+        log(f"{ticket_count} tickets")
+
+        CalendarDay.rebuild()
+
+    for model in (Genre, Actor, TheatreHall, Play):
+        bump_version(model)
+
+    return staff, customer
+
+
+@contextmanager
+def benchmark_database(keepdb=False, **options):
+    """Run the block against a seeded test database.
+
+    The test database is created and seeded with ``options`` passed to
+    ``seed``, and destroyed afterwards unless ``keepdb`` is set; a kept
+    database that is already seeded is reused as is. Yields the staff
+    and customer users and whether the data was seeded by this call.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        users = get_user_model().objects
+        customer = users.filter(username="bench-user@test.ua").first()
+        staff = users.filter(username="bench-admin@test.ua").first()
+        seeded = customer is None
+        if seeded:
+            started = time.perf_counter()
+            staff, customer = seed(stdout=sys.stderr, **options)
+            sys.stderr.write(
+                f"Seeded in {time.perf_counter() - started:.1f}s\n"
+            )
+        yield staff, customer, seeded
+    finally:
+        if not keepdb:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,91 @@
+"""Compare DRF's JSON renderer with the orjson-backed renderer.
+
+Fetches every GET endpoint of the suite in ``benchmarks.run`` once from
+a seeded database, then times rendering its response data with both
+renderers; the output must be the same bytes::
+
+    DJANGO_SETTINGS_MODULE=theatre_api_service.settings \\
+        python -m benchmarks.json_rendering --output rendering.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api_service.settings")
+
+
+def _time(render, data, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(data)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--output", help="Also write the report here.")
+    args = parser.parse_args(argv)
+
+    django.setup()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+
+    from benchmarks.fixtures import benchmark_database
+    from benchmarks.run import build_cases, get_context
+    from theatre.renderers import FastJSONRenderer, orjson
+
+    if orjson is None:
+        parser.error("orjson is not installed")
+
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+    report = []
+    with benchmark_database(
+        args.keepdb, plays=2000, performances=2000, tickets=20000
+    ) as (staff, customer, _):
+        context = get_context(customer)
+        client = APIClient(raise_request_exception=False)
+        for case in build_cases(context):
+            if case.method != "get":
+                continue
+            client.force_authenticate(
+                staff if case.auth == "staff" else customer
+            )
+            separator = "&" if "?" in case.path else "?"
+            response = client.get(
+                f"{case.path}{separator}page_size={args.page_size}"
+            )
+            data = getattr(response, "data", None)
+            if response.status_code != 200 or data is None:
+                continue
+
+            assert stdlib.render(data) == fast.render(data), case.name
+            stdlib_time = _time(stdlib.render, data, args.repeat)
+            fast_time = _time(fast.render, data, args.repeat)
+            report.append({
+                "endpoint": case.name,
+                "bytes": len(fast.render(data)),
+                "json_us": stdlib_time * 1e6,
+                "orjson_us": fast_time * 1e6,
+                "speedup": stdlib_time / fast_time,
+            })
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
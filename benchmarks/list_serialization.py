@@ -0,0 +1,110 @@
+"""Compare model serializers with row serializers on list pages.
+
+Times fetching and rendering one page of plays and performances, per
+row, with the DRF list serializers and with the ``values_list()`` row
+serializers, at page sizes of 100 and 1000::
+
+    DJANGO_SETTINGS_MODULE=theatre_api_service.settings \\
+        python -m benchmarks.list_serialization --output lists.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api_service.settings")
+
+PAGE_SIZES = (100, 1000)
+
+
+def _time(render, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--output", help="Also write the report here.")
+    args = parser.parse_args(argv)
+
+    django.setup()
+    from django.db.models import F
+    from rest_framework.renderers import JSONRenderer
+
+    from benchmarks.fixtures import benchmark_database
+    from theatre.models import Performance, Play
+    from theatre.row_serializers import (
+        PerformanceRowSerializer,
+        PlayRowSerializer,
+    )
+    from theatre.serializers import (
+        PerformanceListSerializer,
+        PlayListSerializer,
+    )
+
+    renderer = JSONRenderer()
+    plays = Play.objects.order_by("title", "id")
+    performances = (
+        Performance.objects.select_related("play", "theatre_hall")
+        .annotate(tickets_available=(
+            F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+            - F("tickets_sold")
+        ))
+        .order_by("-show_time", "-id")
+    )
+    cases = (
+        ("plays", plays, PlayListSerializer, PlayRowSerializer),
+        (
+            "performances",
+            performances,
+            PerformanceListSerializer,
+            PerformanceRowSerializer,
+        ),
+    )
+
+    report = []
+    with benchmark_database(
+        args.keepdb, plays=2000, performances=2000, tickets=20000
+    ):
+        for name, queryset, serializer_class, row_serializer_class in cases:
+            row_serializer = row_serializer_class()
+            for page_size in PAGE_SIZES:
+                def model_page():
+                    return renderer.render(serializer_class(
+                        queryset[:page_size], many=True
+                    ).data)
+
+                def row_page():
+                    return renderer.render(row_serializer.to_representation(
+                        row_serializer.get_rows(queryset)[:page_size]
+                    ))
+
+                assert model_page() == row_page()
+                model_time = _time(model_page, args.repeat)
+                row_time = _time(row_page, args.repeat)
+                report.append({
+                    "list": name,
+                    "page_size": page_size,
+                    "serializer_us_per_row": model_time / page_size * 1e6,
+                    "row_serializer_us_per_row": row_time / page_size * 1e6,
+                    "speedup": model_time / row_time,
+                })
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare booking reservations one by one with queued batches.
+
+Books ``--requests`` single-seat reservations spread over
+``--performances`` empty performances, first each in its own
+transaction as ``POST /reservation/`` does, then by queueing them and
+draining the queue with ``theatre.intake``::
+
+    DJANGO_SETTINGS_MODULE=theatre_api_service.settings \\
+        python -m benchmarks.reservation_queue --requests 2000
+
+Run ``manage.py process_reservations --processes N`` against Postgres
+to see the queue scale with the number of performances.
+"""
+import argparse
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api_service.settings")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--performances", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--output", help="Also write the report here.")
+    args = parser.parse_args(argv)
+
+    django.setup()
+    from django.utils import timezone
+
+    from benchmarks.fixtures import benchmark_database
+    from theatre.booking import create_reservation
+    from theatre.intake import drain, enqueue_reservation
+    from theatre.models import Performance, Play, TheatreHall
+
+    def requests(performances):
+        hall = performances[0].theatre_hall
+        for number in range(args.requests):
+            seat = number // len(performances)
+            yield [{
+                "performance_id": performances[number % len(performances)].pk,
+                "row": seat // hall.seats_in_row + 1,
+                "seat": seat % hall.seats_in_row + 1,
+            }]
+
+    def empty_performances():
+        hall = TheatreHall.objects.create(
+            name="Bench queue", rows=100, seats_in_row=100
+        )
+        play = Play.objects.order_by("id").first()
+        return [
+            Performance.objects.create(
+                play=play, theatre_hall=hall, show_time=timezone.now()
+            )
+            for _ in range(args.performances)
+        ]
+
+    report = {}
+    with benchmark_database(
+        plays=10, performances=10, tickets=0, users=10
+    ) as (_, customer, _):
+        started = time.perf_counter()
+        for tickets_data in requests(empty_performances()):
+            create_reservation(customer, tickets_data)
+        report["direct_per_s"] = args.requests / (
+            time.perf_counter() - started
+        )
+
+        started = time.perf_counter()
+        for tickets_data in requests(empty_performances()):
+            enqueue_reservation(customer, tickets_data)
+        enqueued = time.perf_counter()
+        processed = drain(args.batch_size)
+        finished = time.perf_counter()
+        assert processed == args.requests, processed
+        report["enqueue_per_s"] = args.requests / (enqueued - started)
+        report["queue_per_s"] = args.requests / (finished - enqueued)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Drive every API endpoint against a seeded database and report.
+
+The suite runs in-process through Django's test client on a separate
+test database, which is created, seeded and destroyed by default::
+
+    DJANGO_SETTINGS_MODULE=theatre_api_service.settings \\
+        python -m benchmarks.run --plays 2000 --performances 20000 \\
+        --tickets 1000000 --output before.json
+
+Pass ``--keepdb`` to keep the seeded database for later runs. For each
+endpoint the report has latency percentiles, queries per request and
+the payload size; compare two reports with ``benchmarks.compare``.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api_service.settings")
+
+
+class Case:
+    def __init__(self, name, method, path, data=None, auth="user"):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.auth = auth
+
+
+def build_cases(context):
+    """Every router endpoint plus the token and user endpoints.
+
+    ``context`` holds ids of seeded rows; ``path`` and ``data`` may be
+    callables of the request number, so writes do not collide.
+    """
+    from django.urls import reverse
+
+    performance_id = context["performance_id"]
+    play_id = context["play_id"]
+    day = context["day"]
+    credentials = {
+        "username": context["username"], "password": context["password"]
+    }
+
+    def theatre(name, *args):
+        return reverse(f"theatre:{name}", args=args)
+
+    def register(number):
+        return {
+            "username": f"bench-register-{time.time_ns()}-{number}@test.ua",
+            "password": "benchmark-password",
+        }
+
+    def reserve(number):
+        return {
+            "tickets": [
+                {
+                    "performance": context["free_performance_id"],
+                    "row": number // context["seats_in_row"] + 1,
+                    "seat": number % context["seats_in_row"] + 1,
+                }
+            ]
+        }
+
+    return [
+        Case("genres", "get", theatre("genre-list")),
+        Case("actors", "get", theatre("actor-list")),
+        Case("theatre_halls", "get", theatre("theatrehall-list")),
+        Case("plays", "get", theatre("play-list")),
+        Case(
+            "plays_filtered",
+            "get",
+            theatre("play-list")
+            + f"?genres={context['genre_id']}&title=a",
+        ),
+        Case("plays_search", "get", theatre("play-list") + "?q=summer+lov"),
+        Case(
+            "plays_faceted",
+            "get",
+            theatre("play-list")
+            + f"?facets=true&genres={context['genre_id']}",
+        ),
+        Case("play_detail", "get", theatre("play-detail", play_id)),
+        Case("performances", "get", theatre("performance-list")),
+        Case(
+            "performances_by_date",
+            "get",
+            theatre("performance-list") + f"?date={day}",
+        ),
+        Case(
+            "performances_faceted",
+            "get",
+            theatre("performance-list")
+            + f"?facets=true&genres={context['genre_id']}",
+        ),
+        Case(
+            "performances_by_play",
+            "get",
+            theatre("performance-list") + f"?play={play_id}",
+        ),
+        Case(
+            "performance_detail",
+            "get",
+            theatre("performance-detail", performance_id),
+        ),
+        Case(
+            "performance_taken_places",
+            "get",
+            theatre("performance-detail", performance_id)
+            + "?taken_places=list",
+        ),
+        Case("calendar", "get", theatre("calendarday-list")),
+        Case("reservations", "get", theatre("reservation-list")),
+        Case("reservation_create", "post", theatre("reservation-list"),
+             data=reserve),
+        Case(
+            "allocate",
+            "post",
+            lambda number: theatre(
+                "performance-allocate", context["free_performance_id"]
+            ) + "?count=2",
+        ),
+        Case(
+            "hold",
+            "post",
+            theatre("performance-hold", performance_id),
+            data=lambda number: {"seats": [{"row": 1, "seat": 1}]},
+        ),
+        Case("cache_stats", "get", theatre("cache-stats"), auth="staff"),
+        Case(
+            "ticket_export",
+            "get",
+            theatre("ticket-export") + f"?performance={performance_id}",
+            auth="staff",
+        ),
+        Case("token_obtain", "post", reverse("token_obtain_pair"),
+             data=credentials, auth=None),
+        Case(
+            "token_refresh",
+            "post",
+            reverse("token_refresh"),
+            data={"refresh": context["refresh"]},
+            auth=None,
+        ),
+        Case("user_register", "post", reverse("user:create"), data=register,
+             auth=None),
+        Case("user_login", "post", reverse("user:token"), data=credentials,
+             auth=None),
+        Case("user_me", "get", reverse("user:manage")),
+    ]
+
+
+def _percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def _content_length(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def run_case(client, case, headers, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies, queries, sizes, statuses = [], [], [], {}
+    # One warm-up request fills caches the way a running server has.
+    for number in range(repeat + 1):
+        path = case.path(number) if callable(case.path) else case.path
+        data = case.data(number) if callable(case.data) else case.data
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, case.method)(
+                path, data, format="json", **headers
+            )
+            size = _content_length(response)
+            elapsed = time.perf_counter() - started
+        if number == 0:
+            continue
+        latencies.append(elapsed)
+        queries.append(len(captured.captured_queries))
+        sizes.append(size)
+        statuses[response.status_code] = (
+            statuses.get(response.status_code, 0) + 1
+        )
+
+    latencies.sort()
+    return {
+        "requests": repeat,
+        "status": {str(code): count for code, count in statuses.items()},
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "queries": statistics.mean(queries),
+        "bytes": statistics.mean(sizes),
+    }
+
+
+def get_context(customer):
+    from django.db.models import F
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from benchmarks.fixtures import PASSWORD
+    from theatre.models import Genre, Performance, Play
+
+    busiest = (
+        Performance.objects.select_related("theatre_hall")
+        .order_by("-tickets_sold", "id")
+        .first()
+    )
+    # Writes go to the emptiest, largest performance, so they do not
+    # run out of seats during the run.
+    free = (
+        Performance.objects.select_related("theatre_hall")
+        .order_by(
+            F("tickets_sold")
+            - F("theatre_hall__rows") * F("theatre_hall__seats_in_row"),
+            "id",
+        )
+        .first()
+    )
+    return {
+        "performance_id": busiest.id,
+        "free_performance_id": free.id,
+        "seats_in_row": free.theatre_hall.seats_in_row,
+        "play_id": busiest.play_id,
+        "genre_id": Genre.objects.order_by("id").values_list(
+            "id", flat=True
+        ).first(),
+        "day": timezone.localdate(busiest.show_time).isoformat(),
+        "username": customer.username,
+        "password": PASSWORD,
+        "refresh": str(RefreshToken.for_user(customer)),
+        "plays": Play.objects.count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--plays", type=int, default=2000)
+    parser.add_argument("--performances", type=int, default=20000)
+    parser.add_argument("--tickets", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument(
+        "--only", nargs="*", help="Run only the cases with these names."
+    )
+    parser.add_argument(
+        "--keepdb",
+        action="store_true",
+        help="Keep the benchmark database and reuse it when seeded.",
+    )
+    parser.add_argument("--output", help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from benchmarks.fixtures import benchmark_database
+
+    # Failing endpoints show up in the report with their status code.
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    with benchmark_database(
+        args.keepdb,
+        plays=args.plays,
+        performances=args.performances,
+        tickets=args.tickets,
+        users=args.users,
+        seed=args.seed,
+    ) as (staff, customer, seeded):
+        context = get_context(customer)
+        headers = {
+            "user": {
+                "HTTP_AUTHORIZATION":
+                    f"Bearer {AccessToken.for_user(customer)}"
+            },
+            "staff": {
+                "HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(staff)}"
+            },
+            None: {},
+        }
+
+        client = APIClient(raise_request_exception=False)
+        results = {}
+        # Throttles still run, with buckets large enough for the repeats.
+        bursts = dict.fromkeys(settings.THROTTLE_BURSTS, 10 ** 6)
+        for case in build_cases(context):
+            if args.only and case.name not in args.only:
+                continue
+            with override_settings(THROTTLE_BURSTS=bursts):
+                results[case.name] = run_case(
+                    client, case, headers[case.auth], args.repeat
+                )
+            sys.stderr.write(
+                f"{case.name:28} p50 {results[case.name]['p50_ms']:8.2f}ms"
+                f"  queries {results[case.name]['queries']:6.1f}\n"
+            )
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "seeded": {
+                "plays": context["plays"],
+                "performances": args.performances,
+                "tickets": args.tickets,
+            } if seeded else "reused",
+            "repeat": args.repeat,
+        },
+        "endpoints": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
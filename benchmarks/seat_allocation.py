@@ -0,0 +1,76 @@
+"""Time best-block seat allocation on large halls.
+
+Runs without a database: seat maps are filled at random to the given
+occupancy and ``best_block`` is timed for several block sizes::
+
+    python -m benchmarks.seat_allocation --output allocation.json
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from theatre.allocation import best_block
+from theatre.seat_map import SeatMap
+
+HALLS = ((50, 100), (100, 100), (100, 200))
+OCCUPANCIES = (0.0, 0.5, 0.9)
+COUNTS = (2, 4, 8)
+
+
+def random_seat_map(rows, seats_in_row, occupancy, rng):
+    seat_map = SeatMap(rows, seats_in_row)
+    for row in range(1, rows + 1):
+        for seat in range(1, seats_in_row + 1):
+            if rng.random() < occupancy:
+                seat_map.take(row, seat)
+    return seat_map
+
+
+def time_allocation(seat_map, count, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        best_block(seat_map, count)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "mean_us": statistics.mean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report here.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    report = []
+    for rows, seats_in_row in HALLS:
+        for occupancy in OCCUPANCIES:
+            seat_map = random_seat_map(rows, seats_in_row, occupancy, rng)
+            for count in COUNTS:
+                report.append({
+                    "hall": f"{rows}x{seats_in_row}",
+                    "seats": rows * seats_in_row,
+                    "occupancy": occupancy,
+                    "count": count,
+                    "block": best_block(seat_map, count),
+                    **time_allocation(seat_map, count, args.repeat),
+                })
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
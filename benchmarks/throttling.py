@@ -0,0 +1,64 @@
+"""Time the token-bucket throttle check on its own.
+
+Runs ``allow_request`` against the configured cache for a single client
+and for many distinct clients, with buckets too large to run out::
+
+    DJANGO_SETTINGS_MODULE=theatre_api_service.settings \\
+        python -m benchmarks.throttling --repeat 100000
+"""
+import argparse
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api_service.settings")
+
+
+def _time(throttle, requests, repeat):
+    started = time.perf_counter()
+    for number in range(repeat):
+        throttle.allow_request(requests[number % len(requests)], None)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    django.setup()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory, override_settings
+    from rest_framework.request import Request
+
+    from theatre.throttling import TokenObtainThrottle
+
+    factory = RequestFactory()
+
+    def request(address):
+        request = Request(factory.post("/", REMOTE_ADDR=address))
+        request.user = AnonymousUser()
+        return request
+
+    clients = [
+        request(f"10.{number // 65536}.{number // 256 % 256}.{number % 256}")
+        for number in range(args.clients)
+    ]
+    report = {}
+    bursts = dict.fromkeys(settings.THROTTLE_BURSTS, 10 ** 9)
+    with override_settings(THROTTLE_BURSTS=bursts):
+        for name, requests in (("one_client", clients[:1]),
+                               ("many_clients", clients)):
+            report[f"{name}_us"] = _time(
+                TokenObtainThrottle(), requests, args.repeat
+            ) * 1e6
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.models import (
+    Genre,
+    TheatreHall,
+    Play,
+    Performance,
+)
+
+
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.play = Play.objects.create(
+            title="Play", description="Description"
+        )
+        self.play.genres.add(Genre.objects.create(name="Drama"))
+        self.performance = Performance.objects.create(
+            show_time="2022-06-02 14:00:00+00:00",
+            play=self.play,
+            theatre_hall=TheatreHall.objects.create(
+                name="Blue", rows=2, seats_in_row=2
+            ),
+        )
+
+    def assert_same_as_sync(self, name, args=None, params=None):
+        sync = self.client.get(reverse(f"theatre:{name}", args=args), params)
+        async_ = self.client.get(
+            reverse(f"theatre:async-{name}", args=args), params
+        )
+
+        self.assertEqual(async_.status_code, sync.status_code)
+        self.assertEqual(async_.json(), sync.json())
+
+    def test_lists_match_sync_endpoints(self):
+        for name in (
+            "genre-list",
+            "actor-list",
+            "theatrehall-list",
+            "play-list",
+            "performance-list",
+        ):
+            self.assert_same_as_sync(name)
+
+        self.assert_same_as_sync("play-list", params={"q": "play"})
+        self.assert_same_as_sync(
+            "performance-list", params={"date": "2022-06-02"}
+        )
+
+    def test_details_match_sync_endpoints(self):
+        self.assert_same_as_sync("play-detail", args=[self.play.id])
+        self.assert_same_as_sync(
+            "performance-detail", args=[self.performance.id]
+        )
+        self.assert_same_as_sync("performance-detail", args=[0])
+
+    def test_authentication_required(self):
+        self.client.credentials()
+
+        res = self.client.get(reverse("theatre:async-play-list"))
+
+        self.assertEqual(res.status_code, 401)
+        self.assertIn("WWW-Authenticate", res)
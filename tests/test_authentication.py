@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import user_cache
+
+
+GENRE_URL = reverse("theatre:genre-list")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345",
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_repeated_requests_skip_user_lookup(self):
+        self.client.get(GENRE_URL)
+
+        # The genre list itself is cached as well.
+        with self.assertNumQueries(0):
+            res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_first_request_loads_user(self):
+        self.client.get(GENRE_URL)
+        user_cache.clear()
+
+        with self.assertNumQueries(1):
+            self.client.get(GENRE_URL)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(GENRE_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_promoted_user_gets_staff_access(self):
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(GENRE_URL)
+        self.user.delete()
+
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_USER_CACHE_SECONDS=0)
+    def test_cache_can_be_disabled(self):
+        self.client.get(GENRE_URL)
+
+        with self.assertNumQueries(1):
+            self.client.get(GENRE_URL)
+
+    def test_request_user_changes_do_not_leak_into_cache(self):
+        res = self.client.get(GENRE_URL)
+        res.wsgi_request.user.is_staff = True
+
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,130 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    Ticket,
+    CalendarDay,
+)
+
+CALENDAR_URL = reverse("theatre:calendarday-list")
+
+
+class CalendarTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.hall = TheatreHall.objects.create(
+            name="Blue", rows=2, seats_in_row=5
+        )
+        self.play = Play.objects.create(
+            title="Play", description="Description"
+        )
+        # 22:30 UTC is already the next day in Kyiv.
+        self.performances = [
+            Performance.objects.create(
+                show_time=show_time, play=self.play, theatre_hall=self.hall
+            )
+            for show_time in (
+                "2022-06-02 10:00:00+00:00",
+                "2022-06-02 15:00:00+00:00",
+                "2022-06-02 22:30:00+00:00",
+            )
+        ]
+        self.reservation = Reservation.objects.create(user=self.user)
+
+    def calendar(self, **params):
+        res = self.client.get(
+            CALENDAR_URL,
+            {"date_from": "2022-06-01", "date_to": "2022-06-30", **params},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [
+            (day["date"], day["performances"], day["seats_remaining"])
+            for day in res.data
+        ]
+
+    def test_days_follow_performance_writes(self):
+        self.assertEqual(
+            self.calendar(),
+            [("2022-06-02", 2, 20), ("2022-06-03", 1, 10)],
+        )
+
+        performance = self.performances[2]
+        performance.show_time = "2022-06-02 12:00:00+00:00"
+        performance.save()
+        self.performances[0].delete()
+
+        self.assertEqual(self.calendar(), [("2022-06-02", 2, 20)])
+
+    def test_days_follow_ticket_writes(self):
+        ticket = Ticket.objects.create(
+            performance=self.performances[0],
+            reservation=self.reservation,
+            row=1,
+            seat=1,
+        )
+        Ticket.objects.create(
+            performance=self.performances[1],
+            reservation=self.reservation,
+            row=1,
+            seat=1,
+        )
+        ticket.delete()
+
+        self.assertEqual(self.calendar()[0], ("2022-06-02", 2, 19))
+
+    def test_hall_resize(self):
+        self.hall.rows = 3
+        self.hall.save()
+
+        self.assertEqual(self.calendar()[0], ("2022-06-02", 2, 30))
+
+    def test_one_query(self):
+        other = Play.objects.create(title="Other", description="Description")
+        Performance.objects.create(
+            show_time="2022-06-10 10:00:00+00:00",
+            play=other,
+            theatre_hall=self.hall,
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.calendar()), 3)
+        self.assertEqual(len(self.calendar(play=other.id)), 1)
+
+    def test_invalid_range(self):
+        res = self.client.get(
+            CALENDAR_URL, {"date_from": "2022-06-01", "date_to": "2024-06-01"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command(self):
+        CalendarDay.objects.all().delete()
+        Ticket.objects.create(
+            performance=self.performances[0],
+            reservation=self.reservation,
+            row=1,
+            seat=1,
+        )
+
+        call_command("rebuild_calendar", stdout=StringIO())
+
+        self.assertEqual(
+            self.calendar(),
+            [("2022-06-02", 2, 19), ("2022-06-03", 1, 10)],
+        )
@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from theatre import cache as response_cache
+from theatre.models import Genre, Play
+
+
+GENRE_URL = reverse("theatre:genre-list")
+PLAY_URL = reverse("theatre:play-list")
+CACHE_STATS_URL = reverse("theatre:cache-stats")
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        response_cache._stats.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="admin@test.ua",
+            password="pwd12345",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_list_is_served_from_cache(self):
+        Genre.objects.create(name="Drama")
+        self.client.get(GENRE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(GENRE_URL)
+
+        self.assertEqual([genre["name"] for genre in res.data], ["Drama"])
+
+    def test_cache_miss_reads_from_primary(self):
+        with mock.patch("theatre.cache.pin_to_primary") as pin:
+            self.client.get(GENRE_URL)
+            self.assertEqual(pin.call_count, 1)
+
+            self.client.get(GENRE_URL)
+            self.assertEqual(pin.call_count, 1)
+
+    def test_model_change_invalidates_cached_list(self):
+        self.client.get(GENRE_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            Genre.objects.create(name="Comedy")
+
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual([genre["name"] for genre in res.data], ["Comedy"])
+
+    def test_m2m_change_invalidates_play_list(self):
+        play = Play.objects.create(title="Play", description="Description")
+        self.client.get(PLAY_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            play.genres.add(Genre.objects.create(name="Drama"))
+
+        res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res.data["results"][0]["genres"], ["Drama"])
+
+    def test_version_is_bumped_after_commit(self):
+        self.client.get(GENRE_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            Genre.objects.create(name="Comedy")
+            # Before commit the old list is still the current one.
+            res = self.client.get(GENRE_URL)
+            self.assertEqual(res.data, [])
+
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual([genre["name"] for genre in res.data], ["Comedy"])
+
+    def test_query_params_are_normalized(self):
+        self.client.get(PLAY_URL, {"title": "a", "genres": "1"})
+        self.client.get(PLAY_URL, {"genres": "1", "title": "a"})
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(
+            res.data["PlayViewSet"], {"hits": 1, "misses": 1}
+        )
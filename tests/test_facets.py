@@ -0,0 +1,179 @@
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from theatre import facets
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+
+
+def counts(facet):
+    return {bucket["name"]: bucket["count"] for bucket in facet}
+
+
+class FacetTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua", password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.drama = Genre.objects.create(name="Drama")
+        self.comedy = Genre.objects.create(name="Comedy")
+        self.ann = Actor.objects.create(first_name="Ann", last_name="Lee")
+        self.bob = Actor.objects.create(first_name="Bob", last_name="Ray")
+        self.plays = []
+        for title, genres, actors in (
+            ("Hamlet", [self.drama], [self.ann]),
+            ("Macbeth", [self.drama], [self.bob]),
+            ("Tartuffe", [self.comedy], [self.ann]),
+            ("Both", [self.drama, self.comedy], [self.ann, self.bob]),
+        ):
+            play = Play.objects.create(title=title, description="Text")
+            play.genres.set(genres)
+            play.actors.set(actors)
+            self.plays.append(play)
+
+        hall = TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=5)
+        self.today = timezone.localdate()
+        for play, day_offsets in zip(self.plays, ([0, 1], [1], [1, 2], [])):
+            for offset in day_offsets:
+                Performance.objects.create(
+                    play=play,
+                    theatre_hall=hall,
+                    show_time=timezone.make_aware(datetime.combine(
+                        self.today + timedelta(days=offset), time(19)
+                    )),
+                )
+
+    def test_play_facets(self):
+        res = self.client.get(PLAY_URL, {"facets": "true"})
+
+        facets = res.data["facets"]
+        self.assertEqual(counts(facets["genres"]), {"Drama": 3, "Comedy": 2})
+        self.assertEqual(
+            counts(facets["actors"]), {"Ann Lee": 3, "Bob Ray": 2}
+        )
+        self.assertEqual(
+            facets["genres"][0],
+            {"id": self.drama.id, "name": "Drama", "count": 3},
+        )
+
+    def test_play_facets_are_disjunctive(self):
+        res = self.client.get(
+            PLAY_URL, {"facets": "1", "genres": str(self.comedy.id)}
+        )
+
+        self.assertEqual(
+            sorted(play["title"] for play in res.data["results"]),
+            ["Both", "Tartuffe"],
+        )
+        facets = res.data["facets"]
+        # Own filter ignored, the other facets narrowed by it.
+        self.assertEqual(counts(facets["genres"]), {"Drama": 3, "Comedy": 2})
+        self.assertEqual(
+            counts(facets["actors"]), {"Ann Lee": 2, "Bob Ray": 1}
+        )
+
+    def test_play_facets_follow_other_filters(self):
+        res = self.client.get(
+            PLAY_URL, {"facets": "true", "actors": str(self.bob.id)}
+        )
+
+        self.assertEqual(
+            counts(res.data["facets"]["genres"]), {"Drama": 2, "Comedy": 1}
+        )
+
+    def test_play_facets_in_bounded_queries(self):
+        with self.assertNumQueries(4):
+            self.client.get(PLAY_URL, {"facets": "true", "title": "a"})
+
+    def test_no_facets_by_default(self):
+        res = self.client.get(PLAY_URL)
+
+        self.assertNotIn("facets", res.data)
+
+    def test_performance_facets(self):
+        res = self.client.get(
+            PERFORMANCE_URL,
+            {"facets": "true", "date": str(self.today + timedelta(days=1))},
+        )
+
+        self.assertEqual(len(res.data["results"]), 3)
+        facets = res.data["facets"]
+        self.assertEqual(
+            facets["dates"],
+            [
+                {"date": str(self.today + timedelta(days=offset)),
+                 "count": count}
+                for offset, count in ((0, 1), (1, 3), (2, 1))
+            ],
+        )
+        self.assertEqual(counts(facets["genres"]), {"Drama": 2, "Comedy": 1})
+        self.assertEqual(
+            counts(facets["actors"]), {"Ann Lee": 2, "Bob Ray": 1}
+        )
+
+    def test_performance_relation_filters(self):
+        res = self.client.get(
+            PERFORMANCE_URL,
+            {"facets": "true", "genres": str(self.comedy.id)},
+        )
+
+        self.assertEqual(
+            [item["play_title"] for item in res.data["results"]],
+            ["Tartuffe", "Tartuffe"],
+        )
+        facets = res.data["facets"]
+        self.assertEqual(
+            [bucket["count"] for bucket in facets["dates"]], [1, 1]
+        )
+        self.assertEqual(counts(facets["genres"]), {"Drama": 3, "Comedy": 2})
+
+    def test_play_entering_calendar_between_queries(self):
+        late = list(facets.card_ids(Play.objects.filter(title="Both"), "id"))
+        card_ids = facets.card_ids
+
+        with mock.patch(
+            "theatre.facets.card_ids",
+            side_effect=lambda *args: [*card_ids(*args), *late],
+        ):
+            result = facets.performance_facets(day=self.today)
+
+        self.assertEqual(counts(result["genres"]), {"Drama": 1, "Comedy": 0})
+
+    def test_invalid_ids(self):
+        for url, param, value in (
+            (PLAY_URL, "genres", "1,drama"),
+            (PERFORMANCE_URL, "actors", "x"),
+            (PERFORMANCE_URL, "play", "hamlet"),
+            (reverse("theatre:async-performance-list"), "play", "hamlet"),
+        ):
+            with self.subTest(param=param):
+                res = self.client.get(url, {"facets": "true", param: value})
+
+                self.assertEqual(res.status_code, 400)
+                self.assertEqual(list(res.json()), [param])
+
+    def test_selected_values_are_always_listed(self):
+        other = Genre.objects.create(name="Opera")
+        with self.settings(FACET_LIMIT=1):
+            res = self.client.get(
+                PLAY_URL, {"facets": "true", "genres": str(other.id)}
+            )
+
+        self.assertEqual(
+            counts(res.data["facets"]["genres"]), {"Drama": 3, "Opera": 0}
+        )
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.instrumentation import SQLInstrumentationMiddleware
+from theatre.models import Genre, Play
+
+
+@override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=1.0)
+class SQLInstrumentationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        play = Play.objects.create(title="Play", description="Description")
+        play.genres.add(Genre.objects.create(name="Drama"))
+
+    def server_timing(self, response):
+        timings = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, duration, *desc = metric.split(";")
+            timings[name] = (float(duration[len("dur="):]), desc)
+        return timings
+
+    def test_server_timing_and_log_line(self):
+        url = reverse("theatre:play-detail", args=[Play.objects.get().id])
+        with self.assertLogs("theatre.instrumentation", "INFO") as logs:
+            res = self.client.get(url)
+
+        timings = self.server_timing(res)
+        self.assertEqual(
+            set(timings), {"db", "serializer", "view", "total"}
+        )
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line["path"], url)
+        self.assertEqual(line["status"], 200)
+        # The play, its genres and its actors.
+        self.assertEqual(line["queries"], 3)
+        self.assertEqual(timings["db"][1], ['desc="3 queries"'])
+        self.assertGreater(line["serializer_ms"], 0)
+
+    @override_settings(SQL_SLOW_QUERY_MS=0)
+    def test_slow_queries_logged_with_stack(self):
+        with self.assertLogs(
+            "theatre.instrumentation.slow_query", "WARNING"
+        ) as logs:
+            self.client.get(reverse("theatre:genre-list"))
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertIn("theatre_genre", entry["sql"])
+        self.assertTrue(
+            any("theatre" in frame for frame in entry["stack"])
+        )
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_untouched(self):
+        res = self.client.get(reverse("theatre:genre-list"))
+
+        self.assertNotIn("Server-Timing", res)
+
+    async def test_async_middleware_times_queries(self):
+        async def get_response(request):
+            count = await sync_to_async(Genre.objects.count)()
+            return HttpResponse(str(count))
+
+        middleware = SQLInstrumentationMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+
+        with self.assertLogs("theatre.instrumentation", "INFO"):
+            res = await middleware(RequestFactory().get("/"))
+
+        self.assertEqual(res.content, b"1")
+        self.assertEqual(
+            self.server_timing(res)["db"][1], ['desc="1 queries"']
+        )
+
+    async def test_asgi_request_is_timed(self):
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        with self.assertLogs("theatre.instrumentation", "INFO") as logs:
+            res = await self.async_client.get(
+                reverse("theatre:async-genre-list"),
+                AUTHORIZATION=f"Bearer {token}",
+            )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("Server-Timing", res)
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertGreater(line["queries"], 0)
@@ -0,0 +1,378 @@
+import base64
+import json
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.signals import pre_save
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    SeatHold,
+    Ticket,
+    CalendarDay,
+)
+
+
+def sample_performance(**params):
+    theatre_hall = TheatreHall.objects.create(
+        name="Blue", rows=3, seats_in_row=5
+    )
+    play = Play.objects.create(title="Play", description="Description")
+
+    defaults = {
+        "show_time": "2022-06-02 14:00:00+00:00",
+        "play": play,
+        "theatre_hall": theatre_hall,
+    }
+    defaults.update(params)
+
+    return Performance.objects.create(**defaults)
+
+
+def detail_url(performance_id):
+    return reverse("theatre:performance-detail", args=[performance_id])
+
+
+class PerformanceSeatMapTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+        self.reservation = Reservation.objects.create(user=self.user)
+
+    def book(self, row, seat):
+        return Ticket.objects.create(
+            performance=self.performance,
+            reservation=self.reservation,
+            row=row,
+            seat=seat,
+        )
+
+    def test_seat_map_tracks_ticket_writes(self):
+        self.book(1, 1)
+        ticket = self.book(3, 5)
+        self.book(2, 3)
+        ticket.delete()
+
+        res = self.client.get(detail_url(self.performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        seat_map = res.data["seat_map"]
+        self.assertEqual(seat_map["rows"], 3)
+        self.assertEqual(seat_map["seats_in_row"], 5)
+        # Bits 0 and 7 are (1, 1) and (2, 3) in a 3x5 hall.
+        self.assertEqual(
+            base64.b64decode(seat_map["bitmap"]), bytes([0x81, 0x00])
+        )
+        self.assertNotIn("taken_places", res.data)
+
+    def test_taken_places_list_by_query_param(self):
+        self.book(2, 4)
+
+        res = self.client.get(
+            detail_url(self.performance.id), {"taken_places": "list"}
+        )
+
+        self.assertEqual(res.data["taken_places"], [{"row": 2, "seat": 4}])
+        self.assertIn("seat_map", res.data)
+
+
+class PerformanceTicketsSoldTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        for seat in (1, 2, 3):
+            Ticket.objects.create(
+                performance=self.performance,
+                reservation=reservation,
+                row=1,
+                seat=seat,
+            )
+
+    def test_counter_follows_ticket_writes(self):
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 3)
+
+        Ticket.objects.filter(seat=2).delete()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_reservation_delete_releases_seats_at_once(self):
+        reservation = Reservation.objects.get()
+        for seat in (4, 5):
+            Ticket.objects.create(
+                performance=self.performance,
+                reservation=reservation,
+                row=2,
+                seat=seat,
+            )
+
+        # One lock and two updates for the performance, not per ticket.
+        with self.assertNumQueries(9):
+            reservation.delete()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 0)
+        self.assertFalse(self.performance.seat_map.is_taken(2, 4))
+        self.assertEqual(CalendarDay.objects.get().tickets_sold, 0)
+
+    def test_performance_delete_skips_seat_release(self):
+        with self.assertNumQueries(7):
+            self.performance.delete()
+
+        self.assertFalse(Ticket.objects.exists())
+        self.assertFalse(CalendarDay.objects.exists())
+
+    def test_list_reads_counter(self):
+        res = self.client.get(reverse("theatre:performance-list"))
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 12)
+
+    def test_stale_edit_keeps_seat_state(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin@test.ua", password="pwd12345"
+        )
+        self.client.force_authenticate(admin)
+
+        def sell_during_edit(sender, instance, **kwargs):
+            # A sale committed between the view's read and its save.
+            pre_save.disconnect(sell_during_edit, sender=Performance)
+            Ticket.objects.create(
+                performance=self.performance,
+                reservation=Reservation.objects.first(),
+                row=2,
+                seat=1,
+            )
+
+        pre_save.connect(sell_during_edit, sender=Performance)
+        self.addCleanup(
+            pre_save.disconnect, sell_during_edit, sender=Performance
+        )
+        res = self.client.patch(
+            detail_url(self.performance.id),
+            {"show_time": "2022-06-02 15:00:00+00:00"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 4)
+        self.assertTrue(self.performance.seat_map.is_taken(2, 1))
+        self.assertEqual(CalendarDay.objects.get().tickets_sold, 4)
+
+    def test_saving_loaded_instance_keeps_seat_state(self):
+        stale = Performance.objects.get(pk=self.performance.pk)
+        Ticket.objects.create(
+            performance=self.performance,
+            reservation=Reservation.objects.first(),
+            row=2,
+            seat=1,
+        )
+
+        for args, kwargs in (
+            ((), {}),
+            ((False, False), {}),
+            ((), {"force_update": True}),
+        ):
+            with self.subTest(args=args, kwargs=kwargs):
+                stale.save(*args, **kwargs)
+
+                self.performance.refresh_from_db()
+                self.assertEqual(self.performance.tickets_sold, 4)
+                self.assertTrue(self.performance.seat_map.is_taken(2, 1))
+
+    def test_recount_command_repairs_drift(self):
+        Performance.objects.update(tickets_sold=0)
+
+        call_command("recount_tickets_sold", stdout=StringIO())
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 3)
+
+
+class PerformancePaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        performance = sample_performance()
+        self.performances = [performance] + [
+            Performance.objects.create(
+                show_time=f"2022-06-0{day} 14:00:00+00:00",
+                play=performance.play,
+                theatre_hall=performance.theatre_hall,
+            )
+            for day in (2, 3, 3, 4)
+        ]
+
+    def test_cursor_pages_cover_schedule_in_order(self):
+        url = reverse("theatre:performance-list") + "?page_size=2"
+        ids = []
+        previous_pages = []
+        while url:
+            res = self.client.get(url)
+            previous_pages.append(res.data["previous"])
+            ids.extend(item["id"] for item in res.data["results"])
+            url = res.data["next"]
+
+        expected = list(
+            Performance.objects.order_by("-show_time", "-id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertIsNone(previous_pages[0])
+
+        res = self.client.get(previous_pages[-1])
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], expected[2:4]
+        )
+
+    def test_invalid_cursor(self):
+        for cursor in (
+            "broken",
+            self.encode({"p": [1, 1]}),
+            self.encode({"p": ["2022-06-02T14:00:00+00:00", None]}),
+            self.encode([1, 2]),
+        ):
+            with self.subTest(cursor=cursor):
+                res = self.client.get(
+                    reverse("theatre:performance-list"), {"cursor": cursor}
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @staticmethod
+    def encode(cursor):
+        return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+class PerformanceConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+        self.reservation = Reservation.objects.create(user=self.user)
+
+    def get(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_detail_is_not_modified(self):
+        url = detail_url(self.performance.id)
+        res = self.client.get(url, {"taken_places": "list"})
+        self.assertIn("Last-Modified", res)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                url, {"taken_places": "list"}, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn("ETag", res)
+
+    def test_ticket_and_hold_writes_change_etag(self):
+        url = detail_url(self.performance.id)
+        etag = self.client.get(url)["ETag"]
+
+        Ticket.objects.create(
+            performance=self.performance,
+            reservation=self.reservation,
+            row=1,
+            seat=1,
+        )
+        res = self.get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res["ETag"]
+
+        self.client.post(
+            reverse("theatre:performance-hold", args=[self.performance.id]),
+            {"seats": [{"row": 1, "seat": 2}]},
+            format="json",
+        )
+        res = self.get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res["ETag"]
+
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        res = self.get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_follows_page_rows(self):
+        url = reverse("theatre:performance-list")
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(
+            self.get(url, etag).status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        Ticket.objects.create(
+            performance=self.performance,
+            reservation=self.reservation,
+            row=1,
+            seat=1,
+        )
+        res = self.get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 14)
+
+    def test_related_changes_update_last_modified(self):
+        url = detail_url(self.performance.id)
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified
+            ).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+        later = time.time() + 60
+        with mock.patch("theatre.cache.time.time", return_value=later):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.performance.play.title = "Renamed"
+                self.performance.play.save()
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Last-Modified"], http_date(later))
+
+    def test_missing_performance(self):
+        for pk in (0, "abc"):
+            with self.subTest(pk=pk):
+                res = self.client.get(detail_url(pk))
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+                self.assertNotIn("ETag", res)
@@ -0,0 +1,130 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from theatre.models import Actor, Genre, Play
+
+
+PLAY_URL = reverse("theatre:play-list")
+
+
+def card(play):
+    play = Play.objects.get(pk=play.pk)
+    return play.genre_names, play.actor_names
+
+
+class PlayCardTests(TestCase):
+    def setUp(self) -> None:
+        self.drama = Genre.objects.create(name="Drama")
+        self.comedy = Genre.objects.create(name="Comedy")
+        self.actor = Actor.objects.create(first_name="Ann", last_name="Lee")
+        self.play = Play.objects.create(title="Play", description="Text")
+        self.play.genres.add(self.comedy, self.drama)
+        self.play.actors.add(self.actor)
+
+    def test_relations_fill_card(self):
+        self.assertEqual(card(self.play), (["Drama", "Comedy"], ["Ann Lee"]))
+        self.assertEqual(self.play.genre_names, ["Drama", "Comedy"])
+
+    def test_remove_and_clear(self):
+        self.play.genres.remove(self.drama)
+        self.play.actors.clear()
+
+        self.assertEqual(card(self.play), (["Comedy"], []))
+
+    def test_reverse_relations(self):
+        other = Play.objects.create(title="Other", description="Text")
+        self.drama.play_set.add(other)
+        self.assertEqual(card(other), (["Drama"], []))
+
+        self.drama.play_set.clear()
+
+        self.assertEqual(card(other), ([], []))
+        self.assertEqual(card(self.play), (["Comedy"], ["Ann Lee"]))
+
+    def test_rename_updates_cards(self):
+        self.drama.name = "Tragedy"
+        self.drama.save()
+        self.actor.last_name = "Smith"
+        self.actor.save()
+
+        self.assertEqual(
+            card(self.play), (["Tragedy", "Comedy"], ["Ann Smith"])
+        )
+
+    def test_delete_updates_cards(self):
+        self.comedy.delete()
+        self.actor.delete()
+
+        self.assertEqual(card(self.play), (["Drama"], []))
+
+    def test_saving_stale_instance_keeps_card(self):
+        stale = Play.objects.get(pk=self.play.pk)
+        self.play.genres.clear()
+
+        stale.title = "Renamed"
+        stale.save()
+
+        self.assertEqual(card(self.play), ([], ["Ann Lee"]))
+
+    def test_command_repairs_drift(self):
+        Play.objects.filter(pk=self.play.pk).update(genre_names=["Opera"])
+        out = StringIO()
+
+        call_command("check_play_cards", "--dry-run", stdout=out)
+        self.assertIn("Found 1 drifted card(s)", out.getvalue())
+        self.assertEqual(card(self.play)[0], ["Opera"])
+
+        call_command("check_play_cards", stdout=out)
+        self.assertEqual(card(self.play)[0], ["Drama", "Comedy"])
+
+
+class PlayListQueryTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua", password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.genres = [
+            Genre.objects.create(name=name) for name in ("Drama", "Comedy")
+        ]
+        actor = Actor.objects.create(first_name="Ann", last_name="Lee")
+        for number in range(20):
+            play = Play.objects.create(
+                title=f"Play {number}", description="Text"
+            )
+            play.genres.add(*self.genres)
+            play.actors.add(actor)
+
+    def test_list_is_one_query_for_any_page_size(self):
+        for page_size in (5, 20):
+            cache.clear()
+            with self.assertNumQueries(1):
+                res = self.client.get(PLAY_URL, {"page_size": page_size})
+
+            self.assertEqual(len(res.data["results"]), page_size)
+            self.assertEqual(
+                res.data["results"][0]["genres"], ["Drama", "Comedy"]
+            )
+            self.assertEqual(res.data["results"][0]["actors"], ["Ann Lee"])
+
+    def test_filters_do_not_repeat_plays(self):
+        res = self.client.get(
+            PLAY_URL,
+            {
+                "genres": ",".join(str(genre.id) for genre in self.genres),
+                "page_size": 100,
+            },
+        )
+
+        ids = [play["id"] for play in res.data["results"]]
+        self.assertEqual(len(ids), 20)
+        self.assertEqual(len(set(ids)), 20)
@@ -0,0 +1,127 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Genre,
+    Actor,
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    Ticket,
+)
+
+
+LARGE_TABLES = {
+    "theatre_play",
+    "theatre_performance",
+    "theatre_reservation",
+    "theatre_ticket",
+}
+
+
+def capture_selects(callback):
+    statements = []
+
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT"):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        callback()
+    return statements
+
+
+def seq_scanned_tables(sql, params):
+    """Return the large tables that ``sql`` reads without an index."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Make the planner pick any usable index over a seq scan, so
+            # a remaining seq scan means no index fits the access path.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            scanned = re.findall(r"Seq Scan on (\w+)", plan)
+        else:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = "\n".join(row[-1] for row in cursor.fetchall())
+            scanned = re.findall(r"^SCAN (\w+)$", plan, re.MULTILINE)
+    return LARGE_TABLES.intersection(scanned), plan
+
+
+class ViewSetQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        genre = Genre.objects.create(name="Drama")
+        actor = Actor.objects.create(first_name="George", last_name="Clooney")
+        hall = TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=5)
+        cls.play = Play.objects.create(title="Play", description="Drama")
+        cls.play.genres.add(genre)
+        cls.play.actors.add(actor)
+        cls.performance = Performance.objects.create(
+            show_time="2022-06-02 14:00:00+00:00",
+            play=cls.play,
+            theatre_hall=hall,
+        )
+        reservation = Reservation.objects.create(user=cls.user)
+        Ticket.objects.create(
+            performance=cls.performance,
+            reservation=reservation,
+            row=1,
+            seat=1,
+        )
+        cls.genre, cls.actor = genre, actor
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_no_seq_scans(self, url, params=None):
+        statements = capture_selects(lambda: self.client.get(url, params))
+        self.assertTrue(statements)
+        for sql, sql_params in statements:
+            tables, plan = seq_scanned_tables(sql, sql_params)
+            self.assertFalse(
+                tables, f"Seq scan on {tables} for {url}:\n{sql}\n{plan}"
+            )
+
+    def test_performance_list(self):
+        url = reverse("theatre:performance-list")
+        self.assert_no_seq_scans(url)
+        self.assert_no_seq_scans(url, {"date": "2022-06-02"})
+        self.assert_no_seq_scans(url, {"play": self.play.id})
+
+    def test_performance_detail(self):
+        url = reverse(
+            "theatre:performance-detail", args=[self.performance.id]
+        )
+        self.assert_no_seq_scans(url)
+        self.assert_no_seq_scans(url, {"taken_places": "list"})
+
+    def test_play_list(self):
+        url = reverse("theatre:play-list")
+        self.assert_no_seq_scans(url)
+        self.assert_no_seq_scans(url, {"actors": str(self.actor.id)})
+        self.assert_no_seq_scans(url, {"genres": str(self.genre.id)})
+        self.assert_no_seq_scans(url, {"q": "drama"})
+
+    def test_play_detail(self):
+        self.assert_no_seq_scans(
+            reverse("theatre:play-detail", args=[self.play.id])
+        )
+
+    def test_reservation_list(self):
+        self.assert_no_seq_scans(reverse("theatre:reservation-list"))
@@ -0,0 +1,134 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+from collections import OrderedDict
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from theatre.parsers import FastJSONParser
+from theatre.renderers import (
+    FastJSONRenderer,
+    StreamingJSONRenderer,
+    orjson,
+)
+
+
+DATA = ReturnDict(
+    [
+        ("id", 1),
+        ("title", "Ромео і Джульєтта\u2028\u2029"),
+        ("show_time", datetime.datetime(
+            2022, 6, 2, 14, 0, 0, 123456, tzinfo=datetime.timezone.utc
+        )),
+        ("naive", datetime.datetime(2022, 6, 2, 14, 0)),
+        ("day", datetime.date(2022, 6, 2)),
+        ("at", datetime.time(14, 30, 15)),
+        ("price", decimal.Decimal("12.50")),
+        ("uuid", uuid.UUID("12345678-1234-5678-1234-567812345678")),
+        ("label", gettext_lazy("Play")),
+        ("duration", datetime.timedelta(minutes=90)),
+        ("tags", ReturnList([OrderedDict(a=None, b=True)], serializer=None)),
+        ("empty", {}),
+        ("ratio", 0.1),
+        ("big", 2 ** 70),
+    ],
+    serializer=None,
+)
+
+
+@skipIf(orjson is None, "orjson is not installed")
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+        )
+
+    def test_uses_orjson(self):
+        with mock.patch("theatre.renderers.orjson.dumps") as dumps:
+            dumps.return_value = b"{}"
+            FastJSONRenderer().render({"id": 1})
+
+        dumps.assert_called_once()
+
+    def test_indent_uses_stdlib_encoder(self):
+        media_type = "application/json; indent=4"
+
+        self.assertEqual(
+            FastJSONRenderer().render(DATA, media_type),
+            JSONRenderer().render(DATA, media_type),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_unserializable_value_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render({"value": object()})
+
+
+class FallbackTests(SimpleTestCase):
+    def test_renderer_without_orjson(self):
+        with mock.patch("theatre.renderers.orjson", None):
+            self.assertEqual(
+                FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+            )
+
+    def test_parser_without_orjson(self):
+        with mock.patch("theatre.parsers.orjson", None):
+            data = FastJSONParser().parse(io.BytesIO(b'{"row": 1}'))
+
+        self.assertEqual(data, {"row": 1})
+
+
+class StreamingJSONRendererTests(SimpleTestCase):
+    def test_stream_joins_into_whole_array(self):
+        renderer = StreamingJSONRenderer()
+        renderer.chunk_size = 2
+        items = [{"id": number, "seat": None} for number in range(5)]
+
+        chunks = list(renderer.stream(iter(items + [None])))
+
+        self.assertEqual(
+            b"".join(chunks), JSONRenderer().render(items + [None])
+        )
+        self.assertEqual(len(chunks), 5)
+
+    def test_empty_stream(self):
+        self.assertEqual(
+            b"".join(StreamingJSONRenderer().stream([])), b"[]"
+        )
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parses_like_drf_parser(self):
+        body = json.dumps(
+            {"tickets": [{"row": 1, "seat": 2, "title": "Ромео"}]}
+        ).encode()
+
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_other_encoding(self):
+        body = '{"title": "Ромео"}'.encode("utf-16")
+
+        data = FastJSONParser().parse(
+            io.BytesIO(body), parser_context={"encoding": "utf-16"}
+        )
+
+        self.assertEqual(data, {"title": "Ромео"})
+
+    def test_invalid_json(self):
+        for body in (b'{"row": ', b'{"row": NaN}', b"\xff"):
+            with self.subTest(body=body):
+                with self.assertRaisesRegex(ParseError, "JSON parse error"):
+                    FastJSONParser().parse(io.BytesIO(body))
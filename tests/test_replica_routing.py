@@ -0,0 +1,152 @@
+import asyncio
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.models import Play
+from theatre_api_service.routers import (
+    PrimaryReplicaRouter,
+    ReplicaRoutingMiddleware,
+)
+
+
+router = PrimaryReplicaRouter()
+
+
+def view(status=200, write=False):
+    def get_response(request):
+        aliases = [router.db_for_read(Play)]
+        if write:
+            router.db_for_write(Play)
+            aliases.append(router.db_for_read(Play))
+        response = HttpResponse(status=status)
+        response.aliases = aliases
+        return response
+
+    return get_response
+
+
+def bearer(user_id):
+    token = AccessToken()
+    token[api_settings.USER_ID_CLAIM] = user_id
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+@override_settings(REPLICA_DATABASES=["replica_0"])
+class ReplicaRoutingTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def call(self, request, **kwargs):
+        return ReplicaRoutingMiddleware(view(**kwargs))(request)
+
+    def test_safe_requests_read_from_replica(self):
+        for method in ("get", "head", "options"):
+            with self.subTest(method=method):
+                request = getattr(self.factory, method)("/api/theatre/")
+                response = self.call(request)
+
+                self.assertEqual(response.aliases, ["replica_0"])
+
+    def test_writes_use_primary_and_set_sticky_cookie(self):
+        response = self.call(self.factory.post("/"), status=201)
+
+        self.assertEqual(response.aliases, ["default"])
+        cookie = response.cookies["primary_reads"]
+        self.assertEqual(cookie["max-age"], 5)
+        self.assertTrue(cookie["httponly"])
+
+    def test_reads_stick_to_primary_after_write(self):
+        request = self.factory.get("/")
+        request.COOKIES["primary_reads"] = "1"
+
+        response = self.call(request)
+
+        self.assertEqual(response.aliases, ["default"])
+
+    def test_token_users_read_from_primary_after_write(self):
+        self.call(self.factory.post("/", **bearer(1)), status=201)
+
+        # Without the cookie, which API clients rarely keep.
+        response = self.call(self.factory.get("/", **bearer(1)))
+        self.assertEqual(response.aliases, ["default"])
+
+        response = self.call(self.factory.get("/", **bearer(2)))
+        self.assertEqual(response.aliases, ["replica_0"])
+
+        response = self.call(
+            self.factory.get("/", HTTP_AUTHORIZATION="Bearer invalid")
+        )
+        self.assertEqual(response.aliases, ["replica_0"])
+
+    def test_failed_write_is_not_sticky(self):
+        response = self.call(self.factory.post("/"), status=400)
+
+        self.assertNotIn("primary_reads", response.cookies)
+
+    def test_write_during_read_pins_request_to_primary(self):
+        response = self.call(self.factory.get("/"), write=True)
+
+        self.assertEqual(response.aliases, ["replica_0", "default"])
+        self.assertEqual(router.db_for_read(Play), "default")
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(router.db_for_read(Play), "default")
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_without_replicas(self):
+        response = self.call(self.factory.post("/"), status=201)
+
+        self.assertEqual(response.aliases, ["default"])
+        self.assertNotIn("primary_reads", response.cookies)
+
+    async def test_async_requests(self):
+        sync_view = view(status=201)
+
+        async def get_response(request):
+            return sync_view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+
+        response = await middleware(self.factory.get("/"))
+        self.assertEqual(response.aliases, ["replica_0"])
+        response = await middleware(self.factory.post("/", **bearer(1)))
+        self.assertEqual(response.aliases, ["default"])
+        self.assertIn("primary_reads", response.cookies)
+        response = await middleware(self.factory.get("/", **bearer(1)))
+        self.assertEqual(response.aliases, ["default"])
+
+    def test_migrations_run_on_primary_only(self):
+        self.assertTrue(router.allow_migrate("default", "theatre"))
+        self.assertFalse(router.allow_migrate("replica_0", "theatre"))
+
+
+@override_settings(REPLICA_DATABASES=["replica_0"])
+class TransactionRoutingTests(TestCase):
+    def test_reads_in_transaction_use_primary(self):
+        # TestCase runs every test inside a transaction.
+        response = ReplicaRoutingMiddleware(view())(
+            RequestFactory().get("/")
+        )
+
+        self.assertEqual(response.aliases, ["default"])
+
+    async def test_asgi_write_sets_sticky_cookie(self):
+        cache.clear()
+
+        response = await self.async_client.post(
+            reverse("user:create"),
+            {"username": "new@test.ua", "password": "pwd12345"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("primary_reads", response.cookies)
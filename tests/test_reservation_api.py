@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import serializers, status
+
+from theatre.booking import with_retries
+
+from theatre.models import (
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    Ticket,
+)
+
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def sample_performance(**params):
+    theatre_hall = TheatreHall.objects.create(
+        name="Blue", rows=10, seats_in_row=10
+    )
+    play = Play.objects.create(title="Play", description="Description")
+
+    defaults = {
+        "show_time": "2022-06-02 14:00:00+00:00",
+        "play": play,
+        "theatre_hall": theatre_hall,
+    }
+    defaults.update(params)
+
+    return Performance.objects.create(**defaults)
+
+
+class ReservationApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def reserve(self, seats):
+        payload = {
+            "tickets": [
+                {"row": row, "seat": seat, "performance": self.performance.id}
+                for row, seat in seats
+            ]
+        }
+        return self.client.post(RESERVATION_URL, payload, format="json")
+
+    def test_group_booking_uses_constant_queries(self):
+        seats = [(5, seat) for seat in range(1, 11)]
+
+        with self.assertNumQueries(13):
+            res = self.reserve(seats)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 10)
+        self.performance.refresh_from_db()
+        self.assertEqual(
+            sorted(self.performance.seat_map.taken_seats()), seats
+        )
+
+    def test_reports_every_conflicting_seat(self):
+        self.reserve([(1, 1), (1, 2)])
+
+        res = self.reserve([(1, 1), (1, 3), (1, 2), (11, 1), (1, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = res.data["tickets"]
+        self.assertIn("seat", errors[0])
+        self.assertEqual(errors[1], {})
+        self.assertIn("seat", errors[2])
+        self.assertIn("row", errors[3])
+        self.assertIn("seat", errors[4])
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_unknown_performance(self):
+        res = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"row": 1, "seat": 1, "performance": 0}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", res.data["tickets"][0])
+
+
+def integrity_error(pgcode):
+    cause = Exception()
+    cause.pgcode = pgcode
+    error = IntegrityError(f"error {pgcode}")
+    error.__cause__ = cause
+    return error
+
+
+@override_settings(RESERVATION_MAX_RETRIES=2, RESERVATION_RETRY_BACKOFF=0)
+class RetryTests(TestCase):
+    def failing(self, error):
+        calls = []
+
+        def book():
+            calls.append(1)
+            raise error
+
+        return book, calls
+
+    def test_unique_violations_are_retried_as_seat_conflicts(self):
+        book, calls = self.failing(integrity_error("23505"))
+
+        with self.assertRaises(serializers.ValidationError):
+            with_retries(book)
+
+        self.assertEqual(len(calls), 3)
+
+    def test_other_integrity_errors_are_raised_at_once(self):
+        # Foreign key violation.
+        book, calls = self.failing(integrity_error("23503"))
+
+        with self.assertRaises(IntegrityError):
+            with_retries(book)
+
+        self.assertEqual(len(calls), 1)
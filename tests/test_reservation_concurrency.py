@@ -0,0 +1,114 @@
+import logging
+import random
+import threading
+import time
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from rest_framework import serializers
+
+from theatre.booking import create_reservation
+from theatre.models import TheatreHall, Play, Performance, Ticket
+
+
+THREADS = 16
+ATTEMPTS_PER_THREAD = 25
+
+logger = logging.getLogger(__name__)
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql",
+    "Concurrent writers need a database with row-level locking",
+)
+class ReservationStressTests(TransactionTestCase):
+    """Many threads booking overlapping seats of one small hall."""
+
+    def setUp(self) -> None:
+        hall = TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=8)
+        play = Play.objects.create(title="Play", description="Description")
+        self.performance = Performance.objects.create(
+            show_time="2022-06-02 14:00:00+00:00",
+            play=play,
+            theatre_hall=hall,
+        )
+        self.users = [
+            get_user_model().objects.create_user(
+                username=f"user{index}@test.ua", password="pwd12345"
+            )
+            for index in range(THREADS)
+        ]
+
+    def run_writers(self):
+        outcomes = {"booked": 0, "rejected": 0, "errors": []}
+        lock = threading.Lock()
+
+        def writer(user, seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(ATTEMPTS_PER_THREAD):
+                    row = rng.randint(1, 5)
+                    first = rng.randint(1, 7)
+                    tickets = [
+                        {
+                            "performance_id": self.performance.id,
+                            "row": row,
+                            "seat": seat,
+                        }
+                        for seat in (first, first + 1)
+                    ]
+                    try:
+                        create_reservation(user, tickets)
+                        outcome = "booked"
+                    except serializers.ValidationError:
+                        outcome = "rejected"
+                    with lock:
+                        outcomes[outcome] += 1
+            except Exception as error:
+                with lock:
+                    outcomes["errors"].append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=writer, args=(user, index))
+            for index, user in enumerate(self.users)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        attempts = THREADS * ATTEMPTS_PER_THREAD
+        logger.info(
+            "%s: %s reservations in %.2fs (%.0f/s), %s booked, %s rejected",
+            self.id(), attempts, elapsed, attempts / elapsed,
+            outcomes["booked"], outcomes["rejected"],
+        )
+        return outcomes
+
+    def assert_no_double_bookings(self, outcomes):
+        self.assertEqual(outcomes["errors"], [])
+        seats = list(
+            Ticket.objects.filter(performance=self.performance)
+            .values_list("row", "seat")
+        )
+        self.assertEqual(len(seats), len(set(seats)))
+        self.assertEqual(len(seats), outcomes["booked"] * 2)
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, len(seats))
+        self.assertEqual(
+            sorted(self.performance.seat_map.taken_seats()), sorted(seats)
+        )
+
+    def test_row_lock(self):
+        self.assert_no_double_bookings(self.run_writers())
+
+    @override_settings(RESERVATION_LOCK_MODE="advisory")
+    def test_advisory_lock(self):
+        self.assert_no_double_bookings(self.run_writers())
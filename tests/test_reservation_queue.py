@@ -0,0 +1,237 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.intake import enqueue_reservation, process_batch
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    ReservationRequest,
+    SeatHold,
+    TheatreHall,
+    Ticket,
+)
+
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def tickets(performance, *seats):
+    return [
+        {"performance_id": performance.id, "row": row, "seat": seat}
+        for row, seat in seats
+    ]
+
+
+@override_settings(RESERVATION_QUEUE=True)
+class ReservationQueueTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua", password="pwd12345"
+        )
+        self.other = get_user_model().objects.create_user(
+            username="other@test.ua", password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        hall = TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=5)
+        play = Play.objects.create(title="Play", description="Text")
+        self.performance = Performance.objects.create(
+            play=play,
+            theatre_hall=hall,
+            show_time="2030-06-02 14:00:00+00:00",
+        )
+
+    def reserve(self, *seats, performance_id=None):
+        return self.client.post(
+            RESERVATION_URL,
+            {"tickets": [
+                {
+                    "row": row,
+                    "seat": seat,
+                    "performance": performance_id or self.performance.id,
+                }
+                for row, seat in seats
+            ]},
+            format="json",
+        )
+
+    def test_post_queues_and_returns_status_url(self):
+        res = self.reserve((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], "queued")
+        self.assertEqual(res["Location"], res.data["url"])
+        self.assertFalse(Ticket.objects.exists())
+
+        process_batch()
+        res = self.client.get(res["Location"])
+
+        self.assertEqual(res.data["status"], "booked")
+        reservation = Reservation.objects.get(pk=res.data["reservation"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(reservation.tickets.count(), 2)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+        self.assertTrue(self.performance.seat_map.is_taken(1, 2))
+
+    def test_unknown_performance_is_rejected_at_once(self):
+        res = self.reserve((1, 1), performance_id=999999)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", res.data["tickets"][0])
+        self.assertFalse(ReservationRequest.objects.exists())
+
+    def test_batch_books_in_order_and_rejects_conflicts(self):
+        first = enqueue_reservation(
+            self.other, tickets(self.performance, (1, 1), (1, 2))
+        )
+        second = enqueue_reservation(
+            self.user, tickets(self.performance, (1, 2), (1, 3))
+        )
+        third = enqueue_reservation(
+            self.user, tickets(self.performance, (1, 3))
+        )
+
+        self.assertEqual(process_batch(), 3)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        third.refresh_from_db()
+        self.assertEqual(first.status, "booked")
+        self.assertEqual(second.status, "rejected")
+        self.assertEqual(
+            second.errors,
+            {"tickets": [{"seat": ["This seat is already taken."]}, {}]},
+        )
+        self.assertIsNone(second.reservation)
+        self.assertEqual(third.status, "booked")
+        self.assertEqual(Ticket.objects.count(), 3)
+
+    def test_refused_request_does_not_fail_batch(self):
+        # A ticket the seat map does not know about.
+        Ticket.objects.bulk_create([Ticket(
+            performance=self.performance,
+            row=1,
+            seat=2,
+            reservation=Reservation.objects.create(user=self.other),
+        )])
+        first = enqueue_reservation(
+            self.user, tickets(self.performance, (1, 1))
+        )
+        refused = enqueue_reservation(
+            self.user, tickets(self.performance, (1, 2))
+        )
+        third = enqueue_reservation(
+            self.user, tickets(self.performance, (1, 3))
+        )
+
+        self.assertEqual(process_batch(), 3)
+
+        for request in (first, refused, third):
+            request.refresh_from_db()
+        self.assertEqual(first.status, "booked")
+        self.assertEqual(third.status, "booked")
+        self.assertEqual(refused.status, "rejected")
+        self.assertEqual(
+            refused.errors,
+            {"tickets": ["Some of these seats were just taken."]},
+        )
+        self.assertIsNone(refused.reservation)
+        self.assertIsNotNone(refused.processed_at)
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_holds_of_others_block_and_own_holds_convert(self):
+        expires_at = timezone.now() + timedelta(minutes=5)
+        for user, seat in ((self.other, 1), (self.user, 2)):
+            SeatHold.objects.create(
+                performance=self.performance,
+                user=user,
+                row=1,
+                seat=seat,
+                expires_at=expires_at,
+            )
+        blocked = enqueue_reservation(
+            self.user, tickets(self.performance, (1, 1))
+        )
+        own = enqueue_reservation(self.user, tickets(self.performance, (1, 2)))
+
+        process_batch()
+
+        blocked.refresh_from_db()
+        own.refresh_from_db()
+        self.assertEqual(
+            blocked.errors["tickets"][0]["seat"],
+            ["This seat is held by another customer."],
+        )
+        self.assertEqual(own.status, "booked")
+        self.assertEqual(
+            list(SeatHold.objects.values_list("user", "seat")),
+            [(self.other.id, 1)],
+        )
+
+    def test_batch_queries_do_not_grow_with_requests(self):
+        for seat in range(1, 3):
+            enqueue_reservation(
+                self.user, tickets(self.performance, (1, seat))
+            )
+        with self.assertNumQueries(13):
+            process_batch()
+
+        for seat in range(1, 6):
+            enqueue_reservation(
+                self.user, tickets(self.performance, (2, seat))
+            )
+        with self.assertNumQueries(13):
+            process_batch()
+
+        self.assertEqual(Ticket.objects.count(), 7)
+
+    def test_batch_size_limits_requests_per_transaction(self):
+        for seat in range(1, 4):
+            enqueue_reservation(
+                self.user, tickets(self.performance, (1, seat))
+            )
+
+        self.assertEqual(process_batch(batch_size=2), 2)
+        self.assertEqual(process_batch(batch_size=2), 1)
+        self.assertEqual(process_batch(batch_size=2), 0)
+
+    def test_status_is_private(self):
+        res = self.reserve((1, 1))
+        other = APIClient()
+        other.force_authenticate(self.other)
+
+        res = other.get(res["Location"])
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_command_drains_every_performance(self):
+        second = Performance.objects.create(
+            play=self.performance.play,
+            theatre_hall=self.performance.theatre_hall,
+            show_time="2030-06-03 14:00:00+00:00",
+        )
+        enqueue_reservation(self.user, tickets(self.performance, (1, 1)))
+        enqueue_reservation(self.user, tickets(second, (1, 1)))
+        out = StringIO()
+
+        call_command("process_reservations", stdout=out)
+
+        self.assertIn("Processed 2 request(s)", out.getvalue())
+        self.assertFalse(
+            ReservationRequest.objects.filter(status="queued").exists()
+        )
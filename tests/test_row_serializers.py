@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from theatre.cache import get_cache
+from theatre.models import (
+    Genre,
+    Actor,
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    Ticket,
+)
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+
+
+class FastListSerializationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        genres = [Genre.objects.create(name=name) for name in "ABC"]
+        actors = [
+            Actor.objects.create(first_name=name, last_name="Smith")
+            for name in ("Ann", "Bob", "Cid")
+        ]
+        hall = TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=5)
+        reservation = Reservation.objects.create(user=self.user)
+        for index in range(5):
+            play = Play.objects.create(
+                title=f"Play {index % 3}", description=f"Story {index}"
+            )
+            # Added out of id order, listed by id.
+            play.genres.add(*reversed(genres[:index % 3 + 1]))
+            play.actors.add(*actors[index % 2:])
+            # Late shows fall on the next day in Kyiv.
+            hour = index * 5 + 1
+            performance = Performance.objects.create(
+                show_time=f"2022-06-0{index + 1} {hour:02}:30:00+00:00",
+                play=play,
+                theatre_hall=hall,
+            )
+            Ticket.objects.create(
+                performance=performance,
+                reservation=reservation,
+                row=1,
+                seat=index + 1,
+            )
+        Play.objects.create(title="Empty", description="No one")
+
+    def get(self, url, fast):
+        get_cache().clear()
+        with override_settings(FAST_LIST_SERIALIZATION=fast):
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return res
+
+    def assert_same_bytes(self, url):
+        pages = 0
+        while url:
+            slow = self.get(url, fast=False)
+            fast = self.get(url, fast=True)
+            self.assertEqual(fast.content, slow.content)
+            url = slow.data.get("next")
+            pages += 1
+        return pages
+
+    def test_play_lists(self):
+        self.assertEqual(self.assert_same_bytes(PLAY_URL + "?page_size=2"), 3)
+        self.assert_same_bytes(PLAY_URL + "?genres=1,2&title=play")
+        self.assert_same_bytes(PLAY_URL + "?q=story&limit=2&offset=1")
+
+    def test_performance_lists(self):
+        self.assertEqual(
+            self.assert_same_bytes(PERFORMANCE_URL + "?page_size=2"), 3
+        )
+        self.assert_same_bytes(PERFORMANCE_URL + "?date=2022-06-02")
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.allocation import FreeIntervals, best_block
+from theatre.models import (
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    SeatHold,
+    Ticket,
+)
+from theatre.seat_map import SeatMap
+
+
+def allocate_url(performance_id):
+    return reverse("theatre:performance-allocate", args=[performance_id])
+
+
+class BestBlockTests(SimpleTestCase):
+    def test_empty_hall_gets_middle_block(self):
+        self.assertEqual(best_block(SeatMap(5, 10), 4), (3, 4))
+
+    def test_block_moves_towards_middle_within_free_run(self):
+        seat_map = SeatMap.from_seats(1, 10, [(1, 5), (1, 9)])
+
+        self.assertEqual(
+            FreeIntervals(seat_map).row(1), [(1, 4), (6, 8), (10, 10)]
+        )
+        self.assertEqual(best_block(seat_map, 3), (1, 6))
+
+    def test_falls_back_to_outer_rows(self):
+        seat_map = SeatMap.from_seats(3, 4, [(2, 2), (1, 1), (1, 4)])
+
+        self.assertEqual(best_block(seat_map, 3), (3, 1))
+
+    def test_no_block(self):
+        seat_map = SeatMap.from_seats(2, 4, [(1, 2), (2, 3)])
+
+        self.assertIsNone(best_block(seat_map, 3))
+        self.assertIsNone(best_block(seat_map, 5))
+
+
+class SeatAllocationApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.other = get_user_model().objects.create_user(
+            username="other@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        hall = TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=6)
+        play = Play.objects.create(title="Play", description="Description")
+        self.performance = Performance.objects.create(
+            show_time="2022-06-02 14:00:00+00:00",
+            play=play,
+            theatre_hall=hall,
+        )
+
+    def allocate(self, count):
+        return self.client.post(
+            f"{allocate_url(self.performance.id)}?count={count}"
+        )
+
+    def test_books_middle_block(self):
+        res = self.allocate(2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        seats = [
+            (ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]
+        ]
+        self.assertEqual(seats, [(2, 3), (2, 4)])
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_skips_sold_and_held_seats(self):
+        Ticket.objects.create(
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.other),
+            row=2,
+            seat=3,
+        )
+        SeatHold.objects.create(
+            performance=self.performance,
+            user=self.other,
+            row=1,
+            seat=4,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        res = self.allocate(3)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(
+                Ticket.objects.filter(reservation_id=res.data["id"])
+                .values_list("row", "seat")
+            ),
+            [(2, 4), (2, 5), (2, 6)],
+        )
+
+    def test_no_block_available(self):
+        res = self.allocate(7)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", res.data)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_count_required(self):
+        res = self.client.post(allocate_url(self.performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_authentication_required(self):
+        self.client.force_authenticate(None)
+
+        res = self.allocate(2)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
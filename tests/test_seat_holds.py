@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    TheatreHall,
+    Play,
+    Performance,
+    SeatHold,
+    Ticket,
+)
+
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def hold_url(performance_id):
+    return reverse("theatre:performance-hold", args=[performance_id])
+
+
+class SeatHoldApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.other = get_user_model().objects.create_user(
+            username="other@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        hall = TheatreHall.objects.create(name="Blue", rows=2, seats_in_row=4)
+        play = Play.objects.create(title="Play", description="Description")
+        self.performance = Performance.objects.create(
+            show_time="2022-06-02 14:00:00+00:00",
+            play=play,
+            theatre_hall=hall,
+        )
+
+    def hold(self, seats, user=None):
+        if user:
+            self.client.force_authenticate(user)
+        return self.client.post(
+            hold_url(self.performance.id),
+            {"seats": [{"row": row, "seat": seat} for row, seat in seats]},
+            format="json",
+        )
+
+    def reserve(self, seats):
+        return self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {
+                        "row": row,
+                        "seat": seat,
+                        "performance": self.performance.id,
+                    }
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_hold_request_size_is_capped(self):
+        res = self.hold([(1, 1)] * 11)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SeatHold.objects.exists())
+
+    @override_settings(SEAT_HOLD_MAX_SEATS=3)
+    def test_holds_per_user_are_capped(self):
+        self.assertEqual(
+            self.hold([(1, 1), (1, 2)]).status_code, status.HTTP_201_CREATED
+        )
+        # Renewing counts once, new seats add up.
+        self.assertEqual(
+            self.hold([(1, 1), (1, 2), (1, 3)]).status_code,
+            status.HTTP_201_CREATED,
+        )
+
+        res = self.hold([(1, 4)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(
+            self.hold([(1, 4)], user=self.other).status_code,
+            status.HTTP_201_CREATED,
+        )
+
+    def test_hold_blocks_other_customers(self):
+        res = self.hold([(1, 1), (1, 2)])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(
+            self.hold([(1, 2)]).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.reserve([(1, 1)]).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_reservation_converts_own_holds(self):
+        self.hold([(1, 1), (1, 2)])
+
+        res = self.reserve([(1, 1), (1, 2)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_holds_count_as_taken(self):
+        self.hold([(2, 4)])
+
+        detail = self.client.get(
+            reverse("theatre:performance-detail", args=[self.performance.id]),
+            {"taken_places": "list"},
+        )
+        listing = self.client.get(reverse("theatre:performance-list"))
+
+        self.assertEqual(detail.data["taken_places"], [{"row": 2, "seat": 4}])
+        self.assertEqual(
+            listing.data["results"][0]["tickets_available"], 7
+        )
+
+    def test_expired_holds_are_reclaimed(self):
+        self.hold([(1, 1)])
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+
+        res = self.hold([(1, 1)], user=self.other)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+        call_command("sweep_seat_holds", stdout=open("/dev/null", "w"))
+        self.assertFalse(SeatHold.objects.exists())
@@ -2,6 +2,7 @@ import tempfile
 import os
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -99,7 +100,7 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer = PlayListSerializer(plays, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_play_list_filter_by_title(self):
         play1 = sample_play(title="Movie")
@@ -112,9 +113,9 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer2 = PlayListSerializer(play2)
         serializer3 = PlayListSerializer(play3)
 
-        self.assertIn(serializer2.data, res.data)
-        self.assertIn(serializer3.data, res.data)
-        self.assertNotIn(serializer1.data, res.data)
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertIn(serializer3.data, res.data["results"])
+        self.assertNotIn(serializer1.data, res.data["results"])
 
     def test_play_list_filter_by_genres(self):
         play1 = sample_play(title="Movie")
@@ -133,9 +134,9 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer2 = PlayListSerializer(play2)
         serializer3 = PlayListSerializer(play3)
 
-        self.assertIn(serializer2.data, res.data)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_play_list_filter_by_actors(self):
         play1 = sample_play(title="Movie")
@@ -154,9 +155,9 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer2 = PlayListSerializer(play2)
         serializer3 = PlayListSerializer(play3)
 
-        self.assertIn(serializer3.data, res.data)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer3.data, res.data["results"])
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_play_create_forbidden(self):
         payload = {
@@ -195,3 +196,40 @@ class AdminPlayApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         self.assertIn(genre, genres)
         self.assertIn(actor, actors)
+
+
+class PlaySearchApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua",
+            password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.hamlet = sample_play(
+            title="Hamlet", description="Prince of Denmark"
+        )
+        self.lear = sample_play(
+            title="King Lear", description="An old king and his daughters"
+        )
+        self.denmark = sample_play(
+            title="Danish tales", description="Stories from Denmark"
+        )
+
+    def search(self, q):
+        res = self.client.get(PLAY_URL, {"q": q})
+        return [play["title"] for play in res.data["results"]]
+
+    def test_search_ranks_title_matches_first(self):
+        sample_play(title="Kings", description="Royal drama")
+
+        self.assertEqual(self.search("king")[0], "King Lear")
+
+    def test_search_covers_description(self):
+        self.assertCountEqual(
+            self.search("denmark"), ["Danish tales", "Hamlet"]
+        )
+
+    def test_search_tolerates_typos(self):
+        self.assertEqual(self.search("hamlett"), ["Hamlet"])
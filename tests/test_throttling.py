@@ -0,0 +1,189 @@
+from datetime import datetime
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Performance, Play, TheatreHall
+
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+TOKEN_URL = reverse("token_obtain_pair")
+REGISTER_URL = reverse("user:create")
+
+
+@override_settings(
+    THROTTLE_BURSTS={"reservation": 2, "token": 2, "registration": 2}
+)
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="tuser@test.ua", password="pwd12345"
+        )
+        self.client.force_authenticate(self.user)
+        hall = TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=5)
+        play = Play.objects.create(title="Play", description="Text")
+        self.performance = Performance.objects.create(
+            play=play,
+            theatre_hall=hall,
+            show_time=timezone.make_aware(datetime(2030, 1, 1, 19)),
+        )
+
+    def reserve(self, seat, client=None):
+        return (client or self.client).post(
+            RESERVATION_URL,
+            {"tickets": [
+                {"row": 1, "seat": seat, "performance": self.performance.id}
+            ]},
+            format="json",
+        )
+
+    def test_burst_then_retry_after(self):
+        for seat in (1, 2):
+            res = self.reserve(seat)
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.reserve(3)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # 30/min refills a token every two seconds.
+        self.assertEqual(res["Retry-After"], "2")
+
+    def test_bucket_refills(self):
+        with mock.patch("theatre.throttling.time.time", return_value=1000.0):
+            self.reserve(1)
+            self.reserve(2)
+            self.assertEqual(self.reserve(3).status_code, 429)
+        with mock.patch("theatre.throttling.time.time", return_value=1002.0):
+            res = self.reserve(3)
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(self.reserve(4).status_code, 429)
+
+    def test_buckets_are_per_user(self):
+        self.reserve(1)
+        self.reserve(2)
+        other = APIClient()
+        other.force_authenticate(
+            get_user_model().objects.create_user(
+                username="other@test.ua", password="pwd12345"
+            )
+        )
+
+        res = self.reserve(3, client=other)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_hold_and_allocate_are_throttled(self):
+        hold_url = reverse(
+            "theatre:performance-hold", args=[self.performance.id]
+        )
+        allocate_url = reverse(
+            "theatre:performance-allocate", args=[self.performance.id]
+        )
+        res = self.client.post(
+            hold_url, {"seats": [{"row": 1, "seat": 1}]}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.post(f"{allocate_url}?count=2")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        # Holds, allocations and reservations share one bucket.
+        for url in (hold_url, allocate_url, RESERVATION_URL):
+            with self.subTest(url=url):
+                res = self.client.post(url, {}, format="json")
+                self.assertEqual(
+                    res.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+                )
+
+    def test_reservation_list_is_not_throttled(self):
+        for _ in range(3):
+            res = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_token_buckets_are_per_ip(self):
+        client = APIClient()
+        data = {"username": "tuser@test.ua", "password": "pwd12345"}
+        for _ in range(2):
+            res = client.post(TOKEN_URL, data, REMOTE_ADDR="10.0.0.1")
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = client.post(TOKEN_URL, data, REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "6")
+
+        res = client.post(TOKEN_URL, data, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_forwarded_for_does_not_reset_bucket(self):
+        client = APIClient()
+        data = {"username": "tuser@test.ua", "password": "pwd12345"}
+        for number in range(3):
+            res = client.post(
+                TOKEN_URL,
+                data,
+                REMOTE_ADDR="10.0.0.1",
+                HTTP_X_FORWARDED_FOR=f"1.1.1.{number}",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_behind_proxy_buckets_use_last_forwarded_address(self):
+        client = APIClient()
+        data = {"username": "tuser@test.ua", "password": "pwd12345"}
+        with override_settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        ):
+            for number in range(3):
+                res = client.post(
+                    TOKEN_URL,
+                    data,
+                    REMOTE_ADDR="10.0.0.254",
+                    HTTP_X_FORWARDED_FOR=f"1.1.1.{number}, 10.0.0.1",
+                )
+            self.assertEqual(res.status_code, 429)
+
+            res = client.post(
+                TOKEN_URL,
+                data,
+                REMOTE_ADDR="10.0.0.254",
+                HTTP_X_FORWARDED_FOR="10.0.0.2",
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_registration_is_throttled(self):
+        client = APIClient()
+        for number in range(3):
+            res = client.post(
+                REGISTER_URL,
+                {"username": f"new{number}@test.ua", "password": "pwd12345"},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(
+            get_user_model().objects.filter(
+                username__startswith="new"
+            ).count(),
+            2,
+        )
+
+    def test_empty_rate_turns_scope_off(self):
+        with override_settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": {"reservation": None},
+            }
+        ):
+            for seat in (1, 2, 3):
+                res = self.reserve(seat)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
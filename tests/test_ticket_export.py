@@ -0,0 +1,116 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    TheatreHall,
+    Play,
+    Performance,
+    Reservation,
+    Ticket,
+)
+
+EXPORT_URL = reverse("theatre:ticket-export")
+
+
+class TicketExportTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="admin@test.ua",
+            password="pwd12345",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+        hall = TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=5)
+        play = Play.objects.create(title="Play", description="Description")
+        self.performances = [
+            Performance.objects.create(
+                show_time=show_time, play=play, theatre_hall=hall
+            )
+            for show_time in (
+                "2022-06-02 14:00:00+00:00",
+                "2022-06-05 14:00:00+00:00",
+            )
+        ]
+        reservation = Reservation.objects.create(user=self.user)
+        for performance in self.performances:
+            for seat in (1, 2):
+                Ticket.objects.create(
+                    performance=performance,
+                    reservation=reservation,
+                    row=1,
+                    seat=seat,
+                )
+
+    def read_ndjson(self, response):
+        content = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_ndjson_filtered_by_show_date(self):
+        res = self.client.get(
+            EXPORT_URL, {"date_from": "2022-06-05", "date_to": "2022-06-05"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = self.read_ndjson(res)
+        self.assertEqual(
+            [(row["performance_id"], row["seat"]) for row in rows],
+            [(self.performances[1].id, 1), (self.performances[1].id, 2)],
+        )
+        self.assertEqual(rows[0]["user"], "admin@test.ua")
+        self.assertEqual(rows[0]["play"], "Play")
+
+    def test_csv_for_performance(self):
+        res = self.client.get(
+            EXPORT_URL,
+            {"performance": self.performances[0].id, "output": "csv"},
+        )
+
+        content = b"".join(res.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["theatre_hall"], "Blue")
+        self.assertEqual(rows[0]["row"], "1")
+
+    def test_json_array(self):
+        res = self.client.get(EXPORT_URL, {"output": "json"})
+
+        self.assertEqual(res["Content-Type"], "application/json")
+        rows = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows, self.read_ndjson(
+            self.client.get(EXPORT_URL, {"output": "ndjson"})
+        ))
+
+    def test_invalid_range(self):
+        res = self.client.get(
+            EXPORT_URL, {"date_from": "2022-06-05", "date_to": "2022-06-01"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command("export_tickets", "--from", "2022-06-01", stdout=out)
+
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
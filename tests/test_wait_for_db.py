@@ -0,0 +1,39 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+ENSURE_CONNECTION = (
+    "django.db.backends.base.base.BaseDatabaseWrapper.ensure_connection"
+)
+
+
+@mock.patch("theatre.management.commands.wait_for_db.time.sleep")
+class WaitForDbTests(SimpleTestCase):
+    def test_database_ready(self, sleep):
+        with mock.patch(ENSURE_CONNECTION) as ensure_connection:
+            call_command("wait_for_db", stdout=StringIO())
+
+        ensure_connection.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_retries_until_available(self, sleep):
+        with mock.patch(ENSURE_CONNECTION) as ensure_connection:
+            ensure_connection.side_effect = [OperationalError] * 3 + [None]
+            call_command("wait_for_db", stdout=StringIO())
+
+        self.assertEqual(ensure_connection.call_count, 4)
+        self.assertEqual(sleep.call_count, 3)
+
+    def test_gives_up_after_timeout(self, sleep):
+        with mock.patch(ENSURE_CONNECTION) as ensure_connection:
+            ensure_connection.side_effect = OperationalError("refused")
+            with self.assertRaisesMessage(CommandError, "refused"):
+                call_command(
+                    "wait_for_db", "--timeout", "0", stdout=StringIO()
+                )
+
+        sleep.assert_not_called()
@@ -8,6 +8,8 @@ from .models import (
     Performance,
     Reservation,
     Ticket,
+    SeatHold,
+    ReservationRequest,
 )
 
 admin.site.register(TheatreHall)
@@ -17,3 +19,5 @@ admin.site.register(Play)
 admin.site.register(Performance)
 admin.site.register(Reservation)
 admin.site.register(Ticket)
+admin.site.register(SeatHold)
+admin.site.register(ReservationRequest)
@@ -0,0 +1,64 @@
+import re
+from typing import Optional
+
+from theatre.seat_map import SeatMap
+
+
+class FreeIntervals:
+    """Runs of at least ``min_length`` free seats, row by row.
+
+    Rows are matched lazily against the bit string of the seat map, so
+    a search that stops after a few rows does not pay for the others.
+    """
+
+    def __init__(self, seat_map: SeatMap, min_length: int = 1):
+        self.seats_in_row = seat_map.seats_in_row
+        self.bits = seat_map.bit_string()
+        self.pattern = re.compile(f"0{{{max(min_length, 1)},}}")
+
+    def row(self, row: int) -> list[tuple[int, int]]:
+        """Free runs of ``row`` as inclusive ``(first, last)`` seats."""
+        start = (row - 1) * self.seats_in_row
+        return [
+            (match.start() - start + 1, match.end() - start)
+            for match in self.pattern.finditer(
+                self.bits, start, start + self.seats_in_row
+            )
+        ]
+
+
+def best_block(seat_map: SeatMap, count: int) -> Optional[tuple[int, int]]:
+    """Find the best ``count`` adjacent free seats of one row.
+
+    Returns ``(row, first_seat)`` or ``None`` when no row has enough
+    adjacent free seats. Blocks are ranked by the distance of the row
+    from the middle row plus the distance of the block's middle from
+    the middle seat, both relative to the hall size. Within a free run
+    the block is pushed as close to the middle seat as the run allows.
+    Rows are visited from the middle outwards, so the search stops as
+    soon as the row distance alone cannot beat the best block found.
+    """
+    rows, width = seat_map.rows, seat_map.seats_in_row
+    if count < 1 or count > width:
+        return None
+
+    middle_row = (rows + 1) / 2
+    middle_seat = (width + 1) / 2
+    ideal_start = int(middle_seat - (count - 1) / 2)
+    intervals = FreeIntervals(seat_map, count)
+
+    best, best_score = None, None
+    for row in sorted(
+        range(1, rows + 1), key=lambda row: abs(row - middle_row)
+    ):
+        row_score = abs(row - middle_row) / rows
+        if best is not None and row_score >= best_score:
+            break
+        for first, last in intervals.row(row):
+            start = min(max(ideal_start, first), last - count + 1)
+            score = row_score + (
+                abs(start + (count - 1) / 2 - middle_seat) / width
+            )
+            if best is None or score < best_score:
+                best, best_score = (row, start), score
+    return best
@@ -0,0 +1,156 @@
+"""Async read-only variants of the catalog and performance endpoints.
+
+They reuse the viewsets' query building, pagination and serializers but
+load rows with Django's async ORM, so under the ASGI application a slow
+query does not pin a worker thread for its whole duration.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from theatre.models import Genre, Actor, TheatreHall
+from theatre.pagination import KeysetPagination
+from theatre.permissions import IsAdminOrIfAuthenticatedReadOnly
+from theatre.renderers import FastJSONRenderer
+from theatre.serializers import (
+    GenreSerializer,
+    ActorSerializer,
+    TheatreHallSerializer,
+    PlayListSerializer,
+    PlayDetailSerializer,
+    PerformanceListSerializer,
+)
+from theatre.views import PlayViewSet, PerformanceViewSet
+
+
+def _render(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+def _authenticate(request) -> Request:
+    drf_request = Request(
+        request,
+        authenticators=[
+            authenticator()
+            for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ],
+    )
+    if not IsAdminOrIfAuthenticatedReadOnly().has_permission(
+        drf_request, None
+    ):
+        if drf_request.successful_authenticator is None:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied()
+    return drf_request
+
+
+def async_api_view(view):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return _render(
+                {"detail": f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                {"Allow": "GET"},
+            )
+        try:
+            drf_request = await sync_to_async(_authenticate)(request)
+            return _render(await view(drf_request, *args, **kwargs))
+        except exceptions.APIException as exc:
+            headers = {}
+            if isinstance(exc, exceptions.NotAuthenticated):
+                authenticator = (
+                    api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+                )
+                headers["WWW-Authenticate"] = (
+                    authenticator.authenticate_header(request)
+                )
+            data = exc.detail
+            if not isinstance(data, (list, dict)):
+                data = {"detail": data}
+            return _render(data, exc.status_code, headers)
+
+    return wrapper
+
+
+async def _paginated(view, queryset, serializer_class):
+    request = view.request
+    paginator = view.paginator
+    if isinstance(paginator, KeysetPagination):
+        page = paginator.get_page_queryset(queryset, request)
+        results = paginator.finish_page([row async for row in page])
+    else:
+        results = await sync_to_async(paginator.paginate_queryset)(
+            queryset, request, view
+        )
+    data = serializer_class(results, many=True).data
+    return paginator.get_paginated_response(data).data
+
+
+async def _get_object(queryset, pk):
+    try:
+        return await queryset.aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        raise exceptions.NotFound()
+
+
+def _viewset(viewset_class, request, action):
+    return viewset_class(
+        request=request, action=action, format_kwarg=None, kwargs={}
+    )
+
+
+@async_api_view
+async def play_list(request):
+    view = _viewset(PlayViewSet, request, "list")
+    queryset = await sync_to_async(view.get_queryset)()
+    return await _paginated(view, queryset, PlayListSerializer)
+
+
+@async_api_view
+async def play_detail(request, pk):
+    view = _viewset(PlayViewSet, request, "retrieve")
+    queryset = await sync_to_async(view.get_queryset)()
+    play = await _get_object(queryset, pk)
+    return PlayDetailSerializer(play).data
+
+
+@async_api_view
+async def performance_list(request):
+    view = _viewset(PerformanceViewSet, request, "list")
+    return await _paginated(
+        view, view.get_queryset(), PerformanceListSerializer
+    )
+
+
+@async_api_view
+async def performance_detail(request, pk):
+    view = _viewset(PerformanceViewSet, request, "retrieve")
+    performance = await _get_object(view.get_queryset(), pk)
+    serializer = view.get_serializer_class()(performance)
+    # The seat map overlays active holds, which takes one more query.
+    return await sync_to_async(lambda: serializer.data)()
+
+
+def _reference_list(model, serializer_class):
+    @async_api_view
+    async def reference_list(request):
+        return serializer_class(
+            [obj async for obj in model.objects.all()], many=True
+        ).data
+
+    return reference_list
+
+
+genre_list = _reference_list(Genre, GenreSerializer)
+actor_list = _reference_list(Actor, ActorSerializer)
+theatre_hall_list = _reference_list(TheatreHall, TheatreHallSerializer)
@@ -0,0 +1,256 @@
+import logging
+import random
+import time
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from theatre.allocation import best_block
+from theatre.models import Performance, Reservation, SeatHold, Ticket
+
+
+logger = logging.getLogger(__name__)
+
+# Deadlock detected, serialization failure, lock not available.
+RETRYABLE_PGCODES = {"40P01", "40001", "55P03"}
+
+UNIQUE_VIOLATION_PGCODE = "23505"
+
+
+def seat_range_errors(hall, row: int, seat: int) -> dict:
+    errors = {}
+    for value, ticket_attr_name, theatre_hall_attr_name in [
+        (row, "row", "rows"),
+        (seat, "seat", "seats_in_row"),
+    ]:
+        count_attrs = getattr(hall, theatre_hall_attr_name)
+        if not (1 <= value <= count_attrs):
+            errors[ticket_attr_name] = [
+                f"{ticket_attr_name} number must be in available "
+                f"range: (1, {theatre_hall_attr_name}): "
+                f"(1, {count_attrs})"
+            ]
+    return errors
+
+
+def seats_filter(keys) -> Q:
+    """Match the given ``(performance_id, row, seat)`` keys exactly."""
+    return reduce(or_, (
+        Q(performance_id=performance_id, row=row, seat=seat)
+        for performance_id, row, seat in keys
+    ))
+
+
+def find_seat_errors(
+    tickets_data: list[dict],
+    performances: dict[int, Performance],
+    user_id: int = None,
+) -> list[dict]:
+    """Validate seats in memory and against existing tickets and holds.
+
+    Returns one error dict per requested ticket, aligned with
+    ``tickets_data`` (empty for valid tickets), the way DRF reports
+    errors of nested list serializers. Collisions with sold seats and
+    with seats held by other users are looked up with one query each.
+    """
+    errors = [{} for _ in tickets_data]
+    requested = {}
+
+    for index, ticket_data in enumerate(tickets_data):
+        performance = performances.get(ticket_data["performance_id"])
+        if performance is None:
+            errors[index]["performance"] = [
+                f"Invalid pk \"{ticket_data['performance_id']}\" - "
+                f"object does not exist."
+            ]
+            continue
+
+        errors[index] = seat_range_errors(
+            performance.theatre_hall, ticket_data["row"], ticket_data["seat"]
+        )
+        if errors[index]:
+            continue
+
+        key = (performance.pk, ticket_data["row"], ticket_data["seat"])
+        if key in requested:
+            errors[index]["seat"] = ["This seat is requested twice."]
+        else:
+            requested[key] = index
+
+    if not requested:
+        return errors
+
+    candidates = {
+        "performance_id__in": {key[0] for key in requested},
+        "row__in": {key[1] for key in requested},
+        "seat__in": {key[2] for key in requested},
+    }
+    taken = Ticket.objects.filter(**candidates).values_list(
+        "performance_id", "row", "seat"
+    )
+    for key in taken:
+        if key in requested:
+            errors[requested[key]]["seat"] = ["This seat is already taken."]
+
+    held = (
+        SeatHold.objects.active()
+        .filter(**candidates)
+        .exclude(user_id=user_id)
+        .values_list("performance_id", "row", "seat")
+    )
+    for key in held:
+        if key in requested and not errors[requested[key]]:
+            errors[requested[key]]["seat"] = [
+                "This seat is held by another customer."
+            ]
+
+    return errors
+
+
+def book_tickets(
+    reservation: Reservation, tickets_data: list[dict]
+) -> list[Ticket]:
+    """Create all tickets of a reservation in one pass.
+
+    Locks the affected performances, validates every seat, inserts the
+    tickets with a single ``bulk_create`` and updates the seat maps and
+    sold counters. The user's own holds on the booked seats are
+    converted, i.e. released. Raises ``ValidationError`` listing every
+    invalid, taken or held seat.
+    """
+    with transaction.atomic():
+        performances = Performance.lock(
+            ticket_data["performance_id"] for ticket_data in tickets_data
+        )
+        errors = find_seat_errors(
+            tickets_data, performances, user_id=reservation.user_id
+        )
+        if any(errors):
+            raise serializers.ValidationError({"tickets": errors})
+
+        tickets = Ticket.objects.bulk_create(
+            Ticket(reservation=reservation, **ticket_data)
+            for ticket_data in tickets_data
+        )
+
+        seats_by_performance = defaultdict(list)
+        for ticket in tickets:
+            seats_by_performance[ticket.performance_id].append(
+                (ticket.row, ticket.seat)
+            )
+        for performance_id, seats in seats_by_performance.items():
+            performances[performance_id].apply_tickets(seats)
+
+        SeatHold.objects.filter(
+            seats_filter(
+                (ticket.performance_id, ticket.row, ticket.seat)
+                for ticket in tickets
+            ),
+            user_id=reservation.user_id,
+        ).delete()
+
+        return tickets
+
+
+def is_unique_violation(error: IntegrityError) -> bool:
+    pgcode = getattr(error.__cause__, "pgcode", None)
+    if pgcode is not None:
+        return pgcode == UNIQUE_VIOLATION_PGCODE
+    # SQLite has no error codes, only messages.
+    return "UNIQUE constraint failed" in str(error)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, IntegrityError):
+        # A seat was sold by a writer that bypassed the performance lock;
+        # the retry reports it as a regular seat conflict. Other
+        # integrity errors are bugs, not conflicts.
+        return is_unique_violation(error)
+    return getattr(error.__cause__, "pgcode", None) in RETRYABLE_PGCODES
+
+
+def with_retries(book):
+    """Run ``book()`` in a transaction, retrying on lock conflicts.
+
+    Deadlocks, serialization failures and unique violations roll back
+    the whole attempt, which is retried with jittered exponential
+    backoff up to ``RESERVATION_MAX_RETRIES`` times.
+    """
+    max_retries = settings.RESERVATION_MAX_RETRIES
+    for attempt in range(max_retries + 1):
+        try:
+            with transaction.atomic():
+                return book()
+        except (OperationalError, IntegrityError) as error:
+            if not is_retryable(error):
+                raise
+            if attempt == max_retries:
+                if isinstance(error, IntegrityError):
+                    raise serializers.ValidationError(
+                        {"tickets": ["Some of these seats were just taken."]}
+                    )
+                raise
+            delay = (
+                settings.RESERVATION_RETRY_BACKOFF
+                * 2 ** attempt
+                * random.uniform(0.5, 1.5)
+            )
+            logger.info(
+                "Reservation attempt %s failed (%s), retrying in %.3fs",
+                attempt + 1, error, delay,
+            )
+            time.sleep(delay)
+
+
+def create_reservation(user, tickets_data: list[dict]) -> Reservation:
+    """Create a reservation with its tickets, retrying on lock conflicts."""
+    def book():
+        reservation = Reservation.objects.create(user=user)
+        book_tickets(reservation, tickets_data)
+        return reservation
+
+    return with_retries(book)
+
+
+def allocate_reservation(
+    user, performance_id: int, count: int
+) -> Reservation:
+    """Book the best ``count`` adjacent seats of a performance.
+
+    The block is chosen by ``best_block`` from the seat map of the
+    locked performance, with seats held by other customers taken out,
+    so it cannot be sold to someone else before it is booked.
+    """
+    def book():
+        performance = Performance.lock([performance_id])[performance_id]
+        seat_map = performance.seat_map
+        held = (
+            SeatHold.objects.active()
+            .filter(performance_id=performance_id)
+            .exclude(user=user)
+            .values_list("row", "seat")
+        )
+        for row, seat in held:
+            if seat_map.fits(row, seat):
+                seat_map.take(row, seat)
+
+        block = best_block(seat_map, count)
+        if block is None:
+            raise serializers.ValidationError(
+                {"count": [f"There are no {count} free seats together."]}
+            )
+
+        row, first_seat = block
+        reservation = Reservation.objects.create(user=user)
+        book_tickets(reservation, [
+            {"performance_id": performance_id, "row": row, "seat": seat}
+            for seat in range(first_seat, first_seat + count)
+        ])
+        return reservation
+
+    return with_retries(book)
@@ -0,0 +1,198 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from theatre_api_service.routers import pin_to_primary
+
+
+VERSION_KEY = "theatre:version:{label}"
+CHANGED_KEY = "theatre:changed:{label}"
+RESPONSE_KEY = "theatre:response:{digest}"
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def _version_key(model) -> str:
+    return VERSION_KEY.format(label=model._meta.label_lower)
+
+
+def get_versions(models) -> list[int]:
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from a fresh value so that responses cached under a
+            # version evicted from the cache can never be served again.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_changed_at(models):
+    """When any of ``models`` last changed, as an aware datetime.
+
+    A model without a recorded change time is taken to change now, so
+    an evicted entry can only make responses look newer, never older.
+    """
+    cache = get_cache()
+    keys = [
+        CHANGED_KEY.format(label=model._meta.label_lower) for model in models
+    ]
+    stamps = cache.get_many(keys)
+    for key in keys:
+        if key not in stamps:
+            cache.add(key, time.time(), timeout=None)
+            stamps[key] = cache.get(key)
+    return datetime.fromtimestamp(max(stamps.values()), tz=dt_timezone.utc)
+
+
+def bump_version(model) -> None:
+    cache = get_cache()
+    # Recorded before the bump, so a reader seeing the new version never
+    # sees the old change time with it.
+    cache.set(
+        CHANGED_KEY.format(label=model._meta.label_lower),
+        time.time(),
+        timeout=None,
+    )
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _record(endpoint: str, outcome: str) -> None:
+    # Counted per process: a shared counter would cost a cache write on
+    # every hit.
+    with _stats_lock:
+        _stats[endpoint, outcome] += 1
+
+
+def get_stats(endpoints) -> dict:
+    """Hits and misses of ``endpoints`` in this process since it started."""
+    with _stats_lock:
+        return {
+            endpoint: {
+                "hits": _stats[endpoint, "hit"],
+                "misses": _stats[endpoint, "miss"],
+            }
+            for endpoint in endpoints
+        }
+
+
+class CachedListMixin:
+    """Cache list responses until one of ``cache_models`` changes.
+
+    Keys combine the endpoint, the normalized query parameters and the
+    current version of every model in ``cache_models``; versions are
+    bumped by the signal handlers in ``theatre.signals``.
+    """
+
+    cache_models = ()
+    cached_endpoints = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_models:
+            CachedListMixin.cached_endpoints[cls.cache_endpoint_name()] = cls
+
+    @classmethod
+    def cache_endpoint_name(cls) -> str:
+        return cls.__name__
+
+    def get_response_cache_key(self, request) -> str:
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+        )
+        versions = get_versions(self.cache_models)
+        raw = repr(
+            (request.get_host(), request.path, params, versions)
+        ).encode()
+        return RESPONSE_KEY.format(digest=hashlib.sha1(raw).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        endpoint = self.cache_endpoint_name()
+        key = self.get_response_cache_key(request)
+
+        data = cache.get(key)
+        if data is not None:
+            _record(endpoint, "hit")
+            return Response(data)
+
+        _record(endpoint, "miss")
+        # A lagging replica would store data older than the versions in
+        # the key until the next bump.
+        pin_to_primary()
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                response.data,
+                getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300),
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """Answer ``If-None-Match``/``If-Modified-Since`` with 304.
+
+    ``get_condition_state`` must return the cheaply loaded state the
+    response is built from, as a ``(state, last_modified)`` pair, or
+    ``None`` when it cannot tell; the ETag is a digest of the state.
+    The full response is only built when the client's copy is stale.
+    Versions of ``condition_models`` are part of the ETag as well, and
+    their change time of ``Last-Modified``, for related objects
+    rendered into the response.
+    """
+
+    condition_models = ()
+
+    def get_condition_state(self, request):
+        raise NotImplementedError
+
+    def conditional_response(self, request, build_response):
+        if request.method not in ("GET", "HEAD"):
+            return build_response()
+
+        condition = self.get_condition_state(request)
+        if condition is None:
+            return build_response()
+
+        state, last_modified = condition
+        versions = get_versions(self.condition_models)
+        if self.condition_models:
+            # The related objects are rendered into the response too.
+            changed_at = get_changed_at(self.condition_models)
+            if last_modified is None or changed_at > last_modified:
+                last_modified = changed_at
+        raw = repr((request.accepted_media_type, versions, state)).encode()
+        etag = quote_etag(hashlib.sha1(raw).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = build_response()
+        if response.status_code in (200, 304):
+            response.setdefault("ETag", etag)
+            if timestamp is not None:
+                response.setdefault("Last-Modified", http_date(timestamp))
+        return response
@@ -0,0 +1,99 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from theatre.models import Ticket
+from theatre.renderers import StreamingJSONRenderer
+
+
+EXPORT_FIELDS = (
+    ("ticket_id", "id"),
+    ("reservation_id", "reservation_id"),
+    ("reservation_created_at", "reservation__created_at"),
+    ("user_id", "reservation__user_id"),
+    ("user", "reservation__user__username"),
+    ("performance_id", "performance_id"),
+    ("show_time", "performance__show_time"),
+    ("play", "performance__play__title"),
+    ("theatre_hall", "performance__theatre_hall__name"),
+    ("row", "row"),
+    ("seat", "seat"),
+)
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "csv": "text/csv",
+}
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_rows(date_from=None, date_to=None, performance_id=None):
+    """Yield every sold ticket with its reservation as a flat dict.
+
+    ``date_from`` and ``date_to`` bound the show dates, both inclusive.
+    Rows are read through a server-side cursor in chunks of
+    ``EXPORT_CHUNK_SIZE``, so memory does not grow with the export.
+    """
+    queryset = Ticket.objects.all()
+    if date_from:
+        queryset = queryset.filter(
+            performance__show_time__gte=_day_start(date_from)
+        )
+    if date_to:
+        queryset = queryset.filter(
+            performance__show_time__lt=_day_start(
+                date_to + timedelta(days=1)
+            )
+        )
+    if performance_id:
+        queryset = queryset.filter(performance_id=performance_id)
+
+    names = [name for name, _ in EXPORT_FIELDS]
+    rows = queryset.order_by("reservation_id", "id").values_list(
+        *(lookup for _, lookup in EXPORT_FIELDS)
+    )
+    for row in rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        yield dict(zip(names, row))
+
+
+class ExportRenderer(StreamingJSONRenderer):
+    encoder_class = DjangoJSONEncoder
+
+
+def ndjson_lines(rows):
+    renderer = ExportRenderer()
+    for row in rows:
+        yield renderer.render(row).decode() + "\n"
+
+
+def json_chunks(rows):
+    for chunk in ExportRenderer().stream(rows):
+        yield chunk.decode()
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row.values()
+        ])
+
+
+FORMATTERS = {
+    "ndjson": ndjson_lines,
+    "json": json_chunks,
+    "csv": csv_lines,
+}
@@ -0,0 +1,224 @@
+"""Facet counts for the play and performance lists.
+
+Requested with ``?facets=true``, a list response also carries counts
+per genre and per actor, and for performances per upcoming date, for
+the current filters. Facets are disjunctive: each one applies every
+filter except its own, so with Drama selected the genre facet still
+tells how many results Comedy would add.
+
+Counts are tallied from the genre and actor ids on the play cards and
+from the pre-aggregated calendar, so they take the same few queries
+however many plays match.
+"""
+import json
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Sum, TextField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from rest_framework import serializers
+
+from theatre.models import Actor, CalendarDay, Genre, Play
+from theatre.renderers import orjson
+
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+RELATION_COLUMNS = {"genres": "genre_id", "actors": "actor_id"}
+
+
+def plays_related_to(relation: str, ids: list[int]):
+    """Subquery of the ids of plays with any of ``ids`` in ``relation``."""
+    return getattr(Play, relation).through.objects.filter(
+        **{f"{RELATION_COLUMNS[relation]}__in": ids}
+    ).values("play_id")
+
+
+def card_ids(plays, *fields):
+    """Rows of ``fields`` followed by the genre and actor ids of plays.
+
+    The ids are read as text and decoded here: JSONField decoding each
+    value on its own takes several times longer on large sets.
+    """
+    rows = plays.order_by().annotate(
+        genre_ids_text=Cast("genre_ids", TextField()),
+        actor_ids_text=Cast("actor_ids", TextField()),
+    ).values_list(*fields, "genre_ids_text", "actor_ids_text")
+    for *values, genres, actors in rows:
+        yield (*values, loads(genres), loads(actors))
+
+
+def tally(rows, genre_ids, actor_ids) -> tuple[Counter, Counter]:
+    """Count genres and actors over ``(weight, genres, actors)`` rows.
+
+    A row adds its weight to its genres when it passes the actor
+    filter, and to its actors when it passes the genre filter.
+    """
+    genre_ids, actor_ids = set(genre_ids or ()), set(actor_ids or ())
+    genres, actors = Counter(), Counter()
+    for weight, row_genres, row_actors in rows:
+        if not actor_ids or not actor_ids.isdisjoint(row_actors):
+            for genre_id in row_genres:
+                genres[genre_id] += weight
+        if not genre_ids or not genre_ids.isdisjoint(row_genres):
+            for actor_id in row_actors:
+                actors[actor_id] += weight
+    return genres, actors
+
+
+def buckets(counts: Counter, selected, names) -> list[dict]:
+    """The ``FACET_LIMIT`` largest counts, and every selected value.
+
+    ``names`` maps a list of ids to a dict of their display names.
+    """
+    ids = [
+        key for key, _ in sorted(
+            counts.items(), key=lambda item: (-item[1], item[0])
+        )[:settings.FACET_LIMIT]
+    ]
+    ids += [key for key in selected or () if key not in ids]
+    names = names(ids)
+    return [
+        {"id": key, "name": names[key], "count": counts[key]}
+        for key in ids
+        if key in names
+    ]
+
+
+def genre_names(ids) -> dict[int, str]:
+    return dict(Genre.objects.filter(id__in=ids).values_list("id", "name"))
+
+
+def actor_names(ids) -> dict[int, str]:
+    return {
+        actor_id: f"{first_name} {last_name}"
+        for actor_id, first_name, last_name in Actor.objects.filter(
+            id__in=ids
+        ).values_list("id", "first_name", "last_name")
+    }
+
+
+def play_facets(plays, genre_ids=None, actor_ids=None) -> dict:
+    """Genre and actor facets of ``plays``, before the relation filters."""
+    genres, actors = tally(
+        (
+            (1, row_genres, row_actors)
+            for row_genres, row_actors in card_ids(plays)
+        ),
+        genre_ids,
+        actor_ids,
+    )
+    return {
+        "genres": buckets(genres, genre_ids, genre_names),
+        "actors": buckets(actors, actor_ids, actor_names),
+    }
+
+
+def performance_facets(
+    day=None, play_id=None, genre_ids=None, actor_ids=None
+) -> dict:
+    """Date, genre and actor facets of performances.
+
+    The date facet covers ``CALENDAR_MAX_DAYS`` days from today.
+    """
+    days = CalendarDay.objects.order_by()
+    if play_id:
+        days = days.filter(play_id=play_id)
+
+    dated = days
+    if genre_ids:
+        dated = dated.filter(play__in=plays_related_to("genres", genre_ids))
+    if actor_ids:
+        dated = dated.filter(play__in=plays_related_to("actors", actor_ids))
+    today = timezone.localdate()
+    dates = (
+        dated.filter(
+            date__gte=today,
+            date__lt=today + timedelta(days=settings.CALENDAR_MAX_DAYS),
+        )
+        .values_list("date")
+        .annotate(count=Sum("performances"))
+        .order_by("date")
+    )
+
+    if day:
+        days = days.filter(date=day)
+    per_play = dict(
+        days.values_list("play").annotate(count=Sum("performances"))
+    )
+    genres, actors = tally(
+        (
+            # A play can enter the calendar between the two queries.
+            (per_play.get(play, 0), row_genres, row_actors)
+            for play, row_genres, row_actors in card_ids(
+                Play.objects.filter(id__in=days.values("play")), "id"
+            )
+        ),
+        genre_ids,
+        actor_ids,
+    )
+    return {
+        "dates": [
+            {"date": date.isoformat(), "count": count}
+            for date, count in dates
+        ],
+        "genres": buckets(genres, genre_ids, genre_names),
+        "actors": buckets(actors, actor_ids, actor_names),
+    }
+
+
+class FacetListMixin:
+    """Add ``get_facets()`` to list responses asked for with ``?facets``."""
+
+    facets_query_param = "facets"
+
+    @staticmethod
+    def _params_to_ints(qs, param):
+        try:
+            return [int(str_id) for str_id in qs.split(",")]
+        except ValueError:
+            raise serializers.ValidationError(
+                {param: "Use a comma-separated list of ids."}
+            )
+
+    def get_relation_filters(self) -> tuple[list[int], list[int]]:
+        """The ``genres`` and ``actors`` ids to filter by, if any."""
+        genres = self.request.query_params.get("genres")
+        actors = self.request.query_params.get("actors")
+        return (
+            self._params_to_ints(genres, "genres") if genres else None,
+            self._params_to_ints(actors, "actors") if actors else None,
+        )
+
+    def filter_by_relations(self, queryset, play_field="id"):
+        genre_ids, actor_ids = self.get_relation_filters()
+        if genre_ids:
+            queryset = queryset.filter(
+                **{f"{play_field}__in": plays_related_to("genres", genre_ids)}
+            )
+        if actor_ids:
+            queryset = queryset.filter(
+                **{f"{play_field}__in": plays_related_to("actors", actor_ids)}
+            )
+        return queryset
+
+    def facets_requested(self) -> bool:
+        return self.request.query_params.get(
+            self.facets_query_param, ""
+        ).lower() in ("1", "true")
+
+    def get_facets(self) -> dict:
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and self.facets_requested()
+            and isinstance(response.data, dict)
+        ):
+            response.data["facets"] = self.get_facets()
+        return response
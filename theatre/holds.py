@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from theatre.booking import seat_range_errors, seats_filter
+from theatre.models import Performance, SeatHold
+
+
+def hold_seats(
+    performance: Performance, user, seats: list[dict], minutes: int = None
+) -> list[SeatHold]:
+    """Hold free seats of ``performance`` for ``user``.
+
+    Sold seats are read from the performance seat map, so holding never
+    touches the ticket table. Seats the user already holds are renewed.
+    Raises ``ValidationError`` listing every seat that cannot be held,
+    or when the user would hold more than ``SEAT_HOLD_MAX_SEATS`` seats
+    of the performance.
+    """
+    minutes = minutes or settings.SEAT_HOLD_MINUTES
+    expires_at = timezone.now() + timedelta(minutes=minutes)
+    seat_map = performance.seat_map
+
+    errors = [{} for _ in seats]
+    requested = {}
+    for index, seat_data in enumerate(seats):
+        row, seat = seat_data["row"], seat_data["seat"]
+        errors[index] = seat_range_errors(performance.theatre_hall, row, seat)
+        if errors[index]:
+            continue
+        if (row, seat) in requested:
+            errors[index]["seat"] = ["This seat is requested twice."]
+        elif seat_map.is_taken(row, seat):
+            errors[index]["seat"] = ["This seat is already taken."]
+        else:
+            requested[(row, seat)] = index
+
+    keys = [(performance.pk, row, seat) for row, seat in requested]
+    if keys:
+        held = (
+            SeatHold.objects.active()
+            .filter(seats_filter(keys))
+            .exclude(user=user)
+            .values_list("row", "seat")
+        )
+        for key in held:
+            errors[requested[key]]["seat"] = [
+                "This seat is held by another customer."
+            ]
+    if any(errors):
+        raise serializers.ValidationError({"seats": errors})
+
+    # Renewed holds replace themselves; any others count to the limit.
+    held_elsewhere = (
+        SeatHold.objects.active()
+        .filter(performance=performance, user=user)
+        .values_list("row", "seat")
+    )
+    held_count = len(requested) + sum(
+        1 for key in held_elsewhere if key not in requested
+    )
+    if held_count > settings.SEAT_HOLD_MAX_SEATS:
+        raise serializers.ValidationError({"seats": [
+            f"You can hold at most {settings.SEAT_HOLD_MAX_SEATS} seats "
+            f"of a performance at a time."
+        ]})
+
+    try:
+        with transaction.atomic():
+            # Expired holds and the user's own holds on these seats are
+            # replaced by the new ones.
+            SeatHold.objects.filter(seats_filter(keys)).filter(
+                Q(expires_at__lte=timezone.now()) | Q(user=user)
+            ).delete()
+            Performance.touch_availability([performance.pk])
+            return SeatHold.objects.bulk_create(
+                SeatHold(
+                    performance=performance,
+                    user=user,
+                    row=row,
+                    seat=seat,
+                    expires_at=expires_at,
+                )
+                for row, seat in requested
+            )
+    except IntegrityError:
+        raise serializers.ValidationError(
+            {"seats": ["Some of these seats were just held by someone else."]}
+        )
+
+
+def release_holds(performance: Performance, user) -> int:
+    deleted, _ = SeatHold.objects.filter(
+        performance=performance, user=user
+    ).delete()
+    if deleted:
+        Performance.touch_availability([performance.pk])
+    return deleted
+
+
+def sweep_expired_holds() -> int:
+    deleted, _ = SeatHold.objects.expired().delete()
+    return deleted
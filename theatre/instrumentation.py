@@ -0,0 +1,199 @@
+"""Per-request timing of SQL, serializers and views.
+
+``SQLInstrumentationMiddleware`` samples requests at
+``SQL_INSTRUMENTATION_SAMPLE_RATE``. For a sampled request every query
+is timed through a database ``execute_wrapper``, and serializers using
+``TimedSerializerMixin`` add their time. The totals are sent as a
+``Server-Timing`` header and logged as one JSON line on the
+``theatre.instrumentation`` logger. Queries slower than
+``SQL_SLOW_QUERY_MS`` are logged with their SQL and the stack that ran
+them. Requests that are not sampled only pay for one random number.
+"""
+import json
+import logging
+import random
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger("theatre.instrumentation")
+slow_query_logger = logging.getLogger("theatre.instrumentation.slow_query")
+
+_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_db_time = 0.0
+        self.serializer_depth = 0
+        self.slow_queries = 0
+
+
+def current_metrics():
+    return _metrics.get()
+
+
+@contextmanager
+def timed_serializer():
+    """Add the time of the block to the serializer total.
+
+    Nested serializers run inside their parent and are not counted
+    twice.
+    """
+    metrics = _metrics.get()
+    if metrics is None or metrics.serializer_depth:
+        yield
+        return
+
+    metrics.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - started
+        metrics.serializer_depth -= 1
+
+
+class TimedSerializerMixin:
+    def to_representation(self, instance):
+        if _metrics.get() is None:
+            return super().to_representation(instance)
+        with timed_serializer():
+            return super().to_representation(instance)
+
+
+def _project_stack():
+    """The calling frames that belong to this project, oldest first."""
+    base_dir = str(settings.BASE_DIR)
+    return [
+        f"{frame.filename}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+    ]
+
+
+class QueryTimer:
+    def __init__(self, metrics, alias):
+        self.metrics = metrics
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.metrics.queries += 1
+            self.metrics.db_time += duration
+            if self.metrics.serializer_depth:
+                self.metrics.serializer_db_time += duration
+            if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+                self.metrics.slow_queries += 1
+                slow_query_logger.warning(json.dumps({
+                    "event": "slow_query",
+                    "database": self.alias,
+                    "duration_ms": round(duration * 1000, 2),
+                    "sql": sql,
+                    "params": repr(params)[:1000],
+                    "stack": _project_stack(),
+                }))
+
+
+class SQLInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.SQL_INSTRUMENTATION_SAMPLE_RATE:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        return self.report(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.SQL_INSTRUMENTATION_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        started = time.perf_counter()
+        # Connections belong to the thread that runs the request's sync
+        # code, so the wrappers are installed and removed from there.
+        stack = ExitStack()
+        try:
+            await sync_to_async(self.wrap_connections)(stack, metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _metrics.reset(token)
+        return self.report(request, response, metrics, started)
+
+    @staticmethod
+    def wrap_connections(stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(
+                QueryTimer(metrics, connection.alias)
+            ))
+
+    def report(self, request, response, metrics, started):
+        total = time.perf_counter() - started
+
+        # Queries run by serializers count towards both db and serializer
+        # time; view time is what is left of the request.
+        view_time = max(
+            total
+            - metrics.db_time
+            - (metrics.serializer_time - metrics.serializer_db_time),
+            0,
+        )
+        response["Server-Timing"] = ", ".join((
+            f'db;dur={metrics.db_time * 1000:.2f};'
+            f'desc="{metrics.queries} queries"',
+            f"serializer;dur={metrics.serializer_time * 1000:.2f}",
+            f"view;dur={view_time * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ))
+        logger.info(json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "slow_queries": metrics.slow_queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "serializer_ms": round(metrics.serializer_time * 1000, 2),
+            "view_ms": round(view_time * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+        }))
+        return response
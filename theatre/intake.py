@@ -0,0 +1,281 @@
+"""Queued reservation intake.
+
+With ``RESERVATION_QUEUE`` on, ``POST /reservation/`` only stores the
+request as a ``ReservationRequest`` and answers 202 with a URL to poll;
+``manage.py process_reservations`` books the queue. Rather than every
+request of a busy performance waiting on its row lock, a worker locks
+the performance once and books up to ``RESERVATION_QUEUE_BATCH_SIZE``
+of its requests against one in-memory seat map, in one transaction.
+
+Workers claim a performance with ``SKIP LOCKED``, so several of them
+work on distinct performances side by side and throughput grows with
+the number of performances being booked, not the number of requests.
+"""
+import logging
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from rest_framework import serializers
+
+from theatre.booking import (
+    is_unique_violation,
+    seat_range_errors,
+    seats_filter,
+    with_retries,
+)
+from theatre.models import (
+    Performance,
+    Reservation,
+    ReservationRequest,
+    SeatHold,
+    Ticket,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_reservation(user, tickets_data: list[dict]) -> ReservationRequest:
+    """Queue a reservation, rejecting unknown performances right away."""
+    performance_ids = {
+        ticket_data["performance_id"] for ticket_data in tickets_data
+    }
+    existing = set(
+        Performance.objects.filter(pk__in=performance_ids).values_list(
+            "pk", flat=True
+        )
+    )
+    errors = [
+        {} if ticket_data["performance_id"] in existing else {
+            "performance": [
+                f"Invalid pk \"{ticket_data['performance_id']}\" - "
+                f"object does not exist."
+            ]
+        }
+        for ticket_data in tickets_data
+    ]
+    if any(errors):
+        raise serializers.ValidationError({"tickets": errors})
+
+    return ReservationRequest.objects.create(
+        user=user,
+        performance_id=min(performance_ids),
+        tickets=[
+            {
+                "performance_id": ticket_data["performance_id"],
+                "row": ticket_data["row"],
+                "seat": ticket_data["seat"],
+            }
+            for ticket_data in tickets_data
+        ],
+    )
+
+
+def claim_performance():
+    """Lock the queued performance no other worker holds, oldest first.
+
+    Must run inside a transaction. Returns the performance id, or
+    ``None`` when every queued performance is taken or none is queued.
+    """
+    queued = ReservationRequest.objects.filter(
+        status=ReservationRequest.Status.QUEUED
+    )
+    oldest = queued.filter(performance=OuterRef("pk")).order_by("id")
+    return (
+        Performance.objects
+        .filter(pk__in=queued.values("performance_id"))
+        .order_by(Subquery(oldest.values("id")[:1]))
+        .select_for_update(skip_locked=True, of=("self",))
+        .values_list("pk", flat=True)
+        .first()
+    )
+
+
+def request_errors(
+    request: ReservationRequest, performances, seat_maps, holders
+) -> list[dict]:
+    """Validate the seats of ``request`` against the in-memory state.
+
+    ``seat_maps`` hold the seats sold so far, including to the requests
+    booked earlier in the batch, and ``holders`` the user holding each
+    ``(performance_id, row, seat)`` on an active hold.
+    """
+    errors = [{} for _ in request.tickets]
+    requested = set()
+    for index, ticket_data in enumerate(request.tickets):
+        performance = performances.get(ticket_data["performance_id"])
+        if performance is None:
+            errors[index]["performance"] = [
+                f"Invalid pk \"{ticket_data['performance_id']}\" - "
+                f"object does not exist."
+            ]
+            continue
+
+        row, seat = ticket_data["row"], ticket_data["seat"]
+        errors[index] = seat_range_errors(performance.theatre_hall, row, seat)
+        if errors[index]:
+            continue
+
+        key = (performance.pk, row, seat)
+        if key in requested:
+            errors[index]["seat"] = ["This seat is requested twice."]
+        elif seat_maps[performance.pk].is_taken(row, seat):
+            errors[index]["seat"] = ["This seat is already taken."]
+        elif holders.get(key, request.user_id) != request.user_id:
+            errors[index]["seat"] = ["This seat is held by another customer."]
+        requested.add(key)
+    return errors
+
+
+def book_requests(requests: list[ReservationRequest]) -> None:
+    """Book or reject queued requests in the current transaction.
+
+    Locks their performances, validates the requests in order against
+    the seat maps, and creates all reservations and tickets with one
+    ``bulk_create`` each. Rejected requests keep their errors in the
+    format of a synchronous 400 response.
+    """
+    performances = Performance.lock(
+        ticket_data["performance_id"]
+        for request in requests
+        for ticket_data in request.tickets
+    )
+    seat_maps = {
+        performance_id: performance.seat_map
+        for performance_id, performance in performances.items()
+    }
+    holders = {
+        (performance_id, row, seat): user_id
+        for performance_id, row, seat, user_id in (
+            SeatHold.objects.active()
+            .filter(performance_id__in=performances)
+            .values_list("performance_id", "row", "seat", "user_id")
+        )
+    }
+
+    processed_at = timezone.now()
+    booked = []
+    for request in requests:
+        request.processed_at = processed_at
+        errors = request_errors(request, performances, seat_maps, holders)
+        if any(errors):
+            request.status = ReservationRequest.Status.REJECTED
+            request.errors = {"tickets": errors}
+            continue
+        for ticket_data in request.tickets:
+            seat_maps[ticket_data["performance_id"]].take(
+                ticket_data["row"], ticket_data["seat"]
+            )
+        request.status = ReservationRequest.Status.BOOKED
+        booked.append(request)
+
+    reservations = Reservation.objects.bulk_create(
+        Reservation(user_id=request.user_id) for request in booked
+    )
+    tickets = []
+    seats_by_performance = defaultdict(list)
+    converted_holds = []
+    for request, reservation in zip(booked, reservations):
+        request.reservation = reservation
+        for ticket_data in request.tickets:
+            key = (
+                ticket_data["performance_id"],
+                ticket_data["row"],
+                ticket_data["seat"],
+            )
+            tickets.append(Ticket(reservation=reservation, **ticket_data))
+            seats_by_performance[key[0]].append(key[1:])
+            if key in holders:
+                converted_holds.append(key)
+    Ticket.objects.bulk_create(tickets)
+
+    for performance_id, seats in seats_by_performance.items():
+        performances[performance_id].apply_tickets(seats)
+    if converted_holds:
+        SeatHold.objects.filter(seats_filter(converted_holds)).delete()
+
+    ReservationRequest.objects.bulk_update(
+        requests, ["status", "errors", "reservation", "processed_at"]
+    )
+
+
+def book_each(requests: list[ReservationRequest]) -> None:
+    """Book ``requests`` one at a time, each in its own savepoint.
+
+    A request the database refuses is rejected on its own instead of
+    failing the requests around it.
+    """
+    for request in requests:
+        try:
+            with transaction.atomic():
+                book_requests([request])
+        except (DataError, IntegrityError) as error:
+            logger.warning(
+                "Rejecting reservation request %s: %s", request.pk, error
+            )
+            request.status = ReservationRequest.Status.REJECTED
+            request.errors = {"tickets": [
+                "Some of these seats were just taken."
+                if is_unique_violation(error)
+                else "These tickets could not be booked."
+            ]}
+            request.reservation = None
+            request.processed_at = timezone.now()
+            request.save(update_fields=[
+                "status", "errors", "reservation", "processed_at"
+            ])
+
+
+def process_batch(batch_size: int = None) -> int:
+    """Book the next batch of one performance's queue.
+
+    When the database refuses the batch, say for a ticket written
+    without updating its performance's seats, its requests are booked
+    again one at a time. Returns the number of requests processed, 0
+    when there is nothing to claim.
+    """
+    batch_size = batch_size or settings.RESERVATION_QUEUE_BATCH_SIZE
+
+    def book():
+        performance_id = claim_performance()
+        if performance_id is None:
+            return 0
+        queued = ReservationRequest.objects.filter(
+            status=ReservationRequest.Status.QUEUED,
+            performance_id=performance_id,
+        ).order_by("id")[:batch_size]
+        requests = list(queued)
+        try:
+            with transaction.atomic():
+                book_requests(requests)
+        except (DataError, IntegrityError):
+            # The failed attempt left its changes on the instances.
+            book_each(list(queued))
+        return len(requests)
+
+    return with_retries(book)
+
+
+def drain(batch_size: int = None, poll_interval: float = 0) -> int:
+    """Process batches until the queue is empty.
+
+    With a ``poll_interval`` keep polling the queue that often instead
+    of returning. Returns the number of requests processed.
+    """
+    processed = 0
+    while True:
+        try:
+            count = process_batch(batch_size)
+        except Exception:
+            logger.exception("Processing a reservation batch failed")
+            count = 0
+        processed += count
+        if count:
+            continue
+        if not poll_interval:
+            return processed
+        time.sleep(poll_interval)
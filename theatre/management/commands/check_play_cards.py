@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from theatre.models import Play
+
+
+class Command(BaseCommand):
+    help = "Compare play cards with genres and actors and repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report plays whose cards drifted",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        plays = Play.objects.order_by("id").values("id", *Play.CARD_FIELDS)
+        drifted = []
+        last_id = 0
+        while True:
+            batch = list(plays.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]["id"]
+            cards = Play.build_cards(play["id"] for play in batch)
+            for play in batch:
+                play_id = play.pop("id")
+                if play == cards[play_id]:
+                    continue
+                self.stdout.write(
+                    f"Play {play_id}: {play}, expected {cards[play_id]}"
+                )
+                drifted.append(play_id)
+
+        if not options["dry_run"]:
+            Play.refresh_cards(drifted, batch_size=batch_size)
+
+        action = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {len(drifted)} drifted card(s)")
+        )
@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from theatre.export import FORMATTERS, export_rows
+
+
+class Command(BaseCommand):
+    help = "Stream sold tickets with their reservations as NDJSON, JSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            type=date.fromisoformat,
+            help="First show date to export (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            type=date.fromisoformat,
+            help="Last show date to export (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--performance", type=int, help="Export one performance only"
+        )
+        parser.add_argument(
+            "--format",
+            dest="output",
+            choices=sorted(FORMATTERS),
+            default="ndjson",
+        )
+        parser.add_argument(
+            "--output",
+            dest="path",
+            help="File to write to instead of stdout",
+        )
+
+    def handle(self, *args, **options):
+        rows = export_rows(
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            performance_id=options["performance"],
+        )
+        lines = FORMATTERS[options["output"]](rows)
+
+        if not options["path"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["path"], "w", newline="") as file:
+            file.writelines(lines)
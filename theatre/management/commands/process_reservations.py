@@ -0,0 +1,55 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from theatre.intake import drain
+
+
+class Command(BaseCommand):
+    help = "Book queued reservations in batches per performance"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Requests booked per transaction "
+                 "(default: RESERVATION_QUEUE_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes, each booking a different performance",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=0,
+            help="Keep polling the queue every POLL_INTERVAL seconds "
+                 "instead of stopping once it is empty",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        poll_interval = options["poll_interval"]
+        if options["processes"] <= 1:
+            processed = drain(batch_size, poll_interval)
+            self.stdout.write(f"Processed {processed} request(s)")
+            return
+
+        # Forked workers must not share the parent's connections.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(
+                target=drain, args=(batch_size, poll_interval)
+            )
+            for _ in range(options["processes"])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(f"{len(workers)} worker(s) finished")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from theatre.models import CalendarDay
+
+
+class Command(BaseCommand):
+    help = "Recompute the availability calendar from all performances"
+
+    def handle(self, *args, **options):
+        days = CalendarDay.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {days} calendar entries")
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from theatre.models import Performance
+
+
+class Command(BaseCommand):
+    help = "Recompute Performance.tickets_sold and repair drifted counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report performances whose counters drifted",
+        )
+
+    def handle(self, *args, **options):
+        performances = (
+            Performance.objects
+            .annotate(tickets_count=Count("tickets"))
+            .values_list("id", "tickets_sold", "tickets_count")
+            .order_by("id")
+        )
+        repaired = 0
+        for performance_id, tickets_sold, tickets_count in (
+            performances.iterator(chunk_size=2000)
+        ):
+            if tickets_sold == tickets_count:
+                continue
+
+            self.stdout.write(
+                f"Performance {performance_id}: "
+                f"tickets_sold={tickets_sold}, tickets={tickets_count}"
+            )
+            if not options["dry_run"]:
+                Performance.recount_tickets(performance_id)
+            repaired += 1
+
+        action = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {repaired} drifted counter(s)")
+        )
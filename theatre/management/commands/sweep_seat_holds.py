@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from theatre.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep sweeping every INTERVAL seconds instead of once",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            deleted = sweep_expired_holds()
+            self.stdout.write(f"Deleted {deleted} expired hold(s)")
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import OperationalError
+
+
+class Command(BaseCommand):
+    help = "Wait until the database accepts connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to wait for",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Give up after TIMEOUT seconds",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait between attempts",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
+        self.stdout.write("Waiting for the database...")
+        while True:
+            try:
+                connection.ensure_connection()
+                break
+            except OperationalError as exc:
+                if time.monotonic() >= deadline:
+                    raise CommandError(f"Database unavailable: {exc}")
+                self.stdout.write(
+                    f"Database unavailable, retrying in "
+                    f"{options['interval']:g}s"
+                )
+                time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("Database available"))
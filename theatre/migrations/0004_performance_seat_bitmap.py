@@ -0,0 +1,36 @@
+# Generated by Django 4.1 on 2026-10-18 17:52
+
+from django.db import migrations, models
+
+from theatre.seat_map import SeatMap
+
+
+def fill_seat_bitmaps(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    Ticket = apps.get_model("theatre", "Ticket")
+
+    for performance in Performance.objects.select_related("theatre_hall"):
+        hall = performance.theatre_hall
+        seats = Ticket.objects.filter(
+            performance=performance,
+            row__lte=hall.rows,
+            seat__lte=hall.seats_in_row,
+        ).values_list("row", "seat")
+        seat_map = SeatMap.from_seats(hall.rows, hall.seats_in_row, seats)
+        performance.seat_bitmap = seat_map.to_bytes()
+        performance.save(update_fields=["seat_bitmap"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0003_alter_actor_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="seat_bitmap",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(fill_seat_bitmaps, migrations.RunPython.noop),
+    ]
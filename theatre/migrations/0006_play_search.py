@@ -0,0 +1,57 @@
+# Generated by Django 4.1 on 2026-10-18 17:59
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS theatre_play_search_vector_gin "
+        "ON theatre_play USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS theatre_play_title_trgm "
+        "ON theatre_play USING gin (title gin_trgm_ops)"
+    )
+
+    Play = apps.get_model("theatre", "Play")
+    config = settings.PLAY_SEARCH_CONFIG
+    Play.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config=config)
+            + SearchVector("description", weight="B", config=config)
+        )
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS theatre_play_title_trgm")
+    schema_editor.execute(
+        "DROP INDEX IF EXISTS theatre_play_search_vector_gin"
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0005_performance_tickets_sold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="play",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.1 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0006_play_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["play", "show_time"], name="performance_play_show_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["show_time", "id"], name="performance_show_time_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=models.Index(fields=["title", "id"], name="play_title_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "created_at"], name="reservation_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.1 on 2026-10-18 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("theatre", "0007_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatHold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.IntegerField()),
+                ("seat", models.IntegerField()),
+                ("expires_at", models.DateTimeField()),
+                (
+                    "performance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holds",
+                        to="theatre.performance",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="seathold",
+            index=models.Index(
+                fields=["performance", "expires_at"],
+                name="seathold_performance_exp_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seathold",
+            index=models.Index(fields=["expires_at"], name="seathold_expires_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="seathold",
+            constraint=models.UniqueConstraint(
+                fields=("performance", "row", "seat"), name="unique_seat_hold"
+            ),
+        ),
+    ]
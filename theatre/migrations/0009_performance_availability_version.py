@@ -0,0 +1,25 @@
+# Generated by Django 4.1 on 2026-10-18 18:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0008_seat_hold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="availability_updated_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="performance",
+            name="availability_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.1 on 2026-10-18 18:13
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_calendar(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    CalendarDay = apps.get_model("theatre", "CalendarDay")
+
+    summaries = (
+        Performance.objects
+        .annotate(
+            date=TruncDate(
+                "show_time", tzinfo=timezone.get_current_timezone()
+            )
+        )
+        .order_by()
+        .values("date", "play")
+        .annotate(
+            performance_count=Count("id"),
+            capacity=Sum(
+                F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+            ),
+            sold=Sum("tickets_sold"),
+        )
+    )
+    CalendarDay.objects.bulk_create(
+        CalendarDay(
+            date=summary["date"],
+            play_id=summary["play"],
+            performances=summary["performance_count"],
+            capacity=summary["capacity"],
+            tickets_sold=summary["sold"],
+        )
+        for summary in summaries
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0009_performance_availability_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CalendarDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("performances", models.PositiveIntegerField(default=0)),
+                ("capacity", models.PositiveIntegerField(default=0)),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+                (
+                    "play",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="calendar_days",
+                        to="theatre.play",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date", "play"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="calendarday",
+            constraint=models.UniqueConstraint(
+                fields=("date", "play"), name="unique_calendar_day"
+            ),
+        ),
+        migrations.RunPython(fill_calendar, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.1 on 2026-10-18 18:30
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_play_cards(apps, schema_editor):
+    Play = apps.get_model("theatre", "Play")
+
+    genres = defaultdict(list)
+    for play_id, name in (
+        Play.genres.through.objects.order_by("genre_id")
+        .values_list("play_id", "genre__name")
+    ):
+        genres[play_id].append(name)
+    actors = defaultdict(list)
+    for play_id, first_name, last_name in (
+        Play.actors.through.objects.order_by("actor_id")
+        .values_list("play_id", "actor__first_name", "actor__last_name")
+    ):
+        actors[play_id].append(f"{first_name} {last_name}")
+
+    Play.objects.bulk_update(
+        [
+            Play(
+                pk=play_id,
+                genre_names=genres[play_id],
+                actor_names=actors[play_id],
+            )
+            for play_id in genres.keys() | actors.keys()
+        ],
+        ["genre_names", "actor_names"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0010_calendar_day"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="play",
+            name="actor_names",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name="play",
+            name="genre_names",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(fill_play_cards, migrations.RunPython.noop),
+    ]
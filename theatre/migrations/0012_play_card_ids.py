@@ -0,0 +1,55 @@
+# Generated by Django 4.1 on 2026-10-18 18:33
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_play_card_ids(apps, schema_editor):
+    Play = apps.get_model("theatre", "Play")
+
+    genre_ids = defaultdict(list)
+    for play_id, genre_id in (
+        Play.genres.through.objects.order_by("genre_id")
+        .values_list("play_id", "genre_id")
+    ):
+        genre_ids[play_id].append(genre_id)
+    actor_ids = defaultdict(list)
+    for play_id, actor_id in (
+        Play.actors.through.objects.order_by("actor_id")
+        .values_list("play_id", "actor_id")
+    ):
+        actor_ids[play_id].append(actor_id)
+
+    Play.objects.bulk_update(
+        [
+            Play(
+                pk=play_id,
+                genre_ids=genre_ids[play_id],
+                actor_ids=actor_ids[play_id],
+            )
+            for play_id in genre_ids.keys() | actor_ids.keys()
+        ],
+        ["genre_ids", "actor_ids"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0011_play_card"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="play",
+            name="actor_ids",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name="play",
+            name="genre_ids",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(fill_play_card_ids, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,15 @@
-from django.db import models
+from datetime import date, datetime, time, timedelta
+from typing import Iterable
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from theatre.seat_map import SeatMap
 
 
 class Genre(models.Model):
@@ -33,13 +42,71 @@ class Play(models.Model):
     description = models.TextField(max_length=255)
     genres = models.ManyToManyField(Genre)
     actors = models.ManyToManyField(Actor)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # The play card: names shown in play lists and the ids used for
+    # facet counts, kept in sync with the relations by signal handlers
+    # so that neither needs joins.
+    genre_ids = models.JSONField(default=list, editable=False)
+    genre_names = models.JSONField(default=list, editable=False)
+    actor_ids = models.JSONField(default=list, editable=False)
+    actor_names = models.JSONField(default=list, editable=False)
+
+    CARD_FIELDS = ("genre_ids", "genre_names", "actor_ids", "actor_names")
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=["title", "id"], name="play_title_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def build_cards(cls, play_ids: Iterable[int]) -> dict[int, dict]:
+        """Card fields of each play, with relations ordered by id."""
+        cards = {
+            play_id: {field: [] for field in cls.CARD_FIELDS}
+            for play_id in play_ids
+        }
+        for play_id, genre_id, name in (
+            cls.genres.through.objects.filter(play_id__in=cards)
+            .order_by("genre_id")
+            .values_list("play_id", "genre_id", "genre__name")
+        ):
+            cards[play_id]["genre_ids"].append(genre_id)
+            cards[play_id]["genre_names"].append(name)
+        for play_id, actor_id, first_name, last_name in (
+            cls.actors.through.objects.filter(play_id__in=cards)
+            .order_by("actor_id")
+            .values_list(
+                "play_id", "actor_id", "actor__first_name", "actor__last_name"
+            )
+        ):
+            cards[play_id]["actor_ids"].append(actor_id)
+            cards[play_id]["actor_names"].append(f"{first_name} {last_name}")
+        return cards
+
+    @classmethod
+    def refresh_cards(
+        cls, play_ids: Iterable[int], batch_size=1000
+    ) -> dict[int, dict]:
+        """Rebuild and store the cards of the plays, and return them."""
+        play_ids = sorted(set(play_ids))
+        cards = {}
+        for start in range(0, len(play_ids), batch_size):
+            batch = cls.build_cards(play_ids[start:start + batch_size])
+            cls.objects.bulk_update(
+                [cls(pk=play_id, **card) for play_id, card in batch.items()],
+                cls.CARD_FIELDS,
+            )
+            cards.update(batch)
+        return cards
+
+    def refresh_card(self) -> None:
+        for field, value in Play.refresh_cards([self.pk])[self.pk].items():
+            setattr(self, field, value)
+
 
 class TheatreHall(models.Model):
     name = models.CharField(max_length=255)
@@ -65,19 +132,208 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at"],
+                name="reservation_user_created_idx",
+            ),
+        ]
 
 
 class Performance(models.Model):
     show_time = models.DateTimeField()
     play = models.ForeignKey(Play, on_delete=models.CASCADE)
     theatre_hall = models.ForeignKey(TheatreHall, on_delete=models.CASCADE)
+    seat_bitmap = models.BinaryField(default=bytes)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+    availability_version = models.PositiveIntegerField(
+        default=0, editable=False
+    )
+    availability_updated_at = models.DateTimeField(
+        default=timezone.now, editable=False
+    )
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [
+            models.Index(
+                fields=["play", "show_time"],
+                name="performance_play_show_idx",
+            ),
+            models.Index(
+                fields=["show_time", "id"],
+                name="performance_show_time_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.play.title + " " + str(self.show_time)
 
+    # Written only by ticket writers under ``Performance.lock``.
+    SEAT_STATE_FIELDS = (
+        "seat_bitmap",
+        "tickets_sold",
+        "availability_version",
+        "availability_updated_at",
+    )
+
+    def save(
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        if self._state.adding:
+            if not self.seat_bitmap:
+                self.seat_bitmap = SeatMap(
+                    self.theatre_hall.rows, self.theatre_hall.seats_in_row
+                ).to_bytes()
+            super().save(force_insert, force_update, using, update_fields)
+            return
+
+        # A stale instance must not roll back the seats sold since it
+        # was loaded, so only saves naming the seat state write it.
+        if update_fields is None and not force_insert:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.SEAT_STATE_FIELDS
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+        Performance.touch_availability([self.pk])
+
+    @property
+    def seat_map(self) -> SeatMap:
+        hall = self.theatre_hall
+        data = bytes(self.seat_bitmap or b"")
+        if len(data) == SeatMap.size_for(hall.rows, hall.seats_in_row):
+            return SeatMap(hall.rows, hall.seats_in_row, data)
+
+        # The hall was resized or the bitmap was never written.
+        return self.build_seat_map()
+
+    @property
+    def availability_map(self) -> SeatMap:
+        """Seat map with sold seats and seats on an active hold."""
+        seat_map = self.seat_map
+        for row, seat in self.holds.active().values_list("row", "seat"):
+            if seat_map.fits(row, seat):
+                seat_map.take(row, seat)
+        return seat_map
+
+    def build_seat_map(self) -> SeatMap:
+        hall = self.theatre_hall
+        return SeatMap.from_seats(
+            hall.rows,
+            hall.seats_in_row,
+            self.tickets.filter(
+                row__lte=hall.rows, seat__lte=hall.seats_in_row
+            ).values_list("row", "seat"),
+        )
+
+    @classmethod
+    def lock(cls, performance_ids: Iterable[int]) -> dict:
+        """Serialize ticket writers of the given performances.
+
+        Must run inside a transaction. Takes a row lock on each
+        performance, or a transaction-level advisory lock keyed by the
+        performance id when ``RESERVATION_LOCK_MODE`` is ``"advisory"``
+        on Postgres. Locks are taken in id order to avoid deadlocks
+        between writers of overlapping performances.
+        """
+        performance_ids = sorted(set(performance_ids))
+        queryset = (
+            cls.objects
+            .select_related("theatre_hall")
+            .filter(pk__in=performance_ids)
+            .order_by("pk")
+        )
+        if (
+            settings.RESERVATION_LOCK_MODE == "advisory"
+            and connection.vendor == "postgresql"
+        ):
+            with connection.cursor() as cursor:
+                for performance_id in performance_ids:
+                    cursor.execute(
+                        "SELECT pg_advisory_xact_lock(%s)", [performance_id]
+                    )
+        else:
+            queryset = queryset.select_for_update(of=("self",))
+        return {performance.pk: performance for performance in queryset}
+
+    @classmethod
+    def track_tickets(
+        cls,
+        performance_id: int,
+        seats: Iterable[tuple[int, int]],
+        sold: bool = True,
+    ) -> None:
+        with transaction.atomic():
+            performance = cls.lock([performance_id]).get(performance_id)
+            if performance is not None:
+                performance.apply_tickets(seats, sold=sold)
+
+    def apply_tickets(
+        self, seats: Iterable[tuple[int, int]], sold: bool = True
+    ) -> None:
+        """Store sold or released seats; the caller must hold the row lock."""
+        seats = list(seats)
+        seat_map = self.seat_map
+        for row, seat in seats:
+            if sold:
+                seat_map.take(row, seat)
+            elif seat_map.fits(row, seat):
+                seat_map.release(row, seat)
+        self.seat_bitmap = seat_map.to_bytes()
+        self.tickets_sold += len(seats) if sold else -len(seats)
+        Performance.objects.filter(pk=self.pk).update(
+            seat_bitmap=self.seat_bitmap,
+            tickets_sold=self.tickets_sold,
+            availability_version=F("availability_version") + 1,
+            availability_updated_at=timezone.now(),
+        )
+        day, play_id = self.calendar_key
+        CalendarDay.objects.filter(date=day, play_id=play_id).update(
+            tickets_sold=F("tickets_sold")
+            + (len(seats) if sold else -len(seats))
+        )
+
+    @classmethod
+    def recount_tickets(cls, performance_id: int) -> None:
+        with transaction.atomic():
+            performance = cls.lock([performance_id]).get(performance_id)
+            if performance is not None:
+                cls.objects.filter(pk=performance_id).update(
+                    seat_bitmap=performance.build_seat_map().to_bytes(),
+                    tickets_sold=performance.tickets.count(),
+                    availability_version=F("availability_version") + 1,
+                    availability_updated_at=timezone.now(),
+                )
+                CalendarDay.refresh([performance.calendar_key])
+
+    @property
+    def calendar_key(self) -> tuple[date, int]:
+        show_time = self._meta.get_field("show_time").to_python(
+            self.show_time
+        )
+        if timezone.is_naive(show_time):
+            show_time = timezone.make_aware(show_time)
+        return timezone.localdate(show_time), self.play_id
+
+    @classmethod
+    def touch_availability(cls, performance_ids: Iterable[int]) -> None:
+        """Mark the seat availability of the performances as changed.
+
+        Ticket writes do this themselves; call it after any other change
+        that shows in the seat map, such as placing or releasing holds.
+        """
+        cls.objects.filter(pk__in=list(performance_ids)).update(
+            availability_version=F("availability_version") + 1,
+            availability_updated_at=timezone.now(),
+        )
+
 
 class Ticket(models.Model):
     performance = models.ForeignKey(
@@ -126,3 +382,188 @@ class Ticket(models.Model):
 
     class Meta:
         unique_together = ("performance", "row", "seat")
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    performance = models.ForeignKey(
+        Performance, on_delete=models.CASCADE, related_name="holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    expires_at = models.DateTimeField()
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    def __str__(self):
+        return (
+            f"{str(self.performance)} (row: {self.row}, seat: {self.seat}) "
+            f"held until {self.expires_at}"
+        )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["performance", "row", "seat"],
+                name="unique_seat_hold",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["performance", "expires_at"],
+                name="seathold_performance_exp_idx",
+            ),
+            models.Index(fields=["expires_at"], name="seathold_expires_idx"),
+        ]
+
+
+class ReservationRequest(models.Model):
+    """A reservation waiting to be booked by the queue worker.
+
+    Requests are queued under their lowest performance id and booked in
+    batches per performance by ``theatre.intake.process_batch``.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        BOOKED = "booked"
+        REJECTED = "rejected"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    performance = models.ForeignKey(
+        Performance,
+        on_delete=models.CASCADE,
+        related_name="reservation_requests",
+    )
+    tickets = models.JSONField()
+    status = models.CharField(
+        max_length=8, choices=Status.choices, default=Status.QUEUED
+    )
+    errors = models.JSONField(null=True, blank=True)
+    reservation = models.OneToOneField(
+        Reservation,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="request",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["performance", "id"],
+                condition=Q(status="queued"),
+                name="reservationrequest_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Request {self.pk} by {self.user_id}: {self.status}"
+
+
+class CalendarDay(models.Model):
+    """Performances and seats of one play on one local day.
+
+    Kept up to date by ``Performance.apply_tickets`` and the performance
+    signal handlers; ``CalendarDay.rebuild`` recomputes all of it.
+    """
+
+    date = models.DateField()
+    play = models.ForeignKey(
+        Play, on_delete=models.CASCADE, related_name="calendar_days"
+    )
+    performances = models.PositiveIntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["date", "play"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "play"], name="unique_calendar_day"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.play} on {self.date}"
+
+    @property
+    def seats_remaining(self) -> int:
+        return self.capacity - self.tickets_sold
+
+    @staticmethod
+    def summarize(performances):
+        return (
+            performances
+            .annotate(
+                date=TruncDate(
+                    "show_time", tzinfo=timezone.get_current_timezone()
+                )
+            )
+            .order_by()
+            .values("date", "play")
+            .annotate(
+                performance_count=Count("id"),
+                capacity=Sum(
+                    F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+                ),
+                sold=Sum("tickets_sold"),
+            )
+        )
+
+    @classmethod
+    def refresh(cls, keys: Iterable[tuple[date, int]]) -> None:
+        """Recompute the entries of the given ``(date, play_id)`` pairs."""
+        for day, play_id in set(keys):
+            start = timezone.make_aware(datetime.combine(day, time.min))
+            end = timezone.make_aware(
+                datetime.combine(day + timedelta(days=1), time.min)
+            )
+            summary = cls.summarize(
+                Performance.objects.filter(
+                    play_id=play_id, show_time__gte=start, show_time__lt=end
+                )
+            ).order_by("date").first()
+            if summary is None:
+                cls.objects.filter(date=day, play_id=play_id).delete()
+                continue
+            cls.objects.update_or_create(
+                date=day,
+                play_id=play_id,
+                defaults={
+                    "performances": summary["performance_count"],
+                    "capacity": summary["capacity"],
+                    "tickets_sold": summary["sold"],
+                },
+            )
+
+    @classmethod
+    def rebuild(cls) -> int:
+        with transaction.atomic():
+            cls.objects.all().delete()
+            days = cls.objects.bulk_create(
+                cls(
+                    date=summary["date"],
+                    play_id=summary["play"],
+                    performances=summary["performance_count"],
+                    capacity=summary["capacity"],
+                    tickets_sold=summary["sold"],
+                )
+                for summary in cls.summarize(Performance.objects.all())
+            )
+        return len(days)
@@ -0,0 +1,206 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a unique composite ordering.
+
+    ``ordering`` must end with a unique field (usually ``id``), so every
+    row has a distinct position. Cursors store the ordering values of the
+    boundary row and each page is fetched with a range condition on them,
+    which keeps deep pages as cheap as the first one.
+    """
+
+    ordering = ("id",)
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.default_page_size = settings.KEYSET_PAGINATION_PAGE_SIZE
+        self.max_page_size = settings.KEYSET_PAGINATION_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        if page_size <= 0:
+            return self.default_page_size
+        return min(page_size, self.max_page_size)
+
+    @staticmethod
+    def _split(field):
+        return field.lstrip("-"), field.startswith("-")
+
+    def _position_filter(self, model, position, reverse):
+        """Rows strictly after ``position`` in (possibly reversed) order.
+
+        Builds ``a >= x AND (a > x OR (a = x AND b > y) ...)`` so that
+        the leading column is a plain range on the index.
+        """
+        condition = None
+        for index in reversed(range(len(self.ordering))):
+            name, descending = self._split(self.ordering[index])
+            value = model._meta.get_field(name).to_python(position[index])
+            lookup = "lt" if descending != reverse else "gt"
+            after = Q(**{f"{name}__{lookup}": value})
+            if condition is None:
+                condition = after
+            else:
+                condition = after | (Q(**{name: value}) & condition)
+
+        name, descending = self._split(self.ordering[0])
+        value = model._meta.get_field(name).to_python(position[0])
+        lookup = "lte" if descending != reverse else "gte"
+        return Q(**{f"{name}__{lookup}": value}) & condition
+
+    def _order_by(self, reverse):
+        fields = []
+        for field in self.ordering:
+            name, descending = self._split(field)
+            fields.append(f"-{name}" if descending != reverse else name)
+        return fields
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = cursor["p"]
+            reverse = bool(cursor.get("r", False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        # ``encode_cursor`` writes every value as a string.
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(value, str) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        # ``instance`` is a model instance or a named ``values_list`` row.
+        position = []
+        for field in self.ordering:
+            name, _ = self._split(field)
+            value = getattr(instance, name)
+            position.append(
+                value.isoformat() if hasattr(value, "isoformat")
+                else str(value)
+            )
+        cursor = {"p": position}
+        if reverse:
+            cursor["r"] = True
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(cursor, separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_page_queryset(self, queryset, request):
+        """Return the unevaluated queryset of the requested page.
+
+        It holds one row more than the page size, which tells whether
+        there is a next page; pass the fetched rows to ``finish_page``.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self._order_by(self.reverse))
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(
+                    self._position_filter(
+                        queryset.model, self.position, self.reverse
+                    )
+                )
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+
+        return queryset[:self.page_size + 1]
+
+    def finish_page(self, results):
+        results = list(results)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            # Reverse cursors are only issued from a page further on.
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, self.position is not None
+
+        self.next = self.previous = None
+        if results and has_next:
+            self.next = self.encode_cursor(results[-1], reverse=False)
+        if results and has_previous:
+            self.previous = self.encode_cursor(results[0], reverse=True)
+
+        return results
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(self.get_page_queryset(queryset, request))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.next),
+            ("previous", self.previous),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class PerformancePagination(KeysetPagination):
+    ordering = ("-show_time", "-id")
+
+
+class PlayPagination(KeysetPagination):
+    ordering = ("title", "id")
+
+
+class PlaySearchPagination(LimitOffsetPagination):
+    def __init__(self):
+        self.default_limit = settings.KEYSET_PAGINATION_PAGE_SIZE
+        self.max_limit = settings.KEYSET_PAGINATION_MAX_PAGE_SIZE
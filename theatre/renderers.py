@@ -0,0 +1,92 @@
+"""JSON renderers backed by orjson when it is installed.
+
+Output is byte-for-byte what DRF's ``JSONRenderer`` produces with the
+default settings: values orjson does not handle the same way (dates and
+times, Decimals, lazy strings) go through the encoder's ``default``.
+Without orjson, or when the output has to be indented or ASCII-only,
+the renderers use the stdlib ``json`` module.
+"""
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """``JSONRenderer`` that encodes with orjson when it can.
+
+    orjson writes NaN and infinity as ``null`` where the stdlib encoder
+    raises in strict mode; serializers never produce them.
+    """
+
+    def __init__(self):
+        self._default = self.encoder_class().default
+
+    def use_orjson(self, accepted_media_type, renderer_context) -> bool:
+        return (
+            orjson is not None
+            and self.compact
+            and self.strict
+            and not self.ensure_ascii
+            and self.get_indent(
+                accepted_media_type, renderer_context or {}
+            ) is None
+        )
+
+    def dumps(self, data) -> bytes:
+        ret = orjson.dumps(data, default=self._default, option=OPTIONS)
+        # Keep the output a strict javascript subset, as DRF does.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.use_orjson(accepted_media_type, renderer_context):
+            try:
+                return self.dumps(data)
+            except orjson.JSONEncodeError:
+                # Integers past 64 bits and the like; the stdlib encoder
+                # either handles them or raises the usual error.
+                pass
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    """Render a very large list as a JSON array a chunk at a time.
+
+    ``stream()`` takes any iterable, such as a queryset ``iterator()``,
+    and yields byte strings that join into the array ``render()`` would
+    return for the whole list.
+    """
+
+    chunk_size = 500
+
+    def stream(self, items, accepted_media_type=None, renderer_context=None):
+        separator = b"," if self.compact else b", "
+        yield b"["
+        batch, first = [], True
+        for item in items:
+            batch.append(
+                b"null" if item is None
+                else self.render(item, accepted_media_type, renderer_context)
+            )
+            if len(batch) >= self.chunk_size:
+                yield (b"" if first else separator) + separator.join(batch)
+                batch, first = [], False
+        if batch:
+            yield (b"" if first else separator) + separator.join(batch)
+        yield b"]"
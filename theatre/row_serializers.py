@@ -0,0 +1,111 @@
+"""List serialization straight from ``values_list()`` rows.
+
+A row serializer renders the same items as its model serializer but
+skips model instances and DRF field machinery: each row is turned into
+a dict by a mapper compiled once per class, with DRF fields used only
+where a value needs converting. Enabled by ``FAST_LIST_SERIALIZATION``.
+"""
+from django.conf import settings
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from theatre.instrumentation import timed_serializer
+
+
+def compile_mapper(fields):
+    """Build ``row -> dict`` for ``fields`` of ``(name, index, converter)``.
+
+    The value at ``index`` of the row is passed through ``converter``,
+    or copied when there is no converter.
+    """
+    fields = tuple(fields)
+
+    def mapper(row):
+        return {
+            name: row[index] if converter is None else converter(row[index])
+            for name, index, converter in fields
+        }
+
+    return mapper
+
+
+class RowSerializer:
+    """Render list items from rows of ``fields``.
+
+    ``fields`` are ``(name, lookup, converter)`` triples in output
+    order; ``lookup`` is a ``values_list`` lookup or annotation.
+    """
+
+    fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.lookups = [lookup for _, lookup, _ in cls.fields]
+        cls.mapper = staticmethod(compile_mapper(
+            (name, index, converter)
+            for index, (name, _, converter) in enumerate(cls.fields)
+        ))
+
+    def get_rows(self, queryset):
+        # Keyset cursors read the ordering fields by name.
+        return queryset.values_list(*self.lookups, named=True)
+
+    def to_representation(self, rows):
+        with timed_serializer():
+            mapper = self.mapper
+            return [mapper(row) for row in rows]
+
+
+class FastListMixin:
+    """Serve ``list`` from ``row_serializer_class`` when enabled."""
+
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not (
+            settings.FAST_LIST_SERIALIZATION and self.row_serializer_class
+        ):
+            return super().list(request, *args, **kwargs)
+
+        row_serializer = self.row_serializer_class()
+        rows = row_serializer.get_rows(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                row_serializer.to_representation(page)
+            )
+        return Response(row_serializer.to_representation(rows))
+
+
+_datetime = serializers.DateTimeField().to_representation
+
+
+class PerformanceRowSerializer(RowSerializer):
+    fields = (
+        ("id", "id", None),
+        ("show_time", "show_time", _datetime),
+        ("play_title", "play__title", None),
+        ("theatre_hall_name", "theatre_hall__name", None),
+        ("theatre_hall_capacity", "theatre_hall_capacity", None),
+        ("tickets_available", "tickets_available", None),
+    )
+
+    def get_rows(self, queryset):
+        return super().get_rows(queryset.annotate(
+            theatre_hall_capacity=(
+                F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+            )
+        ))
+
+
+class PlayRowSerializer(RowSerializer):
+    fields = (
+        ("id", "id", None),
+        ("title", "title", None),
+        ("description", "description", None),
+        ("genres", "genre_names", None),
+        ("actors", "actor_names", None),
+    )
@@ -0,0 +1,156 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, When
+
+from theatre.cache import get_versions
+from theatre.models import Play
+
+
+TOKEN_RE = re.compile(r"\w+")
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+MIN_SIMILARITY = 0.3
+MAX_FALLBACK_RESULTS = 1000
+
+
+def play_search_vector():
+    config = settings.PLAY_SEARCH_CONFIG
+    return (
+        SearchVector("title", weight="A", config=config)
+        + SearchVector("description", weight="B", config=config)
+    )
+
+
+def update_search_vector(play_ids) -> None:
+    if connection.vendor == "postgresql":
+        Play.objects.filter(pk__in=play_ids).update(
+            search_vector=play_search_vector()
+        )
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlaySearchIndex:
+    """In-process inverted index used when the database is not Postgres.
+
+    Title and description tokens are weighted like the ``A``/``B``
+    weights of the Postgres search vector, and a trigram index over the
+    vocabulary gives the same kind of typo tolerance as ``pg_trgm``.
+    """
+
+    def __init__(self, rows):
+        self.postings = defaultdict(dict)
+        self.trigram_tokens = defaultdict(set)
+
+        for play_id, title, description in rows:
+            for weight, text in (
+                (DESCRIPTION_WEIGHT, description),
+                (TITLE_WEIGHT, title),
+            ):
+                for token in tokenize(text):
+                    postings = self.postings[token]
+                    postings[play_id] = max(postings.get(play_id, 0), weight)
+
+        for token in self.postings:
+            for trigram in trigrams(token):
+                self.trigram_tokens[trigram].add(token)
+
+    def similar_tokens(self, token: str) -> dict[str, float]:
+        if token in self.postings:
+            return {token: 1.0}
+
+        query_trigrams = trigrams(token)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for candidate in self.trigram_tokens.get(trigram, ()):
+                shared[candidate] += 1
+
+        similar = {}
+        for candidate, count in shared.items():
+            union = len(query_trigrams) + len(trigrams(candidate)) - count
+            similarity = count / union
+            if similarity >= MIN_SIMILARITY:
+                similar[candidate] = similarity
+        return similar
+
+    def search(self, query: str) -> list[int]:
+        scores = defaultdict(float)
+        for token in tokenize(query):
+            token_scores = defaultdict(float)
+            for candidate, similarity in self.similar_tokens(token).items():
+                for play_id, weight in self.postings[candidate].items():
+                    token_scores[play_id] = max(
+                        token_scores[play_id], similarity * weight
+                    )
+            for play_id, score in token_scores.items():
+                scores[play_id] += score
+
+        return sorted(scores, key=lambda play_id: (-scores[play_id], play_id))
+
+
+_index_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def get_search_index() -> PlaySearchIndex:
+    global _index, _index_version
+
+    version = get_versions([Play])
+    with _index_lock:
+        if _index is None or _index_version != version:
+            _index = PlaySearchIndex(
+                Play.objects.values_list("id", "title", "description")
+            )
+            _index_version = version
+        return _index
+
+
+def search_plays(queryset, query: str):
+    """Filter ``queryset`` to plays matching ``query``, best match first."""
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(
+            query, search_type="websearch", config=settings.PLAY_SEARCH_CONFIG
+        )
+        return (
+            queryset
+            .filter(
+                Q(search_vector=search_query)
+                | Q(title__trigram_similar=query)
+            )
+            .annotate(rank=(
+                SearchRank(F("search_vector"), search_query)
+                + TrigramSimilarity("title", query)
+            ))
+            .order_by("-rank", "title", "id")
+        )
+
+    play_ids = get_search_index().search(query)[:MAX_FALLBACK_RESULTS]
+    if not play_ids:
+        return queryset.none()
+    return queryset.filter(id__in=play_ids).order_by(
+        Case(
+            *[
+                When(id=play_id, then=position)
+                for position, play_id in enumerate(play_ids)
+            ],
+            output_field=IntegerField(),
+        ),
+    )
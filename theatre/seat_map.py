@@ -0,0 +1,85 @@
+import base64
+from typing import Iterable, Iterator
+
+
+class SeatMap:
+    """Packed rows x seats_in_row occupancy bitmap of a performance.
+
+    Seats are stored row-major with one bit per seat, most significant
+    bit first: seat ``(row, seat)`` lives at bit index
+    ``(row - 1) * seats_in_row + (seat - 1)``.
+    """
+
+    encoding = "base64"
+
+    def __init__(self, rows: int, seats_in_row: int, data: bytes = b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = self.size_for(rows, seats_in_row)
+        if data and len(data) != size:
+            raise ValueError(
+                f"Seat map of {len(data)} bytes does not fit "
+                f"a {rows}x{seats_in_row} hall"
+            )
+        self._bits = bytearray(data) if data else bytearray(size)
+
+    @staticmethod
+    def size_for(rows: int, seats_in_row: int) -> int:
+        return (rows * seats_in_row + 7) // 8
+
+    @classmethod
+    def from_seats(
+        cls, rows: int, seats_in_row: int, seats: Iterable[tuple[int, int]]
+    ) -> "SeatMap":
+        seat_map = cls(rows, seats_in_row)
+        for row, seat in seats:
+            seat_map.take(row, seat)
+        return seat_map
+
+    def fits(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _position(self, row: int, seat: int) -> tuple[int, int]:
+        if not self.fits(row, seat):
+            raise ValueError(
+                f"Seat ({row}, {seat}) is outside of "
+                f"(1, {self.rows}) x (1, {self.seats_in_row})"
+            )
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 0x80 >> (index & 7)
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        byte, mask = self._position(row, seat)
+        return bool(self._bits[byte] & mask)
+
+    def take(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self._bits[byte] |= mask
+
+    def release(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self._bits[byte] &= ~mask
+
+    def taken_seats(self) -> Iterator[tuple[int, int]]:
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    row, seat = divmod(byte_index * 8 + bit, self.seats_in_row)
+                    yield row + 1, seat + 1
+
+    def taken_count(self) -> int:
+        return sum(bin(byte).count("1") for byte in self._bits)
+
+    def bit_string(self) -> str:
+        """The seat bits as a string of ``"0"``/``"1"`` in seat order."""
+        return format(
+            int.from_bytes(self._bits, "big"), f"0{len(self._bits) * 8}b"
+        )
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self._bits).decode("ascii")
@@ -1,5 +1,10 @@
-from django.db import transaction
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
+from theatre.booking import create_reservation
+from theatre.instrumentation import TimedSerializerMixin
 from theatre.models import (
     Genre,
     Actor,
@@ -7,40 +12,44 @@ from theatre.models import (
     Play,
     Performance,
     Ticket,
-    Reservation
+    Reservation,
+    ReservationRequest,
+    SeatHold,
+    CalendarDay,
 )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ("id", "name")
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Actor
         fields = ("id", "first_name", "last_name", "full_name")
 
 
-class TheatreHallSerializer(serializers.ModelSerializer):
+class TheatreHallSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TheatreHall
         fields = ("id", "name", "rows", "seats_in_row", "capacity")
 
 
-class PlaySerializer(serializers.ModelSerializer):
+class PlaySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Play
         fields = ("id", "title", "description", "genres", "actors")
 
 
 class PlayListSerializer(PlaySerializer):
-    genres = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="name"
+    # Read from the play card, so listing plays needs no related queries.
+    genres = serializers.ListField(
+        child=serializers.CharField(), source="genre_names", read_only=True
     )
-    actors = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="full_name"
+    actors = serializers.ListField(
+        child=serializers.CharField(), source="actor_names", read_only=True
     )
 
 
@@ -53,7 +62,7 @@ class PlayDetailSerializer(PlaySerializer):
         fields = ("id", "title", "genres", "actors")
 
 
-class PerformanceSerializer(serializers.ModelSerializer):
+class PerformanceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Performance
         fields = ("id", "show_time", "play", "theatre_hall")
@@ -81,7 +90,11 @@ class PerformanceListSerializer(PerformanceSerializer):
         )
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Performances are resolved in bulk by ``book_tickets`` instead of
+    # one lookup per ticket.
+    performance = serializers.IntegerField(source="performance_id")
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "performance")
@@ -99,12 +112,22 @@ class TicketTakenSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
+class SeatMapField(serializers.Field):
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return {
+            "rows": value.rows,
+            "seats_in_row": value.seats_in_row,
+            "encoding": value.encoding,
+            "bitmap": value.to_base64(),
+        }
+
+
 class PerformanceDetailSerializer(PerformanceSerializer):
-    taken_places = TicketTakenSeatsSerializer(
-        source="tickets",
-        many=True,
-        read_only=True
-    )
+    seat_map = SeatMapField(source="availability_map")
 
     class Meta:
         model = Performance
@@ -113,11 +136,57 @@ class PerformanceDetailSerializer(PerformanceSerializer):
             "show_time",
             "play",
             "theatre_hall",
-            "taken_places"
+            "seat_map"
         )
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class PerformanceDetailTakenPlacesSerializer(PerformanceDetailSerializer):
+    taken_places = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Performance
+        fields = PerformanceDetailSerializer.Meta.fields + ("taken_places",)
+
+    def get_taken_places(self, performance):
+        # Sold seats followed by seats on an active hold.
+        return TicketTakenSeatsSerializer(
+            list(performance.tickets.all())
+            + list(performance.holds.active()),
+            many=True,
+        ).data
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    seats = SeatSerializer(
+        many=True, allow_empty=False, max_length=settings.SEAT_HOLD_MAX_SEATS
+    )
+    minutes = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_MINUTES,
+        required=False,
+        write_only=True,
+    )
+    expires_at = serializers.DateTimeField(read_only=True)
+
+
+class SeatAllocationSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1)
+
+
+class SeatHoldListSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    class Meta:
+        model = SeatHold
+        fields = ("row", "seat", "expires_at")
+
+
+class ReservationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, allow_empty=False)
 
     class Meta:
@@ -125,13 +194,87 @@ class ReservationSerializer(serializers.ModelSerializer):
         fields = ("id", "tickets", "created_at")
 
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+        return create_reservation(
+            validated_data["user"], validated_data["tickets"]
+        )
 
 
 class ReservationListSerializer(ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class ReservationRequestSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    url = serializers.HyperlinkedIdentityField(
+        view_name="theatre:reservationrequest-detail"
+    )
+
+    class Meta:
+        model = ReservationRequest
+        fields = (
+            "id",
+            "url",
+            "status",
+            "errors",
+            "reservation",
+            "created_at",
+            "processed_at",
+        )
+
+
+class DateRangeSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if (
+            attrs.get("date_from")
+            and attrs.get("date_to")
+            and attrs["date_from"] > attrs["date_to"]
+        ):
+            raise serializers.ValidationError(
+                {"date_to": "Must not be before date_from."}
+            )
+        return attrs
+
+
+class TicketExportSerializer(DateRangeSerializer):
+    performance = serializers.IntegerField(required=False)
+    output = serializers.ChoiceField(
+        choices=("ndjson", "json", "csv"), default="ndjson"
+    )
+
+
+class CalendarQuerySerializer(DateRangeSerializer):
+    play = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        date_from = attrs.setdefault("date_from", timezone.localdate())
+        date_to = attrs.setdefault(
+            "date_to", date_from + timedelta(days=30)
+        )
+        attrs = super().validate(attrs)
+        if (date_to - date_from).days >= settings.CALENDAR_MAX_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "date_to": f"The range must be shorter than "
+                    f"{settings.CALENDAR_MAX_DAYS} days."
+                }
+            )
+        return attrs
+
+
+class CalendarDaySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    play_title = serializers.CharField(source="play.title", read_only=True)
+    seats_remaining = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = CalendarDay
+        fields = (
+            "date",
+            "play",
+            "play_title",
+            "performances",
+            "seats_remaining",
+        )
@@ -0,0 +1,186 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from theatre.cache import bump_version
+from theatre.search import update_search_vector
+from theatre.models import (
+    Genre,
+    Actor,
+    TheatreHall,
+    Play,
+    Performance,
+    Ticket,
+    CalendarDay,
+)
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, **kwargs):
+    if created:
+        Performance.track_tickets(
+            instance.performance_id, [(instance.row, instance.seat)]
+        )
+    else:
+        Performance.recount_tickets(instance.performance_id)
+
+
+def _deletion(instance, origin):
+    """The object a ``delete()`` call was made on, to keep its state on."""
+    return instance if origin is None else origin
+
+
+@receiver(pre_delete, sender=Ticket)
+def ticket_deleting(sender, instance, origin=None, **kwargs):
+    deletion = _deletion(instance, origin)
+    if not hasattr(deletion, "_released_seats"):
+        deletion._released_seats = defaultdict(list)
+    deletion._released_seats[instance.performance_id].append(
+        (instance.row, instance.seat)
+    )
+
+
+@receiver(pre_delete, sender=Performance)
+def performance_deleting(sender, instance, origin=None, **kwargs):
+    # Its tickets go with it, so their seats need no releasing.
+    deletion = _deletion(instance, origin)
+    if not hasattr(deletion, "_deleted_performances"):
+        deletion._deleted_performances = set()
+    deletion._deleted_performances.add(instance.pk)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, origin=None, **kwargs):
+    # Every pre_delete of a delete() call runs before its first
+    # post_delete, which releases the seats of all its tickets at once.
+    deletion = _deletion(instance, origin)
+    released = vars(deletion).pop("_released_seats", None)
+    if not released:
+        return
+    deleted = vars(deletion).pop("_deleted_performances", set())
+    for performance_id, seats in released.items():
+        if performance_id not in deleted:
+            Performance.track_tickets(performance_id, seats, sold=False)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Actor)
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_delete, sender=TheatreHall)
+@receiver(post_save, sender=Play)
+@receiver(post_delete, sender=Play)
+def catalog_changed(sender, **kwargs):
+    # Bumped after commit, so that a response built from the old rows
+    # can never be cached under the new version.
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def play_relations_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(lambda: bump_version(Play))
+
+
+@receiver(post_save, sender=Play)
+def play_saved(sender, instance, created, **kwargs):
+    update_search_vector([instance.pk])
+    if not created:
+        # The instance may have been loaded before its relations changed.
+        instance.refresh_card()
+
+
+def _card_play_ids(related) -> list[int]:
+    if isinstance(related, Genre):
+        through, field = Play.genres.through, "genre"
+    else:
+        through, field = Play.actors.through, "actor"
+    return list(
+        through.objects.filter(**{field: related}).values_list(
+            "play_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+def card_name_saved(sender, instance, created, **kwargs):
+    if not created:
+        Play.refresh_cards(_card_play_ids(instance))
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Actor)
+def card_name_deleting(sender, instance, **kwargs):
+    # The relation rows go with the genre or actor without m2m signals.
+    instance._card_play_ids = _card_play_ids(instance)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+def card_name_deleted(sender, instance, **kwargs):
+    Play.refresh_cards(getattr(instance, "_card_play_ids", ()))
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def play_card_relations_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            instance.refresh_card()
+    elif action == "pre_clear":
+        instance._card_play_ids = _card_play_ids(instance)
+    elif action == "post_clear":
+        Play.refresh_cards(getattr(instance, "_card_play_ids", ()))
+    elif action in ("post_add", "post_remove"):
+        Play.refresh_cards(pk_set)
+
+
+@receiver(pre_save, sender=Performance)
+def performance_saving(sender, instance, **kwargs):
+    # Moving a performance to another day or play empties its old entry.
+    instance._previous_calendar_key = None
+    if instance.pk is not None:
+        previous = (
+            Performance.objects.filter(pk=instance.pk)
+            .only("show_time", "play_id")
+            .first()
+        )
+        if previous is not None:
+            instance._previous_calendar_key = previous.calendar_key
+
+
+@receiver(post_save, sender=Performance)
+def performance_saved(sender, instance, **kwargs):
+    keys = [instance.calendar_key]
+    if getattr(instance, "_previous_calendar_key", None):
+        keys.append(instance._previous_calendar_key)
+    CalendarDay.refresh(keys)
+
+
+@receiver(post_delete, sender=Performance)
+def performance_deleted(sender, instance, **kwargs):
+    CalendarDay.refresh([instance.calendar_key])
+
+
+@receiver(post_save, sender=TheatreHall)
+def theatre_hall_saved(sender, instance, created, **kwargs):
+    if not created:
+        CalendarDay.refresh(
+            performance.calendar_key
+            for performance in instance.performance_set.only(
+                "show_time", "play_id"
+            )
+        )
@@ -0,0 +1,86 @@
+"""Token-bucket throttling for reservations, token issuing and sign-up.
+
+Every client has a bucket of ``THROTTLE_BURSTS[scope]`` tokens, refilled
+at the scope's rate from ``DEFAULT_THROTTLE_RATES``, and each request
+spends one. A client can burst up to the bucket size, say when a show
+goes on sale, while its sustained rate stays bounded. Buckets are kept
+in the ``THROTTLE_CACHE_ALIAS`` cache as a ``(tokens, timestamp)`` pair,
+keyed by user for authenticated requests and by client IP otherwise.
+
+The cache is read and written without a lock, so concurrent requests of
+one client may both spend the same token: limits are approximate under
+contention, which is the price of a single cache round trip each way.
+"""
+import math
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+BUCKET_KEY = "theatre:throttle:{scope}:{ident}"
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate: str) -> float:
+    """Tokens per second of a rate such as ``"30/min"``."""
+    num_requests, period = rate.split("/")
+    return int(num_requests) / PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_cache_key(self, request) -> str:
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return BUCKET_KEY.format(scope=self.scope, ident=ident)
+
+    def allow_request(self, request, view) -> bool:
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        refill = parse_rate(rate)
+        burst = settings.THROTTLE_BURSTS[self.scope]
+
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        key = self.get_cache_key(request)
+        now = time.time()
+        bucket = cache.get(key)
+        if bucket is None:
+            tokens = burst
+        else:
+            tokens, stamp = bucket
+            tokens = min(burst, tokens + (now - stamp) * refill)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill
+            return False
+        # A bucket left to expire is a full one.
+        cache.set(key, (tokens - 1, now), math.ceil(burst / refill))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ReservationThrottle(TokenBucketThrottle):
+    scope = "reservation"
+
+
+class TokenObtainThrottle(TokenBucketThrottle):
+    scope = "token"
+
+
+class RegistrationThrottle(TokenBucketThrottle):
+    scope = "registration"
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from theatre import async_views
 from theatre.views import (
     GenreViewSet,
     ActorViewSet,
@@ -8,6 +9,10 @@ from theatre.views import (
     PlayViewSet,
     PerformanceViewSet,
     ReservationViewSet,
+    ReservationRequestViewSet,
+    CalendarViewSet,
+    CacheStatsView,
+    TicketExportView,
 )
 
 router = routers.DefaultRouter()
@@ -17,7 +22,52 @@ router.register("theatre_hall", TheatreHallViewSet)
 router.register("plays", PlayViewSet)
 router.register("performance", PerformanceViewSet)
 router.register("reservation", ReservationViewSet)
+router.register("reservation_requests", ReservationRequestViewSet)
+router.register("calendar", CalendarViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path("cache_stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path(
+        "export/tickets/",
+        TicketExportView.as_view(),
+        name="ticket-export",
+    ),
+    path(
+        "async/genres/",
+        async_views.genre_list,
+        name="async-genre-list",
+    ),
+    path(
+        "async/actors/",
+        async_views.actor_list,
+        name="async-actor-list",
+    ),
+    path(
+        "async/theatre_hall/",
+        async_views.theatre_hall_list,
+        name="async-theatrehall-list",
+    ),
+    path(
+        "async/plays/",
+        async_views.play_list,
+        name="async-play-list",
+    ),
+    path(
+        "async/plays/<int:pk>/",
+        async_views.play_detail,
+        name="async-play-detail",
+    ),
+    path(
+        "async/performance/",
+        async_views.performance_list,
+        name="async-performance-list",
+    ),
+    path(
+        "async/performance/<int:pk>/",
+        async_views.performance_detail,
+        name="async-performance-detail",
+    ),
+]
 
 app_name = "theatre"
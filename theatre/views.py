@@ -1,11 +1,37 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
-from django.db.models import F, Count
+from django.conf import settings
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, mixins
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import viewsets, mixins, serializers, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from theatre.booking import allocate_reservation
+from theatre.cache import CachedListMixin, ConditionalGetMixin, get_stats
+from theatre.export import CONTENT_TYPES, FORMATTERS, export_rows
+from theatre.facets import FacetListMixin, play_facets, performance_facets
+from theatre.holds import hold_seats, release_holds
+from theatre.intake import enqueue_reservation
+from theatre.pagination import (
+    PerformancePagination,
+    PlayPagination,
+    PlaySearchPagination,
+)
 from theatre.permissions import IsAdminOrIfAuthenticatedReadOnly
+from theatre.row_serializers import (
+    FastListMixin,
+    PerformanceRowSerializer,
+    PlayRowSerializer,
+)
+from theatre.search import search_plays
+from theatre.throttling import ReservationThrottle
 
 from theatre.models import (
     Genre,
@@ -13,7 +39,10 @@ from theatre.models import (
     TheatreHall,
     Play,
     Performance,
-    Reservation
+    Reservation,
+    ReservationRequest,
+    SeatHold,
+    CalendarDay,
 )
 
 from theatre.serializers import (
@@ -26,43 +55,63 @@ from theatre.serializers import (
     PerformanceSerializer,
     PerformanceListSerializer,
     PerformanceDetailSerializer,
+    PerformanceDetailTakenPlacesSerializer,
     ReservationSerializer,
     ReservationListSerializer,
+    ReservationRequestSerializer,
+    SeatAllocationSerializer,
+    SeatHoldSerializer,
+    SeatHoldListSerializer,
+    TicketExportSerializer,
+    CalendarQuerySerializer,
+    CalendarDaySerializer,
 )
 
 
-class GenreViewSet(mixins.ListModelMixin,
+class GenreViewSet(CachedListMixin,
+                   mixins.ListModelMixin,
                    mixins.CreateModelMixin,
                    viewsets.GenericViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Genre,)
 
 
-class ActorViewSet(mixins.ListModelMixin,
+class ActorViewSet(CachedListMixin,
+                   mixins.ListModelMixin,
                    mixins.CreateModelMixin,
                    viewsets.GenericViewSet):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Actor,)
 
 
-class TheatreHallViewSet(mixins.ListModelMixin,
+class TheatreHallViewSet(CachedListMixin,
+                         mixins.ListModelMixin,
                          mixins.CreateModelMixin,
                          viewsets.GenericViewSet
                          ):
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (TheatreHall,)
 
 
-class PlayViewSet(mixins.ListModelMixin,
+class PlayViewSet(CachedListMixin,
+                  FacetListMixin,
+                  FastListMixin,
+                  mixins.ListModelMixin,
                   mixins.CreateModelMixin,
                   mixins.RetrieveModelMixin,
                   viewsets.GenericViewSet):
     queryset = Play.objects.all()
     serializer_class = PlaySerializer
+    pagination_class = PlayPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Play, Genre, Actor)
+    row_serializer_class = PlayRowSerializer
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -73,25 +122,39 @@ class PlayViewSet(mixins.ListModelMixin,
 
         return PlaySerializer
 
-    @staticmethod
-    def _params_to_ints(qs):
-        return [int(str_id) for str_id in qs.split(",")]
-
-    def get_queryset(self):
+    @property
+    def paginator(self):
+        # Search results are ranked, so they cannot be paged by title.
+        if self.request.query_params.get("q") and (
+            not hasattr(self, "_paginator")
+        ):
+            self._paginator = PlaySearchPagination()
+        return super().paginator
+
+    def get_unrelated_queryset(self):
+        """Plays with every filter applied but ``genres`` and ``actors``."""
         queryset = self.queryset
-        actors = self.request.query_params.get("actors")
-        genres = self.request.query_params.get("genres")
         title = self.request.query_params.get("title")
-        if actors:
-            actors_ids = self._params_to_ints(actors)
-            queryset = queryset.filter(actors__id__in=actors_ids)
-        if genres:
-            genres_ids = self._params_to_ints(genres)
-            queryset = queryset.filter(genres__id__in=genres_ids)
+        q = self.request.query_params.get("q")
         if title:
             queryset = queryset.filter(title__icontains=title)
+        if q:
+            queryset = search_plays(queryset, q)
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related("genres", "actors")
 
-        return queryset.distinct()
+        return queryset
+
+    def get_queryset(self):
+        # Subqueries on the relation tables keep each play once, without
+        # joins and DISTINCT.
+        return self.filter_by_relations(self.get_unrelated_queryset())
+
+    def get_facets(self):
+        genre_ids, actor_ids = self.get_relation_filters()
+        return play_facets(
+            self.get_unrelated_queryset(), genre_ids, actor_ids
+        )
 
     @extend_schema(
         parameters=[
@@ -110,49 +173,177 @@ class PlayViewSet(mixins.ListModelMixin,
                 type={"type": "list", "items": {"type": "number"}},
                 description="Filter by title",
             ),
+            OpenApiParameter(
+                "q",
+                type=str,
+                description="Search title and description, "
+                            "best matches first",
+            ),
+            OpenApiParameter(
+                "facets",
+                type=bool,
+                description="Also return play counts per genre and actor "
+                            "for these filters",
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class PerformanceViewSet(viewsets.ModelViewSet):
+class PerformanceViewSet(ConditionalGetMixin,
+                         FacetListMixin,
+                         FastListMixin,
+                         viewsets.ModelViewSet):
     queryset = Performance.objects.all()
     serializer_class = PerformanceSerializer
+    pagination_class = PerformancePagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    condition_models = (Play, TheatreHall)
+    row_serializer_class = PerformanceRowSerializer
 
     def get_serializer_class(self):
         if self.action == "list":
             return PerformanceListSerializer
 
         if self.action == "retrieve":
+            if self._taken_places_as_list():
+                return PerformanceDetailTakenPlacesSerializer
+
             return PerformanceDetailSerializer
 
+        if self.action == "hold":
+            return SeatHoldSerializer
+
+        if self.action == "allocate":
+            return SeatAllocationSerializer
+
         return PerformanceSerializer
 
+    def _taken_places_as_list(self):
+        return self.request.query_params.get("taken_places") == "list"
+
     def get_queryset(self):
         queryset = self.queryset
 
+        if self.action == "retrieve" and self._taken_places_as_list():
+            queryset = queryset.prefetch_related("tickets")
+
         if self.action in ("list", "retrieve"):
+            active_holds = (
+                SeatHold.objects.active()
+                .filter(performance=OuterRef("pk"))
+                .order_by()
+                .values("performance")
+                .annotate(count=Count("id"))
+                .values("count")
+            )
             queryset = (
                 queryset
                 .select_related("play", "theatre_hall")
                 .annotate(tickets_available=(
                         F("theatre_hall__rows")
                         * F("theatre_hall__seats_in_row")
-                        - Count("tickets")
+                        - F("tickets_sold")
+                        - Coalesce(Subquery(active_holds), 0)
                 ))
             )
 
+        if self.action == "hold":
+            queryset = queryset.select_related("theatre_hall")
+
+        day = self._day()
+        play_id = self._play_id()
+        if day:
+            # A range on show_time, unlike show_time__date, can use
+            # the show_time index.
+            queryset = queryset.filter(
+                show_time__gte=timezone.make_aware(
+                    datetime.combine(day, time.min)
+                ),
+                show_time__lt=timezone.make_aware(
+                    datetime.combine(day + timedelta(days=1), time.min)
+                ),
+            )
+        if play_id:
+            queryset = queryset.filter(play__id=play_id)
+
+        return self.filter_by_relations(queryset, "play_id")
+
+    def _day(self):
         date = self.request.query_params.get("date")
+        if not date:
+            return None
+        try:
+            return datetime.strptime(date, "%Y-%m-%d").date()
+        except ValueError:
+            raise serializers.ValidationError(
+                {"date": "Date has wrong format. Use YYYY-MM-DD."}
+            )
+
+    def _play_id(self):
         play = self.request.query_params.get("play")
-        if date:
-            queryset = queryset.filter(show_time__date=date)
-        if play:
-            play_id = int(play)
-            queryset = queryset.filter(play__id=play_id)
+        if not play:
+            return None
+        try:
+            return int(play)
+        except ValueError:
+            raise serializers.ValidationError(
+                {"play": "A valid integer is required."}
+            )
+
+    def get_facets(self):
+        genre_ids, actor_ids = self.get_relation_filters()
+        return performance_facets(
+            self._day(), self._play_id(), genre_ids, actor_ids
+        )
+
+    def get_condition_state(self, request):
+        # Holds expire without a write, so the latest expiry that has
+        # passed is part of the state next to the availability version.
+        last_expiry = (
+            SeatHold.objects.expired()
+            .filter(performance=OuterRef("pk"))
+            .order_by()
+            .values("performance")
+            .annotate(last=Max("expires_at"))
+            .values("last")
+        )
+        fields = (
+            "id",
+            "availability_version",
+            "availability_updated_at",
+            "last_hold_expiry",
+        )
+        if self.action == "retrieve":
+            try:
+                queryset = Performance.objects.filter(pk=self.kwargs["pk"])
+            except (TypeError, ValueError):
+                queryset = Performance.objects.none()
+        else:
+            queryset = self.get_queryset()
+        queryset = queryset.annotate(
+            last_hold_expiry=Subquery(last_expiry)
+        ).values_list(*fields)
+
+        if self.action == "retrieve":
+            state = list(queryset)
+            if not state:
+                # Let ``retrieve`` answer with its usual 404.
+                return None
+        else:
+            state = list(
+                self.paginator.get_page_queryset(queryset, request)
+            )
 
-        return queryset.distinct()
+        last_modified = max(
+            (
+                max(filter(None, (updated_at, last_hold_expiry)))
+                for _, _, updated_at, last_hold_expiry in state
+            ),
+            default=None,
+        )
+        return state, last_modified
 
     @extend_schema(
         parameters=[
@@ -166,8 +357,131 @@ class PerformanceViewSet(viewsets.ModelViewSet):
                 type={"type": "list", "items": {"type": "number"}},
                 description="Filter by play",
             ),
+            OpenApiParameter(
+                "genres",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by genres of the play",
+            ),
+            OpenApiParameter(
+                "actors",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by actors of the play",
+            ),
+            OpenApiParameter(
+                "facets",
+                type=bool,
+                description="Also return performance counts per upcoming "
+                            "date, genre and actor for these filters",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        if self.facets_requested():
+            # Facets depend on rows beyond the page the ETag covers.
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            request, lambda: super(PerformanceViewSet, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "taken_places",
+                type=str,
+                enum=["list"],
+                description="Also return taken places as a list of "
+                            "row/seat objects instead of only the "
+                            "packed seat map",
+            ),
         ]
     )
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(PerformanceViewSet, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
+
+    @extend_schema(request=SeatHoldSerializer, responses=SeatHoldSerializer)
+    @action(
+        detail=True,
+        methods=["post", "delete"],
+        permission_classes=(IsAuthenticated,),
+        throttle_classes=(ReservationThrottle,),
+    )
+    def hold(self, request, pk=None):
+        """Hold seats for the current user for a few minutes"""
+        performance = self.get_object()
+
+        if request.method == "DELETE":
+            release_holds(performance, request.user)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        holds = hold_seats(
+            performance,
+            request.user,
+            serializer.validated_data["seats"],
+            serializer.validated_data.get("minutes"),
+        )
+        return Response(
+            {
+                "seats": SeatHoldListSerializer(holds, many=True).data,
+                "expires_at": holds[0].expires_at,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        parameters=[SeatAllocationSerializer],
+        request=None,
+        responses=ReservationSerializer,
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=(IsAuthenticated,),
+        throttle_classes=(ReservationThrottle,),
+    )
+    def allocate(self, request, pk=None):
+        """Book the best available block of ?count=N adjacent seats"""
+        performance = self.get_object()
+
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        reservation = allocate_reservation(
+            request.user, performance.pk, serializer.validated_data["count"]
+        )
+        return Response(
+            ReservationSerializer(reservation).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class CalendarViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Performances and seats remaining per day and play"""
+
+    queryset = CalendarDay.objects.select_related("play")
+    serializer_class = CalendarDaySerializer
+    pagination_class = None
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+    def get_queryset(self):
+        query = CalendarQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        queryset = self.queryset.filter(
+            date__gte=params["date_from"], date__lte=params["date_to"]
+        )
+        if params.get("play"):
+            queryset = queryset.filter(play_id=params["play"])
+        return queryset
+
+    @extend_schema(parameters=[CalendarQuerySerializer])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -185,6 +499,12 @@ class ReservationViewSet(mixins.ListModelMixin,
     serializer_class = ReservationSerializer
     pagination_class = ReservationPagination
     permission_classes = (IsAuthenticated,)
+    throttle_classes = (ReservationThrottle,)
+
+    def get_throttles(self):
+        if self.action == "create":
+            return super().get_throttles()
+        return []
 
     def get_queryset(self):
         queryset = self.queryset.filter(user=self.request.user)
@@ -205,3 +525,82 @@ class ReservationViewSet(mixins.ListModelMixin,
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(
+        responses={
+            201: ReservationSerializer,
+            202: ReservationRequestSerializer,
+        },
+    )
+    def create(self, request, *args, **kwargs):
+        """Book tickets, or queue them with RESERVATION_QUEUE on"""
+        if not settings.RESERVATION_QUEUE:
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queued = enqueue_reservation(
+            request.user, serializer.validated_data["tickets"]
+        )
+        data = ReservationRequestSerializer(
+            queued, context=self.get_serializer_context()
+        ).data
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": data["url"]},
+        )
+
+
+class ReservationRequestViewSet(mixins.RetrieveModelMixin,
+                                viewsets.GenericViewSet):
+    """Status of a queued reservation"""
+
+    queryset = ReservationRequest.objects.all()
+    serializer_class = ReservationRequestSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+
+class CacheStatsView(APIView):
+    """Hits and misses of the cached lists in the answering process"""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(get_stats(CachedListMixin.cached_endpoints))
+
+
+class TicketExportView(APIView):
+    """Stream every sold ticket with its reservation as NDJSON, JSON or CSV"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        parameters=[TicketExportSerializer],
+        responses={
+            (200, "application/x-ndjson"): str,
+            (200, "application/json"): str,
+            (200, "text/csv"): str,
+        },
+    )
+    def get(self, request):
+        serializer = TicketExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        output = params["output"]
+
+        rows = export_rows(
+            date_from=params.get("date_from"),
+            date_to=params.get("date_to"),
+            performance_id=params.get("performance"),
+        )
+        response = StreamingHttpResponse(
+            FORMATTERS[output](rows), content_type=CONTENT_TYPES[output]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tickets.{output}"'
+        )
+        return response
@@ -0,0 +1,81 @@
+"""
+Gunicorn configuration for theatre_api_service.
+
+    gunicorn -c python:theatre_api_service.gunicorn_conf
+
+GUNICORN_WORKER_CLASS picks how requests are served:
+
+* ``sync`` - one request at a time per worker process;
+* ``gthread`` - GUNICORN_THREADS requests per process, sharing memory;
+* ``uvicorn`` - the ASGI application under uvicorn workers, for the
+  async endpoints.
+
+For more information on this file, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+import multiprocessing
+import os
+import sys
+
+from decouple import config
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+os.environ.setdefault(
+    "DJANGO_SETTINGS_MODULE", "theatre_api_service.settings_production"
+)
+
+worker_type = config("GUNICORN_WORKER_CLASS", default="gthread")
+if worker_type not in WORKER_CLASSES:
+    raise ValueError(
+        f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, "
+        f"not {worker_type!r}"
+    )
+worker_class = WORKER_CLASSES[worker_type]
+
+if worker_type == "uvicorn":
+    # settings_production turns persistent connections off for it.
+    wsgi_app = "theatre_api_service.asgi:application"
+else:
+    wsgi_app = "theatre_api_service.wsgi:application"
+
+bind = config("GUNICORN_BIND", default="0.0.0.0:8000")
+workers = config(
+    "GUNICORN_WORKERS", default=multiprocessing.cpu_count() * 2 + 1, cast=int
+)
+threads = config(
+    "GUNICORN_THREADS",
+    default=4 if worker_type == "gthread" else 1,
+    cast=int,
+)
+
+# Import the project once in the master, so workers fork with it loaded
+# and start faster; code changes need a full restart.
+preload_app = config("GUNICORN_PRELOAD", default=True, cast=bool)
+
+timeout = config("GUNICORN_TIMEOUT", default=30, cast=int)
+graceful_timeout = config("GUNICORN_GRACEFUL_TIMEOUT", default=30, cast=int)
+keepalive = config("GUNICORN_KEEPALIVE", default=5, cast=int)
+
+# Recycle workers now and then to bound slow memory growth.
+max_requests = config("GUNICORN_MAX_REQUESTS", default=1000, cast=int)
+max_requests_jitter = config(
+    "GUNICORN_MAX_REQUESTS_JITTER", default=100, cast=int
+)
+
+accesslog = config("GUNICORN_ACCESS_LOG", default="-")
+errorlog = "-"
+loglevel = config("GUNICORN_LOG_LEVEL", default="info")
+
+
+def when_ready(server):
+    # Workers must not inherit a connection the master opened while
+    # preloading; each opens its own.
+    if "django.db" in sys.modules:
+        from django.db import connections
+
+        connections.close_all()
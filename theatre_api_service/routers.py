@@ -0,0 +1,154 @@
+"""
+Read-replica routing for theatre_api_service.
+
+``ReplicaRoutingMiddleware`` sends the reads of GET, HEAD and OPTIONS
+requests to one of ``REPLICA_DATABASES``; everything else, including
+work outside requests such as management commands, uses the primary.
+After a successful write the client's reads stay on the primary for
+``REPLICA_STICKY_SECONDS``, long enough for the replicas to catch up,
+so it sees its own changes immediately. The user of the request's
+access token is marked in the ``REPLICA_STICKY_CACHE_ALIAS`` cache, as
+API clients rarely keep cookies, and the client also gets a cookie for
+writes made without a token.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/topics/db/multi-db/
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+STICKY_KEY = "replica:sticky:{user_id}"
+
+_read_alias = ContextVar("read_alias", default=DEFAULT_DB_ALIAS)
+
+
+def pin_to_primary() -> None:
+    """Send the remaining reads of the current request to the primary."""
+    _read_alias.set(DEFAULT_DB_ALIAS)
+
+
+def sticky_key(request):
+    """The sticky-reads key of the request's token user, if it has one."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+    except InvalidToken:
+        return None
+    user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+    return None if user_id is None else STICKY_KEY.format(user_id=user_id)
+
+
+def get_sticky_cache():
+    return caches[settings.REPLICA_STICKY_CACHE_ALIAS]
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Reads inside a transaction must see its writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def may_read_replica(self, request) -> bool:
+        return bool(
+            settings.REPLICA_DATABASES
+            and request.method in SAFE_METHODS
+            and settings.REPLICA_STICKY_COOKIE not in request.COOKIES
+        )
+
+    def is_write(self, request, response) -> bool:
+        return bool(
+            settings.REPLICA_DATABASES
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        alias = DEFAULT_DB_ALIAS
+        if self.may_read_replica(request):
+            key = sticky_key(request)
+            if key is None or get_sticky_cache().get(key) is None:
+                alias = random.choice(settings.REPLICA_DATABASES)
+
+        token = _read_alias.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        if self.is_write(request, response):
+            key = sticky_key(request)
+            if key is not None:
+                get_sticky_cache().set(
+                    key, True, settings.REPLICA_STICKY_SECONDS
+                )
+            self.add_sticky_cookie(response)
+        return response
+
+    async def __acall__(self, request):
+        alias = DEFAULT_DB_ALIAS
+        if self.may_read_replica(request):
+            key = sticky_key(request)
+            if key is None or await get_sticky_cache().aget(key) is None:
+                alias = random.choice(settings.REPLICA_DATABASES)
+
+        token = _read_alias.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        if self.is_write(request, response):
+            key = sticky_key(request)
+            if key is not None:
+                await get_sticky_cache().aset(
+                    key, True, settings.REPLICA_STICKY_SECONDS
+                )
+            self.add_sticky_cookie(response)
+        return response
+
+    def add_sticky_cookie(self, response):
+        response.set_cookie(
+            settings.REPLICA_STICKY_COOKIE,
+            "1",
+            max_age=settings.REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
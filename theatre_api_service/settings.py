@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     "rest_framework",
     "rest_framework_simplejwt",
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "theatre.instrumentation.SQLInstrumentationMiddleware",
+    "theatre_api_service.routers.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -92,9 +95,71 @@ DATABASES = {
         "PASSWORD": config("DB_PASSWORD"),
         "HOST": config("DB_HOST"),
         "PORT": config("DB_PORT"),
+        # Seconds to keep a connection open between requests; 0 closes
+        # it after each request, None keeps it for the worker's lifetime.
+        "CONN_MAX_AGE": config(
+            "DB_CONN_MAX_AGE",
+            default=0,
+            cast=lambda value: None if value == "None" else int(value),
+        ),
+        "CONN_HEALTH_CHECKS": config(
+            "DB_CONN_HEALTH_CHECKS", default=False, cast=bool
+        ),
     }
 }
 
+# Read replicas as comma-separated HOST[:PORT][/NAME], sharing the
+# primary's credentials; e.g. "localhost:5432/theatre_replica" for a
+# second local database.
+REPLICA_DATABASES = []
+
+for number, replica in enumerate(
+    config("DB_REPLICAS", default="", cast=Csv())
+):
+    address, _, name = replica.partition("/")
+    host, _, port = address.partition(":")
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "NAME": name or DATABASES["default"]["NAME"],
+        # Tests read the primary's test database through the replica.
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["theatre_api_service.routers.PrimaryReplicaRouter"]
+
+# Clients that wrote within this many seconds read from the primary.
+REPLICA_STICKY_SECONDS = config(
+    "REPLICA_STICKY_SECONDS", default=5, cast=int
+)
+
+REPLICA_STICKY_COOKIE = "primary_reads"
+
+# Marks users who wrote recently, by the user id of their access token.
+REPLICA_STICKY_CACHE_ALIAS = "default"
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="theatre-api"),
+    }
+}
+
+RESPONSE_CACHE_ALIAS = "default"
+
+RESPONSE_CACHE_TIMEOUT = config(
+    "RESPONSE_CACHE_TIMEOUT", default=300, cast=int
+)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -145,8 +210,118 @@ REST_FRAMEWORK = {
         "drf_spectacular.openapi.AutoSchema",
 
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+        "user.authentication.CachedJWTAuthentication",
+    ),
+
+    "DEFAULT_RENDERER_CLASSES": (
+        "theatre.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+
+    "DEFAULT_PARSER_CLASSES": (
+        "theatre.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+
+    # Token-bucket refill rates, see theatre.throttling. An empty value
+    # turns throttling of the scope off.
+    "DEFAULT_THROTTLE_RATES": {
+        "reservation": config(
+            "THROTTLE_RESERVATION_RATE", default="30/min"
+        ) or None,
+        "token": config("THROTTLE_TOKEN_RATE", default="10/min") or None,
+        "registration": config(
+            "THROTTLE_REGISTRATION_RATE", default="10/hour"
+        ) or None,
+    },
+
+    # Proxies in front of the app that append to X-Forwarded-For. Anonymous
+    # clients are throttled by the address the last of them saw, or by
+    # REMOTE_ADDR with none, so a client cannot pick its own bucket.
+    "NUM_PROXIES": config("NUM_PROXIES", default=0, cast=int),
+}
+
+# Bucket sizes: how many requests a client can make at once before the
+# refill rate above applies.
+THROTTLE_BURSTS = {
+    "reservation": config("THROTTLE_RESERVATION_BURST", default=10, cast=int),
+    "token": config("THROTTLE_TOKEN_BURST", default=5, cast=int),
+    "registration": config(
+        "THROTTLE_REGISTRATION_BURST", default=3, cast=int
+    ),
+}
+
+THROTTLE_CACHE_ALIAS = "default"
+
+# "row" locks the Performance row, "advisory" uses a Postgres
+# transaction-level advisory lock keyed by the performance id.
+RESERVATION_LOCK_MODE = config("RESERVATION_LOCK_MODE", default="row")
+
+RESERVATION_MAX_RETRIES = config(
+    "RESERVATION_MAX_RETRIES", default=3, cast=int
+)
+
+RESERVATION_RETRY_BACKOFF = config(
+    "RESERVATION_RETRY_BACKOFF", default=0.05, cast=float
+)
+
+# Queue reservations for the process_reservations worker and answer 202
+# instead of booking them in the request, see theatre.intake.
+RESERVATION_QUEUE = config("RESERVATION_QUEUE", default=False, cast=bool)
+
+RESERVATION_QUEUE_BATCH_SIZE = config(
+    "RESERVATION_QUEUE_BATCH_SIZE", default=200, cast=int
+)
+
+SEAT_HOLD_MINUTES = config("SEAT_HOLD_MINUTES", default=10, cast=int)
+
+SEAT_HOLD_MAX_MINUTES = config("SEAT_HOLD_MAX_MINUTES", default=30, cast=int)
+
+# Most seats one user may hold on a performance at a time.
+SEAT_HOLD_MAX_SEATS = config("SEAT_HOLD_MAX_SEATS", default=10, cast=int)
+
+PLAY_SEARCH_CONFIG = config("PLAY_SEARCH_CONFIG", default="english")
+
+KEYSET_PAGINATION_PAGE_SIZE = config(
+    "KEYSET_PAGINATION_PAGE_SIZE", default=20, cast=int
+)
+
+KEYSET_PAGINATION_MAX_PAGE_SIZE = config(
+    "KEYSET_PAGINATION_MAX_PAGE_SIZE", default=100, cast=int
+)
+
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Render play and performance lists from values_list() rows instead of
+# model instances; the output is the same.
+FAST_LIST_SERIALIZATION = config(
+    "FAST_LIST_SERIALIZATION", default=False, cast=bool
+)
+
+CALENDAR_MAX_DAYS = config("CALENDAR_MAX_DAYS", default=366, cast=int)
+
+# Largest counts returned per facet; selected values are always included.
+FACET_LIMIT = config("FACET_LIMIT", default=20, cast=int)
+
+SQL_INSTRUMENTATION_SAMPLE_RATE = config(
+    "SQL_INSTRUMENTATION_SAMPLE_RATE", default=0.1, cast=float
+)
+SQL_SLOW_QUERY_MS = config("SQL_SLOW_QUERY_MS", default=200, cast=float)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "theatre.instrumentation": {
+            "handlers": ["console"],
+            "level": config("INSTRUMENTATION_LOG_LEVEL", default="INFO"),
+            "propagate": False,
+        },
+    },
 }
 
 SIMPLE_JWT = {
@@ -155,6 +330,14 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": False,
 }
 
+# Seconds a JWT-authenticated user is reused without a database lookup;
+# saving the user drops it earlier in the same process.
+AUTH_USER_CACHE_SECONDS = config(
+    "AUTH_USER_CACHE_SECONDS", default=30, cast=int
+)
+
+AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=10000, cast=int)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Theatre API service",
     "DESCRIPTION": "Order tickets for theatre plays",
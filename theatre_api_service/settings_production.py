@@ -0,0 +1,84 @@
+"""
+Production settings for theatre_api_service.
+
+Select them with
+DJANGO_SETTINGS_MODULE=theatre_api_service.settings_production; the
+gunicorn configuration in ``gunicorn_conf`` does so by default.
+
+See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
+"""
+from decouple import Csv, config
+from django.core.exceptions import ImproperlyConfigured
+
+from theatre_api_service.settings import *  # noqa: F401,F403
+from theatre_api_service.settings import (
+    BASE_DIR,
+    DATABASES,
+    MIDDLEWARE,
+    REST_FRAMEWORK,
+)
+
+DEBUG = False
+
+# No fallback: the development key must never sign production tokens.
+SECRET_KEY = config("SECRET_KEY")
+
+ALLOWED_HOSTS = config("ALLOWED_HOSTS", default="localhost", cast=Csv())
+
+CSRF_TRUSTED_ORIGINS = config(
+    "CSRF_TRUSTED_ORIGINS", default="", cast=Csv()
+)
+
+# Keep connections open across requests, and check them before reuse so
+# a connection dropped by Postgres or a pooler is replaced, not failed.
+# Under uvicorn workers Django runs requests in short-lived threads,
+# where persistent connections would pile up instead of being reused.
+ASGI_WORKERS = config("GUNICORN_WORKER_CLASS", default="gthread") == "uvicorn"
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = 0 if ASGI_WORKERS else config(
+        "DB_CONN_MAX_AGE",
+        default=60,
+        cast=lambda value: None if value == "None" else int(value),
+    )
+    database["CONN_HEALTH_CHECKS"] = config(
+        "DB_CONN_HEALTH_CHECKS", default=True, cast=bool
+    )
+
+# Throttle buckets, cached responses and their versions must be shared
+# by every gunicorn and reservation worker, and a cache hit must not cost
+# database queries: use Redis, Memcached or the file backend.
+SHARED_CACHE_BACKENDS = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+)
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.redis.RedisCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION"),
+    }
+}
+if CACHES["default"]["BACKEND"] not in SHARED_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND must be one of {', '.join(SHARED_CACHE_BACKENDS)}"
+    )
+
+# Serve the admin and browsable API assets without a separate server.
+STATIC_ROOT = config("STATIC_ROOT", default=str(BASE_DIR / "staticfiles"))
+
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
+
+# TLS is terminated by the proxy in front of gunicorn.
+SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+REST_FRAMEWORK["NUM_PROXIES"] = config("NUM_PROXIES", default=1, cast=int)
+SESSION_COOKIE_SECURE = config(
+    "SESSION_COOKIE_SECURE", default=True, cast=bool
+)
+CSRF_COOKIE_SECURE = config("CSRF_COOKIE_SECURE", default=True, cast=bool)
@@ -19,12 +19,18 @@ from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from theatre.throttling import TokenObtainThrottle
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/theatre/", include("theatre.urls", namespace="theatre")),
     path("api/user/", include("user.urls", namespace="user")),
 
-    path('api/token/', TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path(
+        'api/token/',
+        TokenObtainPairView.as_view(throttle_classes=(TokenObtainThrottle,)),
+        name="token_obtain_pair",
+    ),
     path('api/token/refresh/', TokenRefreshView.as_view(), name="token_refresh"),
 
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
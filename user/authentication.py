@@ -0,0 +1,84 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+	"""Process-local LRU of users by primary key, each kept for a TTL.
+
+	Entries are dropped when the user is saved or deleted in this
+	process; other processes see the change once the TTL runs out.
+	Callers get a copy, so a view changing ``request.user`` does not
+	touch the cached instance.
+	"""
+
+	def __init__(self):
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, pk):
+		with self._lock:
+			entry = self._entries.get(str(pk))
+			if entry is None:
+				return None
+			expires_at, user = entry
+			if expires_at <= time.monotonic():
+				del self._entries[str(pk)]
+				return None
+			self._entries.move_to_end(str(pk))
+		return copy.copy(user)
+
+	def set(self, pk, user):
+		if settings.AUTH_USER_CACHE_SECONDS <= 0:
+			return
+		expires_at = time.monotonic() + settings.AUTH_USER_CACHE_SECONDS
+		with self._lock:
+			self._entries[str(pk)] = (expires_at, copy.copy(user))
+			self._entries.move_to_end(str(pk))
+			while len(self._entries) > settings.AUTH_USER_CACHE_SIZE:
+				self._entries.popitem(last=False)
+
+	def forget(self, pk):
+		with self._lock:
+			self._entries.pop(str(pk), None)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+	"""``JWTAuthentication`` that resolves users through ``user_cache``.
+
+	The user id claim of the token picks the cache entry, so a request
+	by a recently seen user is authenticated, and checked for
+	``is_staff`` by the permissions, without a database query.
+	"""
+
+	def get_user(self, validated_token):
+		user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+		user = user_cache.get(user_id) if user_id is not None else None
+		if user is None or not self.is_still_valid(validated_token, user):
+			# Raises the usual errors for unknown or inactive users.
+			user = super().get_user(validated_token)
+			user_cache.set(user_id, user)
+		return user
+
+	@staticmethod
+	def is_still_valid(validated_token, user) -> bool:
+		if not user.is_active:
+			return False
+		if api_settings.CHECK_REVOKE_TOKEN:
+			return validated_token.get(
+				api_settings.REVOKE_TOKEN_CLAIM
+			) == get_md5_hash_password(user.password)
+		return True
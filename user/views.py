@@ -5,13 +5,17 @@ from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
+from theatre.throttling import RegistrationThrottle, TokenObtainThrottle
+
 
 class CreateUserView(generics.CreateAPIView):
 	serializer_class = UserSerializer
+	throttle_classes = (RegistrationThrottle,)
 
 
 class CreateTokenView(ObtainAuthToken):
 	renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+	throttle_classes = (TokenObtainThrottle,)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):